@@ -5,12 +5,34 @@ Quo is a Python based Command Line toolkit for writing Command-Line Interface(CL
 
 import os
 import sys
+from typing import TYPE_CHECKING
+
+from quo.utils.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .i_o.termui import confirm, echo
+    from .prompt import prompt
+    from .shortcuts.utils import container
 
 #from .pause import pause as pause
-from .prompt import (
-    prompt as prompt,
-)  # dont confuse this with :class: quo.prompt.Prompt()
 
+# The exports are imported when they are used the first time, so that
+# `import quo` doesn't load the whole toolkit. (A script that only calls
+# `echo` shouldn't pay for the layout, key bindings, styles and so on.)
+#
+# `prompt` is also the name of the `quo.prompt` submodule. When the submodule
+# is imported before the function is accessed, the import binds the module to
+# `quo.prompt`. That module can be called like the function.
+__getattr__, __dir__ = lazy_attributes(
+    globals(),
+    {
+        # dont confuse this with :class: quo.prompt.Prompt()
+        "prompt": ".prompt",
+        "confirm": ".i_o.termui",
+        "echo": ".i_o.termui",
+        "container": ".shortcuts.utils",
+    },
+)
 
 
 def clear() -> None:
@@ -129,8 +151,8 @@ def pause(message: str ='Press any key to continue »...'):
             sys.stdin.read(1)
         finally:
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings) 
+
+
 #from quo.shortcuts.utils import print
-from quo.i_o.termui import confirm, echo
-from quo.shortcuts.utils import container
 
 __version__ = "2023.5.1"
@@ -10,15 +10,19 @@ import shlex
 import shutil
 import subprocess
 import tempfile
+import time
 from collections import deque
 from enum import Enum
 from functools import wraps
+from itertools import chain, islice
 from typing import (
     Any,
+    AsyncGenerator,
     Awaitable,
     Callable,
     Deque,
     Iterable,
+    Iterator,
     List,
     Optional,
     Set,
@@ -42,6 +46,7 @@ from quo.completion.core import (
 )
 from quo.document import Document
 from quo.errors import ValidationError
+from quo.eventloop.utils import run_in_executor_with_context
 from quo.filters import FilterOrBool, to_filter
 from .history import History, InMemoryHistory
 from .search import SearchDirection, SearchState
@@ -60,6 +65,18 @@ __all__ = [
 
 logger = logging.getLogger(__name__)
 
+# Number of history entries older than the one that's displayed, which are
+# kept loaded. Older entries are only loaded when the user goes back that far,
+# or searches the history.
+_HISTORY_READ_AHEAD = 1000
+
+# Number of completions `start_history_lines_completion` adds at once.
+_HISTORY_LINES_COMPLETION_BATCH = 100
+
+# Minimal time in seconds between two `on_completions_changed` events while
+# completions are streaming in. (About one frame.)
+_COMPLETIONS_CHANGED_INTERVAL = 1 / 60
+
 
 class EditReadOnlyBuffer(Exception):
     "Attempt editing of read-only :class:`.Buffer`."
@@ -200,6 +217,9 @@ class Buffer:
         In case of a `PromptSession` for instance, we want to keep the text,
         because we will exit the application, and only reset it during the next
         run.
+    :param completion_timeout: Time budget (in seconds) for the completer, or
+        `None`. When it expires, the completer is cancelled and the
+        completions that were found until then are kept.
 
     Events:
 
@@ -251,6 +271,7 @@ class Buffer:
         on_cursor_position_changed: Optional[BufferEventHandler] = None,
         on_completions_changed: Optional[BufferEventHandler] = None,
         on_suggestion_set: Optional[BufferEventHandler] = None,
+        completion_timeout: Optional[float] = None,
     ):
 
         # Accept both filters and booleans as input.
@@ -267,6 +288,7 @@ class Buffer:
         self.tempfile = tempfile
         self.name = name
         self.accept_handler = accept_handler
+        self.completion_timeout = completion_timeout
 
         # Filters. (Usually, used by the key bindings to drive the buffer.)
         self.complete_while_typing = complete_while_typing
@@ -306,8 +328,10 @@ class Buffer:
         self._async_completer = self._create_completer_coroutine()
         self._async_validator = self._create_auto_validate_coroutine()
 
-        # Asyncio task for populating the history.
+        # Asyncio task for populating the history, and the event that wakes it
+        # up when more entries are needed.
         self._load_history_task: Optional[asyncio.Future[None]] = None
+        self._more_history_needed: Optional[asyncio.Event] = None
 
         # Reset other attributes.
         self.reset(document=document)
@@ -376,6 +400,10 @@ class Buffer:
         if self._load_history_task is not None:
             self._load_history_task.cancel()
         self._load_history_task = None
+        self._more_history_needed = None
+
+        # Set when the whole history has to be loaded. (For searching.)
+        self._load_all_history = False
 
         #: The working lines. Similar to history, except that this can be
         #: modified. The user can press arrow_up and edit previous entries.
@@ -385,6 +413,11 @@ class Buffer:
         self._working_lines: Deque[str] = deque([document.text])
         self.__working_index = 0
 
+        #: Working lines that were edited (not saved to the history). Counted
+        #: from the end, because loaded history entries are inserted at the
+        #: front.
+        self._edited_working_lines: Set[int] = set()
+
     def load_history_if_not_yet_loaded(self) -> None:
         """
         Create task for populating the buffer history (if not yet done).
@@ -405,14 +438,32 @@ class Buffer:
             objects in one thread and running the application in a different
             thread, but history loading is the only place where it matters, and
             this solves it.
+
+        Only the most recent entries are loaded right away. Older entries are
+        loaded when the user goes back in the history far enough. Searching
+        the history loads the remaining entries in the background. (Searches
+        see the entries that are loaded when they run, like while loading.)
         """
         if self._load_history_task is None:
 
             async def load_history() -> None:
+                more_history_needed = asyncio.Event()
+                self._more_history_needed = more_history_needed
+
                 async for item in self.history.load():
                     self._working_lines.appendleft(item)
                     self.__working_index += 1
 
+                    # Wait until older entries are needed. (The number of
+                    # loaded entries older than the current one is the
+                    # working index.)
+                    while (
+                        not self._load_all_history
+                        and self.__working_index >= _HISTORY_READ_AHEAD
+                    ):
+                        more_history_needed.clear()
+                        await more_history_needed.wait()
+
             self._load_history_task = get_app().create_background_task(load_history())
 
             def load_history_done(f: "asyncio.Future[None]") -> None:
@@ -455,10 +506,13 @@ class Buffer:
             # character by character to see whether the strings are different.
             # (Some benchmarking showed significant differences for big
             # documents. >100,000 of lines.)
-            return True
-        elif value != original_value:
-            return True
-        return False
+            changed = True
+        else:
+            changed = value != original_value
+
+        if changed:
+            self._edited_working_lines.add(len(working_lines) - 1 - working_index)
+        return changed
 
     def _set_cursor_position(self, value: int) -> bool:
         """Set cursor position. Return whether it changed."""
@@ -527,6 +581,9 @@ class Buffer:
     def working_index(self, value: int) -> None:
         if self.__working_index != value:
             self.__working_index = value
+
+            if value < _HISTORY_READ_AHEAD:
+                self._load_more_history()
             # Make sure to reset the cursor position, otherwise we end up in
             # situations where the cursor position is out of the bounds of the
             # text.
@@ -640,12 +697,23 @@ class Buffer:
         Safe current state (input text and cursor position), so that we can
         restore it by calling undo.
         """
+        self._save_state_to_undo_stack(
+            self.text, self.cursor_position, clear_redo_stack=clear_redo_stack
+        )
+
+    def _save_state_to_undo_stack(
+        self, text: str, cursor_position: int, clear_redo_stack: bool = True
+    ) -> None:
+        """
+        Like `save_to_undo_stack`, but save the given state instead of the
+        current one.
+        """
         # Safe if the text is different from the text at the top of the stack
         # is different. If the text is the same, just update the cursor position.
-        if self._undo_stack and self._undo_stack[-1][0] == self.text:
-            self._undo_stack[-1] = (self._undo_stack[-1][0], self.cursor_position)
+        if self._undo_stack and self._undo_stack[-1][0] == text:
+            self._undo_stack[-1] = (self._undo_stack[-1][0], cursor_position)
         else:
-            self._undo_stack.append((self.text, self.cursor_position))
+            self._undo_stack.append((text, cursor_position))
 
         # Saving anything to the undo stack, clears the redo stack.
         if clear_redo_stack:
@@ -671,18 +739,106 @@ class Buffer:
 
         :returns: The new text.
         """
-        # Split lines
-        lines = self.text.split("\n")
-
-        # Apply transformation
-        for index in line_index_iterator:
-            try:
-                lines[index] = transform_callback(lines[index])
-            except IndexError:
-                pass
+        # Split lines. (Reuse the line list of the document, it's cached.)
+        lines = list(self.document.lines)
+
+        # Apply transformation. Contiguous ranges are done in one slice
+        # operation, rather than one index at the time.
+        if (
+            isinstance(line_index_iterator, range)
+            and line_index_iterator.step == 1
+            and line_index_iterator.start >= 0
+        ):
+            _transform_line_slice(
+                lines,
+                line_index_iterator.start,
+                line_index_iterator.stop,
+                transform_callback,
+            )
+        else:
+            for index in line_index_iterator:
+                try:
+                    lines[index] = transform_callback(lines[index])
+                except IndexError:
+                    pass
 
         return "\n".join(lines)
 
+    def transform_line_range(
+        self,
+        from_row: int,
+        to_row: int,
+        transform_callback: Callable[[str], str],
+        cursor_row: Optional[int] = None,
+        save_to_undo: bool = True,
+    ) -> None:
+        """
+        Apply `transform_callback` to the lines `from_row` (inclusive) until
+        `to_row` (exclusive) and set the result as the new document.
+
+        The affected lines are transformed in a single pass over the line list
+        of the document and the change is recorded as one undo step, which
+        makes this suitable for very large selections. (Vi `>`, commenting out
+        a region, ...)
+
+        :param cursor_row: Row on which the cursor is placed afterwards (at
+            the start of the line). Defaults to the current row.
+        :param save_to_undo: Save the current state to the undo stack first.
+        """
+        lines = _transform_line_slice(
+            list(self.document.lines), from_row, to_row, transform_callback
+        )
+        self._set_transformed_lines(lines, cursor_row, save_to_undo)
+
+    async def transform_line_range_async(
+        self,
+        from_row: int,
+        to_row: int,
+        transform_callback: Callable[[str], str],
+        cursor_row: Optional[int] = None,
+        save_to_undo: bool = True,
+    ) -> bool:
+        """
+        Like :meth:`.transform_line_range`, but run the transformation in a
+        worker thread, so that CPU intensive transformations don't block the
+        user interface.
+
+        When the text of the buffer changes while the transformation is
+        running, the result is discarded.
+
+        :returns: `True` when the transformation was applied.
+        """
+        original_text = self.text
+        lines = list(self.document.lines)
+
+        lines = await run_in_executor_with_context(
+            _transform_line_slice, lines, from_row, to_row, transform_callback
+        )
+
+        if self.text != original_text:
+            return False
+
+        self._set_transformed_lines(lines, cursor_row, save_to_undo)
+        return True
+
+    def _set_transformed_lines(
+        self, lines: List[str], cursor_row: Optional[int], save_to_undo: bool
+    ) -> None:
+        """
+        Set a new document from a list of lines, with the cursor at the start
+        of `cursor_row`.
+        """
+        if cursor_row is None:
+            cursor_row = self.document.cursor_position_row
+
+        cursor_row = max(0, min(cursor_row, len(lines) - 1))
+        cursor_position = sum(map(len, lines[:cursor_row])) + cursor_row
+
+        if save_to_undo:
+            self.save_to_undo_stack()
+
+        self.document = Document("\n".join(lines), cursor_position)
+
     def transform_current_line(self, transform_callback: Callable[[str], str]) -> None:
         """
         Apply the given transformation function to the current line.
@@ -850,11 +1006,12 @@ class Buffer:
 
         # Replace leading spaces with just one space.
         lines = [l.lstrip(" ") + separator for l in lines]
+        joined = "".join(lines)
 
         # Set new document.
         self.document = Document(
-            text=before + "".join(lines) + after,
-            cursor_position=len(before + "".join(lines[:-1])) - 1,
+            text=before + joined + after,
+            cursor_position=len(before) + sum(map(len, lines[:-1])) - 1,
         )
 
     def swap_characters_before_cursor(self) -> None:
@@ -949,38 +1106,87 @@ class Buffer:
         """
         Start a completion based on all the other lines in the document and the
         history.
+
+        The lines of the current input come first, followed by the lines of
+        history entries with unsaved edits, followed by the history lines,
+        most recent first. History lines come from the line index of the
+        history (see
+        :meth:`~quo.history.History.get_stripped_lines_starting_with`). They
+        are streamed into the completion menu in batches, rather than
+        collected all at once.
         """
         found_completions: Set[str] = set()
-        completions = []
+        document = self.document
+        working_lines = self._working_lines
+
+        # The history lines are looked up in the loaded history. Load the
+        # older entries as well. (Lines of entries that are loaded while the
+        # completion is streamed are picked up by the next completion.)
+        self._load_more_history(load_all=True)
 
         # For every line of the whole history, find matches with the current line.
-        current_line = self.document.current_line_before_cursor.lstrip()
+        current_line = document.current_line_before_cursor.lstrip()
 
-        for i, string in enumerate(self._working_lines):
-            for j, l in enumerate(string.split("\n")):
+        edited_lines = [
+            (l, "History %s, line %s" % (i + 1, j + 1))
+            for i in sorted(
+                (len(working_lines) - 1 - k for k in self._edited_working_lines),
+                reverse=True,
+            )
+            if i != self.working_index
+            for j, l in reversed(list(enumerate(working_lines[i].split("\n"))))
+        ]
+
+        def get_completions() -> Iterator[Completion]:
+            candidates = chain(
+                (
+                    (l, "Current, line %s" % (j + 1))
+                    for j, l in reversed(list(enumerate(document.lines)))
+                ),
+                edited_lines,
+                (
+                    (l, "History")
+                    for l in self.history.get_stripped_lines_starting_with(
+                        current_line
+                    )
+                ),
+            )
+
+            for l, display_meta in candidates:
                 l = l.strip()
                 if l and l.startswith(current_line):
                     # When a new line has been found.
                     if l not in found_completions:
                         found_completions.add(l)
 
-                        # Create completion.
-                        if i == self.working_index:
-                            display_meta = "Current, line %s" % (j + 1)
-                        else:
-                            display_meta = "History %s, line %s" % (i + 1, j + 1)
-
-                        completions.append(
-                            Completion(
-                                l,
-                                start_position=-len(current_line),
-                                display_meta=display_meta,
-                            )
+                        yield Completion(
+                            l,
+                            start_position=-len(current_line),
+                            display_meta=display_meta,
                         )
 
-        self._set_completions(completions=completions[::-1])
+        completions = get_completions()
+
+        complete_state = self._set_completions(
+            completions=list(islice(completions, _HISTORY_LINES_COMPLETION_BATCH))
+        )
         self.go_to_completion(0)
 
+        async def add_remaining_completions() -> None:
+            # Stop when the completion was cancelled or replaced.
+            while self.complete_state is complete_state:
+                await asyncio.sleep(0)
+
+                batch = list(islice(completions, _HISTORY_LINES_COMPLETION_BATCH))
+                if not batch:
+                    break
+
+                complete_state.completions.extend(batch)
+                self.on_completions_changed.fire()
+
+        if len(complete_state.completions) == _HISTORY_LINES_COMPLETION_BATCH:
+            get_app().create_background_task(add_remaining_completions())
+
     def go_to_completion(self, index: Optional[int]) -> None:
         """
         Select a completion from the list of current completions.
@@ -1011,6 +1217,17 @@ class Buffer:
         self.delete_before_cursor(-completion.start_position)
         self.insert_text(completion.text)
 
+    def _load_more_history(self, load_all: bool = False) -> None:
+        """
+        Wake up the history loader, so that it loads entries until the read
+        ahead is satisfied again. (Or all of them, when `load_all` is set.)
+        """
+        if load_all:
+            self._load_all_history = True
+
+        if self._more_history_needed is not None:
+            self._more_history_needed.set()
+
     def _set_history_search(self) -> None:
         """
         Set `history_search_text`.
@@ -1019,6 +1236,7 @@ class Buffer:
         if self.enable_history_search():
             if self.history_search_text is None:
                 self.history_search_text = self.document.text_before_cursor
+                self._load_more_history(load_all=True)
         else:
             self.history_search_text = None
 
@@ -1395,6 +1613,9 @@ class Buffer:
         """
         assert count > 0
 
+        # Searches look through the whole history.
+        self._load_more_history(load_all=True)
+
         text = search_state.text
         direction = search_state.direction
         ignore_case = search_state.ignore_case()
@@ -1734,15 +1955,78 @@ class Buffer:
                 while generating completions."""
                 return self.complete_state == complete_state
 
-            async for completion in self.completer.get_completions_async(
-                document, complete_event
-            ):
-                complete_state.completions.append(completion)
-                self.on_completions_changed.fire()
+            # Stop the completer when the completion state is reset, or when
+            # the time budget expires. (The state is checked in the next loop
+            # iteration, because `go_to_completion` resets it temporarily.)
+            loop = asyncio.get_event_loop()
+            stopped: "asyncio.Future[None]" = loop.create_future()
+
+            def stop() -> None:
+                complete_event.cancel()
+                if not stopped.done():
+                    stopped.set_result(None)
 
-                # If the input text changes, abort.
+            def check_proceed() -> None:
                 if not proceed():
-                    break
+                    stop()
+
+            def state_may_have_changed(_: object) -> None:
+                loop.call_soon(check_proceed)
+
+            timeout_handle: Optional[asyncio.TimerHandle] = None
+            if self.completion_timeout is not None:
+                complete_event.deadline = time.monotonic() + self.completion_timeout
+                timeout_handle = loop.call_later(self.completion_timeout, stop)
+
+            # Notify about new completions at most once per interval. (Every
+            # notification invalidates the UI.) When completions arrive within
+            # the interval, the notification is postponed.
+            last_notification = 0.0
+            scheduled_notification: Optional[asyncio.TimerHandle] = None
+
+            def notify() -> None:
+                nonlocal last_notification, scheduled_notification
+                scheduled_notification = None
+                last_notification = time.monotonic()
+
+                if proceed():
+                    self.on_completions_changed.fire()
+
+            batches = _until_done(
+                self.completer.get_completion_batches_async(document, complete_event),
+                stopped,
+            )
+            self.on_text_changed += state_may_have_changed
+            self.on_cursor_position_changed += state_may_have_changed
+
+            try:
+                async for completions in batches:
+                    complete_state.completions.extend(completions)
+
+                    if scheduled_notification is None:
+                        delay = _COMPLETIONS_CHANGED_INTERVAL - (
+                            time.monotonic() - last_notification
+                        )
+                        if delay <= 0:
+                            notify()
+                        else:
+                            scheduled_notification = loop.call_later(delay, notify)
+
+                    # If the input text changes, abort.
+                    if not proceed():
+                        break
+            finally:
+                self.on_text_changed -= state_may_have_changed
+                self.on_cursor_position_changed -= state_may_have_changed
+                if timeout_handle is not None:
+                    timeout_handle.cancel()
+                complete_event.cancel()
+                await batches.aclose()
+
+            # Deliver a postponed notification right away.
+            if scheduled_notification is not None:
+                scheduled_notification.cancel()
+                notify()
 
             completions = complete_state.completions
 
@@ -1835,6 +2119,10 @@ class Buffer:
             if self.suggestion or not self.auto_suggest:
                 return
 
+            # Suggestions are looked up in the loaded history, so make sure
+            # the older entries are loaded as well.
+            self._load_more_history(load_all=True)
+
             suggestion = await self.auto_suggest.get_suggestion_async(self, document)
 
             # Set suggestion only if the text was not yet changed.
@@ -1880,6 +2168,39 @@ class Buffer:
 
 
 _T = TypeVar("_T", bound=Callable[..., Awaitable[None]])
+_Item = TypeVar("_Item")
+
+
+async def _until_done(
+    generator: AsyncGenerator[_Item, None], done: "asyncio.Future[None]"
+) -> AsyncGenerator[_Item, None]:
+    """
+    Take items from the async `generator`, until the `done` future is set.
+    Waiting for the next item is cancelled at that point. (Which closes the
+    generator.)
+    """
+    next_item: "Optional[asyncio.Future[_Item]]" = None
+
+    try:
+        while not done.done():
+            next_item = asyncio.ensure_future(generator.__anext__())
+            waiting: Set["asyncio.Future[Any]"] = {next_item, done}
+            await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            if not next_item.done():
+                break
+
+            try:
+                item = next_item.result()
+            except StopAsyncIteration:
+                break
+
+            yield item
+    finally:
+        if next_item is not None and not next_item.done():
+            next_item.cancel()
+        else:
+            await generator.aclose()
 
 
 def _only_one_at_a_time(coroutine: _T) -> _T:
@@ -1924,14 +2245,10 @@ def indent(buffer: Buffer, from_row: int, to_row: int, count: int = 1) -> None:
     """
     Indent text of a :class:`.Buffer` object.
     """
-    current_row = buffer.document.cursor_position_row
-    line_range = range(from_row, to_row)
+    prefix = "    " * count
 
     # Apply transformation.
-    new_text = buffer.transform_lines(line_range, lambda l: "    " * count + l)
-    buffer.document = Document(
-        new_text, Document(new_text).translate_row_col_to_index(current_row, 0)
-    )
+    buffer.transform_line_range(from_row, to_row, lambda l: prefix + l)
 
     # Go to the start of the line.
     buffer.cursor_position += buffer.document.get_start_of_line_position(
@@ -1943,21 +2260,17 @@ def unindent(buffer: Buffer, from_row: int, to_row: int, count: int = 1) -> None
     """
     Unindent text of a :class:`.Buffer` object.
     """
-    current_row = buffer.document.cursor_position_row
-    line_range = range(from_row, to_row)
+    remove = "    " * count
+    remove_length = len(remove)
 
     def transform(text: str) -> str:
-        remove = "    " * count
         if text.startswith(remove):
-            return text[len(remove) :]
+            return text[remove_length:]
         else:
             return text.lstrip()
 
     # Apply transformation.
-    new_text = buffer.transform_lines(line_range, transform)
-    buffer.document = Document(
-        new_text, Document(new_text).translate_row_col_to_index(current_row, 0)
-    )
+    buffer.transform_line_range(from_row, to_row, transform)
 
     # Go to the start of the line.
     buffer.cursor_position += buffer.document.get_start_of_line_position(
@@ -2007,7 +2320,30 @@ def reshape_text(buffer: Buffer, from_row: int, to_row: int) -> None:
             reshaped_text.append("\n")
 
         # Apply result.
+        text_before = "".join(lines_before) + "".join(reshaped_text)
+        buffer.save_to_undo_stack()
         buffer.document = Document(
-            text="".join(lines_before + reshaped_text + lines_after),
-            cursor_position=len("".join(lines_before + reshaped_text)),
+            text=text_before + "".join(lines_after),
+            cursor_position=len(text_before),
         )
+
+
+def _transform_line_slice(
+    lines: List[str],
+    from_row: int,
+    to_row: int,
+    transform_callback: Callable[[str], str],
+) -> List[str]:
+    """
+    Apply `transform_callback` in place to `lines[from_row:to_row]`. Rows out
+    of range are skipped silently. Returns `lines`.
+    """
+    from_row = max(0, from_row)
+    to_row = min(len(lines), to_row)
+
+    if from_row < to_row:
+        lines[from_row:to_row] = [
+            transform_callback(l) for l in lines[from_row:to_row]
+        ]
+
+    return lines
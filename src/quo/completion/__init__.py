@@ -1,22 +1,33 @@
-from .core import (
-    CompleteEvent,
-#    CompleteStyle,
-    Completer,
-    Completion,
-    ConditionalCompleter,
-#    DummyCompleter,
-    DynamicCompleter,
-    ThreadedCompleter,
-#    get_common_complete_suffix,
-    merge_completers,
-)
+from typing import TYPE_CHECKING
+
+from quo.utils.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .auto_suggest import (
+        AutoSuggestFromHistory,
+        ConditionalAutoSuggest,
+        ThreadedAutoSuggest,
+    )
+    from .caching import CachingCompleter
+    from .core import (
+        CompleteEvent,
+        Completer,
+        Completion,
+        ConditionalCompleter,
+        DummyCompleter,
+        DynamicCompleter,
+        ThreadedCompleter,
+        get_common_complete_suffix,
+        merge_completers,
+        until_cancelled,
+    )
+    from .deduplicate import DeduplicateCompleter
+    from .filesystem import ExecutableCompleter, PathCompleter
+    from .fuzzy_completer import FuzzyCompleter, FuzzyWordCompleter
+    from .nested import NestedCompleter
+    from .process_pool import ProcessPoolCompleter
+    from .word_completer import WordCompleter
 
-from .deduplicate import DeduplicateCompleter
-from .filesystem import ExecutableCompleter, PathCompleter
-from .fuzzy_completer import FuzzyCompleter, FuzzyWordCompleter
-from .nested import NestedCompleter
-from .word_completer import WordCompleter
-from .auto_suggest import AutoSuggestFromHistory, ConditionalAutoSuggest,ThreadedAutoSuggest
 __all__ = [
     # Base.
     "Completion",
@@ -28,6 +39,7 @@ __all__ = [
     "ConditionalCompleter",
     "merge_completers",
     "get_common_complete_suffix",
+    "until_cancelled",
     # Filesystem.
     "PathCompleter",
     "ExecutableCompleter",
@@ -40,4 +52,47 @@ __all__ = [
     "WordCompleter",
     # Deduplicate
     "DeduplicateCompleter",
+    # Caching
+    "CachingCompleter",
+    # Process pool.
+    "ProcessPoolCompleter",
 ]
+
+# Imported on first use. (The process pool completer for instance, imports
+# `multiprocessing`, which most applications don't need.)
+__getattr__, __dir__ = lazy_attributes(
+    globals(),
+    {
+        # Base.
+        "Completion": ".core",
+        "Completer": ".core",
+        "ThreadedCompleter": ".core",
+        "DummyCompleter": ".core",
+        "DynamicCompleter": ".core",
+        "CompleteEvent": ".core",
+        "ConditionalCompleter": ".core",
+        "merge_completers": ".core",
+        "get_common_complete_suffix": ".core",
+        "until_cancelled": ".core",
+        # Filesystem.
+        "PathCompleter": ".filesystem",
+        "ExecutableCompleter": ".filesystem",
+        # Fuzzy
+        "FuzzyCompleter": ".fuzzy_completer",
+        "FuzzyWordCompleter": ".fuzzy_completer",
+        # Nested.
+        "NestedCompleter": ".nested",
+        # Word completer.
+        "WordCompleter": ".word_completer",
+        # Deduplicate
+        "DeduplicateCompleter": ".deduplicate",
+        # Caching
+        "CachingCompleter": ".caching",
+        # Process pool.
+        "ProcessPoolCompleter": ".process_pool",
+        # Auto suggestion.
+        "AutoSuggestFromHistory": ".auto_suggest",
+        "ConditionalAutoSuggest": ".auto_suggest",
+        "ThreadedAutoSuggest": ".auto_suggest",
+    },
+)
@@ -124,6 +124,11 @@ class DummyAutoSuggest(AutoSuggest):
 class AutoSuggestFromHistory(AutoSuggest):
     """
     Give suggestions based on the lines in the history.
+
+    Lookups go through the prefix index of the history (see
+    :meth:`~quo.history.History.find_line_starting_with`). Wrap it in a
+    :class:`.ThreadedAutoSuggest` to do the lookups (and index updates) in a
+    background thread.
     """
 
     def get_suggestion(
@@ -136,11 +141,10 @@ class AutoSuggestFromHistory(AutoSuggest):
 
         # Only create a suggestion when this is not an empty line.
         if text.strip():
-            # Find first matching line in history.
-            for string in reversed(list(history.get_strings())):
-                for line in reversed(string.splitlines()):
-                    if line.startswith(text):
-                        return Suggestion(line[len(text) :])
+            # Find the most recent matching line in history.
+            line = history.find_line_starting_with(text)
+            if line is not None:
+                return Suggestion(line[len(text) :])
 
         return None
 
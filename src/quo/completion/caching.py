@@ -0,0 +1,206 @@
+import re
+from typing import (
+    AsyncGenerator,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from quo.document import Document
+
+from .core import CompleteEvent, Completer, Completion
+
+__all__ = ["CachingCompleter"]
+
+_WORD_RE = re.compile(r"\w*")
+_WORD_RE_WORD = re.compile(r"\S*")
+
+
+class CachingCompleter(Completer):
+    """
+    Wrapper around a completer that remembers the completions of the previous
+    call. When the user types more characters, the new completions are a
+    subset of the previous ones: instead of calling the wrapped completer
+    again, the previous completions are filtered.
+
+    This applies when the text after the cursor didn't change, and the text
+    before the cursor only grew with word characters (or non-whitespace
+    characters, when `WORD` is set). Typing a separator calls the wrapped
+    completer again, because it can change the context of the completion.
+
+    The wrapped completer has to match the text before the cursor in the same
+    way as configured here: by prefix (the default) or anywhere in the
+    completion text (`match_middle`).
+
+    Completers whose data changes over time should either pass `get_version`,
+    or call :meth:`.invalidate` when the data changes.
+
+    :param completer: :class:`.Completer` instance.
+    :param ignore_case: Match case insensitive.
+    :param match_middle: Match when the text appears anywhere in the
+        completion, not only at the start.
+    :param WORD: When True, all non-whitespace characters narrow the
+        previous completions, not only word characters.
+    :param get_version: Callable that returns a (hashable) version token for
+        the data of the wrapped completer. The cache is dropped when it
+        changes.
+    """
+
+    def __init__(
+        self,
+        completer: Completer,
+        ignore_case: bool = False,
+        match_middle: bool = False,
+        WORD: bool = False,
+        get_version: Optional[Callable[[], Hashable]] = None,
+    ) -> None:
+
+        self.completer = completer
+        self.ignore_case = ignore_case
+        self.match_middle = match_middle
+        self.WORD = WORD
+        self.get_version = get_version
+
+        # (document, version, completions) of the last complete call.
+        self._cache: Optional[Tuple[Document, Hashable, List[Completion]]] = None
+
+    def invalidate(self) -> None:
+        """
+        Forget the cached completions. (Call this when the data of the wrapped
+        completer changes.)
+        """
+        self._cache = None
+
+    def get_completions(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> Iterable[Completion]:
+        version = self.get_version() if self.get_version else None
+        completions = self._get_cached(document, version)
+
+        if completions is not None:
+            return completions
+
+        return self._get_and_cache(document, complete_event, version)
+
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+        version = self.get_version() if self.get_version else None
+        completions = self._get_cached(document, version)
+
+        # Narrowed completions are handed over at once.
+        if completions is not None:
+            if completions:
+                yield completions
+            return
+
+        async for batch in super().get_completion_batches_async(
+            document, complete_event
+        ):
+            yield batch
+
+    def _get_cached(
+        self, document: Document, version: Hashable
+    ) -> Optional[List[Completion]]:
+        """
+        Return the cached completions, narrowed down for `document`, or `None`
+        when the cache doesn't apply.
+        """
+        cache = self._cache
+
+        if cache is not None and cache[1] == version:
+            typed = self._get_typed_text(cache[0], document)
+
+            if typed is not None:
+                completions = self._narrow(cache[2], typed, document)
+                self._cache = (document, version, completions)
+                return completions
+
+        return None
+
+    def _get_and_cache(
+        self, document: Document, complete_event: CompleteEvent, version: Hashable
+    ) -> Iterator[Completion]:
+        self._cache = None
+        completions: List[Completion] = []
+
+        for completion in self.completer.get_completions(document, complete_event):
+            completions.append(completion)
+            yield completion
+
+        # Only cache when all completions have been consumed.
+        self._cache = (document, version, completions)
+
+    def _get_typed_text(self, old: Document, new: Document) -> Optional[str]:
+        """
+        Return the text that was typed since the `old` document, or `None`
+        when the `new` document isn't a narrowing of the `old` one.
+        """
+        if old.text_after_cursor != new.text_after_cursor:
+            return None
+
+        old_before = old.text_before_cursor
+        new_before = new.text_before_cursor
+
+        if not new_before.startswith(old_before):
+            return None
+
+        typed = new_before[len(old_before) :]
+        pattern = _WORD_RE_WORD if self.WORD else _WORD_RE
+
+        if not pattern.fullmatch(typed):
+            return None
+
+        return typed
+
+    def _narrow(
+        self, completions: List[Completion], typed: str, document: Document
+    ) -> List[Completion]:
+        """
+        Keep the completions that still match, with their start position
+        moved back over the typed text.
+        """
+        if not typed:
+            return completions
+
+        text_before_cursor = document.text_before_cursor
+        result: List[Completion] = []
+
+        for c in completions:
+            start_position = c.start_position - len(typed)
+
+            if -start_position > len(text_before_cursor):
+                continue
+
+            word = text_before_cursor[len(text_before_cursor) + start_position :]
+            text = c.text
+
+            if self.ignore_case:
+                word = word.lower()
+                text = text.lower()
+
+            if self.match_middle:
+                matches = word in text
+            else:
+                matches = text.startswith(word)
+
+            if matches:
+                result.append(
+                    Completion(
+                        c.text,
+                        start_position=start_position,
+                        display=c.display,
+                        display_meta=c._display_meta,
+                        style=c.style,
+                        selected_style=c.selected_style,
+                    )
+                )
+
+        return result
+
+    def __repr__(self) -> str:
+        return "CachingCompleter(%r)" % (self.completer,)
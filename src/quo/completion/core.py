@@ -1,11 +1,21 @@
 """
 """
+import time
 from abc import ABCMeta, abstractmethod
 from enum import Enum
-from typing import AsyncGenerator, Callable, Iterable, Optional, Sequence
+from itertools import islice
+from typing import (
+    AsyncGenerator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
 
 from quo.document import Document
-from quo.eventloop import generator_to_async_generator
+from quo.eventloop import generator_to_async_batches, generator_to_async_generator
 from quo.filters import FilterOrBool, to_filter
 from quo.text.core import AnyFormattedText, StyleAndTextTuples
 
@@ -19,8 +29,13 @@ __all__ = [
     "ConditionalCompleter",
     "merge_completers",
     "get_common_complete_suffix",
+    "until_cancelled",
 ]
 
+# Number of completions that are taken at once from a completer that only
+# implements `get_completions`. (The cancellation is checked in between.)
+_COMPLETION_BATCH_SIZE = 1000
+
 
 class Completion:
     """
@@ -153,6 +168,12 @@ class CompleteEvent:
     shows some completions when ``Tab`` has been pressed, but not
     automatically when the user presses a space. (Because of
     `complete_while_typing`.)
+
+    The event is also a cancellation token. It is cancelled when the
+    completions are no longer needed (the input changed), or when the time
+    budget of the `Buffer` expires. Slow completers should check
+    :attr:`.cancelled` regularly and stop when it becomes True. (This is safe
+    from other threads.)
     """
 
     def __init__(
@@ -166,6 +187,27 @@ class CompleteEvent:
         #: Used explicitly requested completion by pressing 'tab'.
         self.completion_requested = completion_requested
 
+        #: Time (according to `time.monotonic`) after which the completions
+        #: are no longer taken, or `None`.
+        self.deadline: Optional[float] = None
+
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        True when the completer should stop producing completions.
+        """
+        return self._cancelled or (
+            self.deadline is not None and time.monotonic() >= self.deadline
+        )
+
+    def cancel(self) -> None:
+        """
+        Tell the completer to stop.
+        """
+        self._cancelled = True
+
     def __repr__(self) -> str:
         return "%s(text_inserted=%r, completion_requested=%r)" % (
             self.__class__.__name__,
@@ -210,6 +252,33 @@ class Completer(metaclass=ABCMeta):
         for item in self.get_completions(document, complete_event):
             yield item
 
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+        """
+        Asynchronous generator of lists of completions. This is what the
+        `Buffer` consumes.
+
+        Completers that produce many completions at once can override this to
+        hand them over in one step. By default, every completion of
+        :meth:`.get_completions_async` is yielded in a list of its own, unless
+        only :meth:`.get_completions` is implemented. Then, the completions
+        are yielded in chunks, and the completer stops when the event is
+        cancelled.
+        """
+        if type(self).get_completions_async is Completer.get_completions_async:
+            completions = iter(self.get_completions(document, complete_event))
+
+            while not complete_event.cancelled:
+                batch = list(islice(completions, _COMPLETION_BATCH_SIZE))
+                if batch:
+                    yield batch
+                if len(batch) < _COMPLETION_BATCH_SIZE:
+                    break
+        else:
+            async for item in self.get_completions_async(document, complete_event):
+                yield [item]
+
 
 class ThreadedCompleter(Completer):
     """
@@ -237,14 +306,46 @@ class ThreadedCompleter(Completer):
         Asynchronous generator of completions.
         """
         async for completion in generator_to_async_generator(
-            lambda: self.completer.get_completions(document, complete_event)
+            lambda: until_cancelled(
+                self.completer.get_completions(document, complete_event),
+                complete_event,
+            )
         ):
             yield completion
 
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+        """
+        Asynchronous generator of lists of completions. Every list contains
+        all the completions that were produced since the previous one.
+        """
+        async for completions in generator_to_async_batches(
+            lambda: until_cancelled(
+                self.completer.get_completions(document, complete_event),
+                complete_event,
+            )
+        ):
+            yield completions
+
     def __repr__(self) -> str:
         return "ThreadedCompleter(%r)" % (self.completer,)
 
 
+def until_cancelled(
+    completions: Iterable[Completion], complete_event: CompleteEvent
+) -> Iterator[Completion]:
+    """
+    Take completions from `completions`, until `complete_event` is cancelled.
+    (This stops the background thread of a threaded completer after the
+    current completion.)
+    """
+    for completion in completions:
+        if complete_event.cancelled:
+            break
+        yield completion
+
+
 class DummyCompleter(Completer):
     """
     A completer that doesn't return any completion.
@@ -285,6 +386,16 @@ class DynamicCompleter(Completer):
         ):
             yield completion
 
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+        completer = self.get_completer() or DummyCompleter()
+
+        async for completions in completer.get_completion_batches_async(
+            document, complete_event
+        ):
+            yield completions
+
     def __repr__(self) -> str:
         return "DynamicCompleter(%r -> %r)" % (self.get_completer, self.get_completer())
 
@@ -324,6 +435,16 @@ class ConditionalCompleter(Completer):
             ):
                 yield item
 
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+
+        if self.filter():
+            async for completions in self.completer.get_completion_batches_async(
+                document, complete_event
+            ):
+                yield completions
+
 
 class _MergedCompleter(Completer):
     """
@@ -350,6 +471,16 @@ class _MergedCompleter(Completer):
             async for item in completer.get_completions_async(document, complete_event):
                 yield item
 
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+
+        for completer in self.completers:
+            async for completions in completer.get_completion_batches_async(
+                document, complete_event
+            ):
+                yield completions
+
 
 def merge_completers(
     completers: Sequence[Completer], deduplicate: bool = False
@@ -1,8 +1,23 @@
+import heapq
 import os
-from typing import Callable, Iterable, List, Optional
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import (
+    AsyncGenerator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
-from quo.completion import CompleteEvent, Completer, Completion
+from quo.completion import CompleteEvent, Completer, Completion, until_cancelled
 from quo.document import Document
+from quo.eventloop import generator_to_async_batches, generator_to_async_generator
 
 __all__ = [
     "PathCompleter",
@@ -10,10 +25,100 @@ __all__ = [
 ]
 
 
+class _DirectoryListing(NamedTuple):
+    """
+    Sorted content of a directory, and the modification time of the directory
+    at the time it was listed.
+    """
+
+    mtime: int
+    names: List[str]
+    is_dir: List[bool]
+
+
+class _DirectoryCache:
+    """
+    Cache of directory listings. A listing is reused as long as the
+    modification time of the directory doesn't change, so that a keystroke
+    costs one `stat` call per directory instead of a full listing.
+
+    :param size: Maximum number of directories to keep.
+    """
+
+    def __init__(self, size: int = 64) -> None:
+        self.size = size
+        self._listings: "OrderedDict[str, _DirectoryListing]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, directory: str) -> Optional[_DirectoryListing]:
+        """
+        Return the listing of `directory`, or `None` when it's not a
+        directory.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+        with self._lock:
+            listing = self._listings.get(directory)
+            if listing is not None and listing.mtime == mtime:
+                self._listings.move_to_end(directory)
+                return listing
+
+        try:
+            # `DirEntry.is_dir` doesn't need an extra system call on most
+            # platforms.
+            with os.scandir(directory) as it:
+                entries = sorted((e.name, _is_dir(e)) for e in it)
+        except OSError:
+            return None
+
+        listing = _DirectoryListing(
+            mtime, [name for name, _ in entries], [d for _, d in entries]
+        )
+
+        with self._lock:
+            self._listings[directory] = listing
+            self._listings.move_to_end(directory)
+            while len(self._listings) > self.size:
+                self._listings.popitem(last=False)
+
+        return listing
+
+
+def _is_dir(entry: "os.DirEntry[str]") -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+# (filename, directory, is_dir)
+_Match = Tuple[str, str, bool]
+
+
+def _matches(
+    listing: _DirectoryListing, directory: str, prefix: str
+) -> Iterator[_Match]:
+    "Yield the entries of the listing starting with `prefix`, sorted."
+    names = listing.names
+    i = bisect_left(names, prefix)
+
+    while i < len(names) and names[i].startswith(prefix):
+        yield names[i], directory, listing.is_dir[i]
+        i += 1
+
+
 class PathCompleter(Completer):
     """
     Complete for Path variables.
 
+    Directory listings are cached, keyed by path and modification time of the
+    directory. When used asynchronously, the completions are generated in a
+    background thread, so that slow (network) file systems don't block the
+    user interface.
+
     :param get_paths: Callable which returns a list of directories to look into
                       when the user enters a relative path.
     :param file_filter: Callable which takes a filename and returns whether
@@ -37,6 +142,8 @@ class PathCompleter(Completer):
         self.min_input_len = min_input_len
         self.expanduser = expanduser
 
+        self._directory_cache = _DirectoryCache()
+
     def get_completions(
         self, document: Document, complete_event: CompleteEvent
     ) -> Iterable[Completion]:
@@ -65,49 +172,160 @@ class PathCompleter(Completer):
             # Start of current file.
             prefix = os.path.basename(text)
 
-            # Get all filenames.
-            filenames = []
+            # Get all filenames, sorted.
+            matches: List[Iterator[_Match]] = []
             for directory in directories:
-                # Look for matches in this directory.
-                if os.path.isdir(directory):
-                    for filename in os.listdir(directory):
-                        if filename.startswith(prefix):
-                            filenames.append((directory, filename))
-
-            # Sort
-            filenames = sorted(filenames, key=lambda k: k[1])
-
-            # Yield them.
-            for directory, filename in filenames:
-                completion = filename[len(prefix) :]
-                full_name = os.path.join(directory, filename)
-
-                if os.path.isdir(full_name):
-                    # For directories, add a slash to the filename.
-                    # (We don't add them to the `completion`. Users can type it
-                    # to trigger the autocompletion themselves.)
-                    filename += "/"
-                elif self.only_directories:
-                    continue
-
-                if not self.file_filter(full_name):
-                    continue
-
-                yield Completion(completion, 0, display=filename)
+                listing = self._directory_cache.get(directory)
+                if listing is not None:
+                    matches.append(_matches(listing, directory, prefix))
+
+            yield from self._create_completions(
+                heapq.merge(*matches, key=lambda m: m[0]), prefix
+            )
         except OSError:
             pass
 
+    def _create_completions(
+        self, matches: Iterable[_Match], prefix: str
+    ) -> Iterator[Completion]:
+        for filename, directory, is_dir in matches:
+            completion = filename[len(prefix) :]
+            full_name = os.path.join(directory, filename)
+
+            if is_dir:
+                # For directories, add a slash to the filename.
+                # (We don't add them to the `completion`. Users can type it
+                # to trigger the autocompletion themselves.)
+                filename += "/"
+            elif self.only_directories:
+                continue
+
+            if not self.file_filter(full_name):
+                continue
+
+            yield Completion(completion, 0, display=filename)
+
+    async def get_completions_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[Completion, None]:
+        """
+        Generate the completions in a background thread.
+        """
+        async for completion in generator_to_async_generator(
+            lambda: until_cancelled(
+                self.get_completions(document, complete_event), complete_event
+            )
+        ):
+            yield completion
+
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+        async for completions in generator_to_async_batches(
+            lambda: until_cancelled(
+                self.get_completions(document, complete_event), complete_event
+            )
+        ):
+            yield completions
+
 
 class ExecutableCompleter(PathCompleter):
     """
     Complete only executable files in the current path.
+
+    Commands without a directory part are looked up in an index of all the
+    executables on the ``PATH``. It's built in a background thread, and
+    refreshed (at most every `refresh_interval` seconds) when ``PATH`` or one
+    of its directories changes. Until the index is ready, only the entries
+    starting with the command are checked, like :class:`.PathCompleter` does.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, refresh_interval: float = 5.0) -> None:
         super().__init__(
             only_directories=False,
             min_input_len=1,
             get_paths=lambda: os.environ.get("PATH", "").split(os.pathsep),
             file_filter=lambda name: os.access(name, os.X_OK),
             expanduser=True,
-        ),
+        )
+        self.refresh_interval = refresh_interval
+
+        # (PATH, modification times of its directories, sorted executables)
+        self._index: Optional[Tuple[str, List[Optional[int]], List[_Match]]] = None
+        self._index_lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def get_completions(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> Iterable[Completion]:
+        text = document.text_before_cursor
+
+        if len(text) < self.min_input_len:
+            return []
+
+        text = os.path.expanduser(text)
+
+        if os.path.dirname(text):
+            return super().get_completions(document, complete_event)
+
+        index = self._get_index()
+        if index is None:
+            # Still building the index.
+            return super().get_completions(document, complete_event)
+
+        return self._get_executable_completions(index, text)
+
+    def _get_executable_completions(
+        self, index: List[_Match], prefix: str
+    ) -> Iterator[Completion]:
+        i = bisect_left(index, (prefix,))
+        while i < len(index) and index[i][0].startswith(prefix):
+            filename, directory, is_dir = index[i]
+            yield Completion(
+                filename[len(prefix) :],
+                0,
+                display=filename + "/" if is_dir else filename,
+            )
+            i += 1
+
+    def _get_index(self) -> Optional[List[_Match]]:
+        """
+        Return the executables index, or `None` when it's not built yet.
+        (Building and refreshing happens in the background.)
+        """
+        index = self._index
+        stale = time.monotonic() - self._last_refresh > self.refresh_interval
+
+        if index is None or stale:
+            thread = self._refresh_thread
+            if thread is None or not thread.is_alive():
+                self._last_refresh = time.monotonic()
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_index, daemon=True
+                )
+                self._refresh_thread.start()
+
+        return None if index is None else index[2]
+
+    def _refresh_index(self) -> None:
+        with self._index_lock:
+            path = os.environ.get("PATH", "")
+            directories = path.split(os.pathsep)
+            listings = [self._directory_cache.get(d) for d in directories]
+            mtimes = [l.mtime if l is not None else None for l in listings]
+
+            index = self._index
+            if index is None or index[0] != path or index[1] != mtimes:
+                executables = [
+                    (name, directory, is_dir)
+                    for directory, listing in zip(directories, listings)
+                    if listing is not None
+                    for name, is_dir in zip(listing.names, listing.is_dir)
+                    if os.access(os.path.join(directory, name), os.X_OK)
+                ]
+                # Stable sort: on equal names, the `PATH` order is kept.
+                executables.sort(key=lambda m: m[0])
+                self._index = (path, mtimes, executables)
+
+            self._last_refresh = time.monotonic()
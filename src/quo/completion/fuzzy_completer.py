@@ -1,5 +1,17 @@
+import heapq
 import re
-from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from itertools import islice
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from quo.document import Document
 from quo.filters import FilterOrBool, to_filter
@@ -24,16 +36,23 @@ class FuzzyCompleter(Completer):
     the others, because they match the regular expression 'o.*a.*r'.
     Similar, in another application "djm" could expand to "django_migrations".
 
-    The results are sorted by relevance, which is defined as the start position
-    and the length of the match.
+    The results are sorted by relevance. (See the scoring below.)
 
     Notice that this is not really a tool to work around spelling mistakes,
     like what would be possible with difflib. The purpose is rather to have a
     quicker or more intuitive way to filter the given completions, especially
     when many completions have a common prefix.
 
-    Fuzzy algorithm is based on this post:
-    https://blog.amjith.com/fuzzyfinder-in-10-lines-of-python
+    Matching and scoring is similar to fzf: candidates are first rejected
+    cheaply using a bitmask of the characters they contain, then the shortest
+    window containing the input characters in order is located. Matches are
+    scored with bonuses for characters at word boundaries, camelCase humps,
+    consecutive characters and exact case, and penalties for gaps.
+
+    The wrapped completer is called on every keystroke. When that's
+    expensive and its data doesn't change while typing a word, wrap it in a
+    :class:`.CachingCompleter`: it's always called with the text before the
+    word, so the cached completions are reused until the word changes.
 
     :param completer: A :class:`~.Completer` instance.
     :param WORD: When True, use WORD characters.
@@ -41,6 +60,8 @@ class FuzzyCompleter(Completer):
         cursor that are considered for the fuzzy matching.
     :param enable_fuzzy: (bool or `Filter`) Enabled the fuzzy behavior. For
         easily turning fuzzyness on or off according to a certain condition.
+    :param max_results: When given, only the best `max_results` matches are
+        returned. (Selected with a heap, rather than sorting all matches.)
     """
 
     def __init__(
@@ -49,6 +70,7 @@ class FuzzyCompleter(Completer):
         WORD: bool = False,
         pattern: Optional[str] = None,
         enable_fuzzy: FilterOrBool = True,
+        max_results: Optional[int] = None,
     ):
 
         assert pattern is None or pattern.startswith("^")
@@ -58,6 +80,11 @@ class FuzzyCompleter(Completer):
         self.WORD = WORD
         self.pattern = pattern
         self.enable_fuzzy = to_filter(enable_fuzzy)
+        self.max_results = max_results
+
+        # Lowercase text and character mask of candidates, reused across
+        # keystrokes. (Maps completion text to `_Candidate`.)
+        self._candidates: Dict[str, _Candidate] = {}
 
     def get_completions(
         self, document: Document, complete_event: CompleteEvent
@@ -88,27 +115,30 @@ class FuzzyCompleter(Completer):
             cursor_position=document.cursor_position - len(word_before_cursor),
         )
 
-        completions = list(self.completer.get_completions(document2, complete_event))
+        completions = self.completer.get_completions(document2, complete_event)
+        fuzzy_matches: Iterable[_FuzzyMatch]
 
-        fuzzy_matches: List[_FuzzyMatch] = []
+        if word_before_cursor:
+            matcher = _FuzzyMatcher(word_before_cursor, self._candidates)
+            matches = list(matcher.match_all(completions))
 
-        pat = ".*?".join(map(re.escape, word_before_cursor))
-        pat = "(?=({0}))".format(pat)  # lookahead regex to manage overlapping matches
-        regex = re.compile(pat, re.IGNORECASE)
-        for compl in completions:
-            matches = list(regex.finditer(compl.text))
-            if matches:
-                # Prefer the match, closest to the left, then shortest.
-                best = min(matches, key=lambda m: (m.start(), len(m.group(1))))
-                fuzzy_matches.append(
-                    _FuzzyMatch(len(best.group(1)), best.start(), compl)
+            def sort_key(fuzzy_match: "_FuzzyMatch") -> Tuple[int, int, int]:
+                "Sort by score, then by start position and text length."
+                return (
+                    -fuzzy_match.score,
+                    fuzzy_match.start_pos,
+                    len(fuzzy_match.completion.text),
                 )
 
-        def sort_key(fuzzy_match: "_FuzzyMatch") -> Tuple[int, int]:
-            "Sort by start position, then by the length of the match."
-            return fuzzy_match.start_pos, fuzzy_match.match_length
-
-        fuzzy_matches = sorted(fuzzy_matches, key=sort_key)
+            if self.max_results is None:
+                fuzzy_matches = sorted(matches, key=sort_key)
+            else:
+                fuzzy_matches = heapq.nsmallest(self.max_results, matches, key=sort_key)
+        else:
+            # No input text: everything matches, keep the original order.
+            fuzzy_matches = (_FuzzyMatch(0, 0, compl, 0) for compl in completions)
+            if self.max_results is not None:
+                fuzzy_matches = islice(fuzzy_matches, self.max_results)
 
         for match in fuzzy_matches:
             # Include these completions, but set the correct `display`
@@ -197,5 +227,142 @@ class FuzzyWordCompleter(Completer):
 
 _FuzzyMatch = NamedTuple(
     "_FuzzyMatch",
-    [("match_length", int), ("start_pos", int), ("completion", Completion)],
+    [
+        ("match_length", int),
+        ("start_pos", int),
+        ("completion", Completion),
+        ("score", int),
+    ],
 )
+
+# Lowercase text and character mask of a candidate.
+_Candidate = Tuple[str, int]
+
+# Maximum number of candidates `FuzzyCompleter` keeps in its cache.
+_MAX_CACHED_CANDIDATES = 500000
+
+# Scoring. (Roughly the values used by fzf.)
+_SCORE_MATCH = 16
+_BONUS_BOUNDARY = 8
+_BONUS_CAMEL = 7
+_BONUS_CONSECUTIVE = 4
+_BONUS_CASE = 1
+_PENALTY_GAP_START = 3
+_PENALTY_GAP_EXTENSION = 1
+
+
+class _CharBits(Dict[str, int]):
+    "Maps characters to a bit: `1 << (ord(c) % 64)`."
+
+    def __missing__(self, c: str) -> int:
+        result = self[c] = 1 << (ord(c) & 63)
+        return result
+
+
+_char_bits = _CharBits()
+
+
+def _char_mask(text: str) -> int:
+    "Bitmask with a bit set for every character (modulo 64) in `text`."
+    # (Summing the distinct bits is the same as or-ing them.)
+    return sum(set(map(_char_bits.__getitem__, text)))
+
+
+def _lower(text: str) -> str:
+    """
+    Lowercase `text`, character by character. (`str.lower` can change the
+    length of the string, which would break the match positions.)
+    """
+    lower = text.lower()
+    if len(lower) == len(text):
+        return lower
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class _FuzzyMatcher:
+    """
+    Match and score completions against the text before the cursor.
+
+    :param word: The text to be matched.
+    :param candidates: Cache of `_Candidate` tuples, keyed by completion text.
+    """
+
+    def __init__(self, word: str, candidates: Dict[str, _Candidate]) -> None:
+        self.word = word
+        self.word_lower = _lower(word)
+        self.mask = _char_mask(self.word_lower)
+        self.candidates = candidates
+
+    def match_all(self, completions: Iterable[Completion]) -> Iterator[_FuzzyMatch]:
+        """
+        Yield a `_FuzzyMatch` for every completion that matches.
+        """
+        candidates = self.candidates
+        word = self.word_lower
+        word_mask = self.mask
+        first, rest, rest_reversed = word[0], word[1:], word[-2::-1]
+
+        for completion in completions:
+            text = completion.text
+
+            try:
+                lower, mask = candidates[text]
+            except KeyError:
+                if len(candidates) >= _MAX_CACHED_CANDIDATES:
+                    candidates.clear()
+
+                lower = _lower(text)
+                mask = _char_mask(lower)
+                candidates[text] = (lower, mask)
+
+            # Prefilter: all characters have to be present.
+            if mask & word_mask != word_mask:
+                continue
+
+            # Forward scan: find the end of the first match.
+            start = pos = lower.find(first)
+            if pos < 0:
+                continue
+
+            for c in rest:
+                pos = lower.find(c, pos + 1)
+                if pos < 0:
+                    break
+            else:
+                end = pos
+
+                # Backward scan: find the shortest match that ends there.
+                for c in rest_reversed:
+                    pos = lower.rfind(c, start, pos)
+
+                yield _FuzzyMatch(
+                    end - pos + 1, pos, completion, self._score(text, lower, pos)
+                )
+
+    def _score(self, text: str, lower: str, start: int) -> int:
+        score = 0
+        previous = -1
+
+        for i, c in enumerate(self.word_lower):
+            pos = lower.find(c, previous + 1 if previous >= 0 else start)
+            score += _SCORE_MATCH
+
+            if pos == 0 or not text[pos - 1].isalnum():
+                score += _BONUS_BOUNDARY
+            elif text[pos - 1].islower() and text[pos].isupper():
+                score += _BONUS_CAMEL
+
+            if previous >= 0:
+                if pos == previous + 1:
+                    score += _BONUS_CONSECUTIVE
+                else:
+                    score -= _PENALTY_GAP_START + _PENALTY_GAP_EXTENSION * (
+                        pos - previous - 2
+                    )
+
+            if text[pos] == self.word[i]:
+                score += _BONUS_CASE
+
+            previous = pos
+
+        return score
@@ -0,0 +1,379 @@
+"""
+Completer that runs in worker processes.
+"""
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from quo.document import Document
+from quo.text.core import StyleAndTextTuples
+
+from .core import CompleteEvent, Completer, Completion
+
+__all__ = ["ProcessPoolCompleter"]
+
+# Maximum number of completions that a worker sends at once.
+_BATCH_SIZE = 500
+
+# Maximum time in seconds that a worker holds back completions before sending
+# them. (About one frame.)
+_FLUSH_INTERVAL = 1 / 60
+
+# Number of slots in the shared array of cancelled requests. A request is
+# cancelled when its slot (`request_id % _CANCELLATION_SLOTS`) holds its ID.
+_CANCELLATION_SLOTS = 1024
+
+# (text, start_position, display, display_meta, style, selected_style)
+_SerializedCompletion = Tuple[
+    str,
+    int,
+    Optional[StyleAndTextTuples],
+    Optional[StyleAndTextTuples],
+    str,
+    str,
+]
+
+# What a worker sends for a request: a list of completions, an exception, or
+# `None` when it's done.
+_Payload = Union[List[_SerializedCompletion], BaseException, None]
+
+
+class ProcessPoolCompleter(Completer):
+    """
+    Wrapper that runs a completer in worker processes.
+
+    Use this for CPU-bound completers (for instance fuzzy ranking of a huge
+    list), which would otherwise compete with the user interface for the GIL,
+    even in a :class:`.ThreadedCompleter`.
+
+    The completer is created once in every worker, by calling
+    ``create_completer(*args)``, so that its data stays resident in the
+    worker. Both have to be picklable: `create_completer` is typically a class
+    or a module level function. For every request, only the text and cursor
+    position are sent to the worker. The completions stream back in batches.
+
+    The worker processes are started on first use (with the "forkserver"
+    start method where available, otherwise "spawn": forking a process that
+    runs threads isn't safe). Call :meth:`.shutdown` to stop them.
+
+    :param create_completer: Callable that returns the :class:`.Completer`.
+    :param args: Arguments for `create_completer`.
+    :param max_workers: Number of worker processes.
+    """
+
+    def __init__(
+        self,
+        create_completer: Callable[..., Completer],
+        args: Sequence[Any] = (),
+        max_workers: int = 1,
+    ) -> None:
+
+        self.create_completer = create_completer
+        self.args = tuple(args)
+        self.max_workers = max_workers
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._results: Any = None  # `multiprocessing.Queue`.
+        self._cancelled: Any = None  # `multiprocessing.Array`.
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+
+        # Maps request IDs to callbacks that receive the payloads.
+        self._requests: Dict[int, Callable[[_Payload], None]] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        "Start the worker processes, if that didn't happen yet."
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(_get_start_method())
+                self._results = context.Queue()
+                self._cancelled = context.Array("q", _CANCELLATION_SLOTS, lock=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(
+                        self.create_completer,
+                        self.args,
+                        self._results,
+                        self._cancelled,
+                    ),
+                )
+                threading.Thread(
+                    target=self._read_results, args=(self._results,), daemon=True
+                ).start()
+
+            return self._executor
+
+    def _read_results(self, results: Any) -> None:
+        "Dispatch the payloads from the workers. (In a background thread.)"
+        while True:
+            item = results.get()
+            if item is None:
+                return
+
+            request_id, payload = item
+            self._deliver(request_id, payload)
+
+    def _deliver(self, request_id: int, payload: _Payload) -> None:
+        with self._lock:
+            callback = self._requests.get(request_id)
+            if payload is None:
+                self._requests.pop(request_id, None)
+
+        if callback is not None:
+            callback(payload)
+
+    def _submit(
+        self,
+        document: Document,
+        complete_event: CompleteEvent,
+        callback: Callable[[_Payload], None],
+    ) -> int:
+        """
+        Send a request to the workers. `callback` is called (from another
+        thread) for every payload.
+        """
+        executor = self._get_executor()
+        request_id = next(self._request_ids)
+
+        with self._lock:
+            self._requests[request_id] = callback
+
+        def done(future: "Future[None]") -> None:
+            # Only happens when the pool is broken. (Workers don't raise.)
+            if not future.cancelled() and future.exception() is not None:
+                self._deliver(request_id, future.exception())
+                self._deliver(request_id, None)
+
+        executor.submit(
+            _complete,
+            request_id,
+            document.text,
+            document.cursor_position,
+            complete_event.text_inserted,
+            complete_event.completion_requested,
+            complete_event.deadline,
+        ).add_done_callback(done)
+
+        return request_id
+
+    def _cancel(self, request_id: int) -> None:
+        """
+        Stop the given request, unless it's finished.
+        """
+        with self._lock:
+            if self._requests.pop(request_id, None) is not None:
+                self._cancelled[request_id % _CANCELLATION_SLOTS] = request_id
+
+    def get_completions(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> Iterable[Completion]:
+        payloads: "queue.Queue[_Payload]" = queue.Queue()
+        request_id = self._submit(document, complete_event, payloads.put)
+
+        try:
+            while True:
+                payload = payloads.get()
+                if payload is None:
+                    return
+                if isinstance(payload, BaseException):
+                    raise payload
+
+                yield from _deserialize(payload)
+        finally:
+            self._cancel(request_id)
+
+    async def get_completions_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[Completion, None]:
+        async for completions in self.get_completion_batches_async(
+            document, complete_event
+        ):
+            for completion in completions:
+                yield completion
+
+    async def get_completion_batches_async(
+        self, document: Document, complete_event: CompleteEvent
+    ) -> AsyncGenerator[List[Completion], None]:
+        loop = asyncio.get_event_loop()
+        payloads: "asyncio.Queue[_Payload]" = asyncio.Queue()
+
+        def callback(payload: _Payload) -> None:
+            loop.call_soon_threadsafe(payloads.put_nowait, payload)
+
+        request_id = self._submit(document, complete_event, callback)
+
+        try:
+            while True:
+                payload = await payloads.get()
+                if payload is None:
+                    return
+                if isinstance(payload, BaseException):
+                    raise payload
+
+                yield list(_deserialize(payload))
+        finally:
+            self._cancel(request_id)
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes. (They are started again when needed.)
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            results = self._results
+            requests, self._requests = self._requests, {}
+
+            for request_id in requests:
+                self._cancelled[request_id % _CANCELLATION_SLOTS] = request_id
+
+        # End the pending requests, so that nobody waits for them.
+        for callback in requests.values():
+            callback(None)
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+            results.put(None)
+
+    def __repr__(self) -> str:
+        return "ProcessPoolCompleter(%r)" % (self.create_completer,)
+
+
+def _serialize(completion: Completion) -> _SerializedCompletion:
+    display: Optional[StyleAndTextTuples] = [
+        (fragment[0], fragment[1]) for fragment in completion.display
+    ]
+    if display == [("", completion.text)]:
+        display = None
+
+    display_meta: Optional[StyleAndTextTuples] = None
+    if completion._display_meta:
+        display_meta = [
+            (fragment[0], fragment[1]) for fragment in completion.display_meta
+        ]
+
+    return (
+        completion.text,
+        completion.start_position,
+        display,
+        display_meta,
+        completion.style,
+        completion.selected_style,
+    )
+
+
+def _deserialize(completions: List[_SerializedCompletion]) -> Iterator[Completion]:
+    for completion in completions:
+        text, start_position, display, display_meta, style, selected_style = completion
+
+        yield Completion(
+            text,
+            start_position,
+            display=display,
+            display_meta=display_meta,
+            style=style,
+            selected_style=selected_style,
+        )
+
+
+def _get_start_method() -> str:
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return "forkserver"
+    return "spawn"
+
+
+# State of a worker process.
+_worker_completer: Optional[Completer] = None
+_worker_results: Any = None
+_worker_cancelled: Any = None
+
+
+def _init_worker(
+    create_completer: Callable[..., Completer],
+    args: Tuple[Any, ...],
+    results: Any,
+    cancelled: Any,
+) -> None:
+    global _worker_completer, _worker_results, _worker_cancelled
+
+    _worker_completer = create_completer(*args)
+    _worker_results = results
+    _worker_cancelled = cancelled
+
+
+class _WorkerCompleteEvent(CompleteEvent):
+    """
+    `CompleteEvent` in a worker, which is cancelled by the main process.
+    """
+
+    def __init__(
+        self, request_id: int, text_inserted: bool, completion_requested: bool
+    ) -> None:
+        super().__init__(text_inserted, completion_requested)
+        self.request_id = request_id
+
+    @property
+    def cancelled(self) -> bool:
+        return super().cancelled or (
+            _worker_cancelled[self.request_id % _CANCELLATION_SLOTS] == self.request_id
+        )
+
+
+def _complete(
+    request_id: int,
+    text: str,
+    cursor_position: int,
+    text_inserted: bool,
+    completion_requested: bool,
+    deadline: Optional[float],
+) -> None:
+    "Handle a request. (Runs in a worker process.)"
+    assert _worker_completer is not None
+
+    complete_event = _WorkerCompleteEvent(
+        request_id, text_inserted, completion_requested
+    )
+    complete_event.deadline = deadline
+    document = Document(text, cursor_position)
+
+    batch: List[_SerializedCompletion] = []
+    last_flush = time.monotonic()
+
+    try:
+        for completion in _worker_completer.get_completions(document, complete_event):
+            if complete_event.cancelled:
+                return
+
+            batch.append(_serialize(completion))
+
+            if len(batch) >= _BATCH_SIZE or (
+                time.monotonic() - last_flush > _FLUSH_INTERVAL
+            ):
+                _worker_results.put((request_id, batch))
+                batch = []
+                last_flush = time.monotonic()
+
+        if batch:
+            _worker_results.put((request_id, batch))
+    except Exception as e:
+        _worker_results.put((request_id, e))
+    finally:
+        _worker_results.put((request_id, None))
@@ -1,4 +1,18 @@
-from typing import Callable, Iterable, List, Mapping, Optional, Pattern, Union
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Pattern,
+    Sequence,
+    Union,
+)
 
 from quo.completion.core import CompleteEvent, Completer, Completion
 from quo.document import Document
@@ -27,6 +41,17 @@ class WordCompleter(Completer):
     :param pattern: Optional compiled regex for finding the word before
         the cursor to complete. When given, use this regex pattern instead of
         default one (see document._FIND_WORD_RE)
+    :param indexed: When True, build an index of the words instead of
+        comparing every word on every keystroke. (For very large lists of
+        words.) Prefix matches are looked up in a sorted array using bisect,
+        `match_middle` uses an index of the trigrams in the words. The
+        completions are yielded in the order of the words, like without
+        index.
+    :param get_version: Callable that returns a (hashable) version token for
+        the words. With an index, the words are only retrieved again (and
+        reindexed) when the token changes. Without `get_version`, the index
+        is rebuilt when `words` returns a different list object or the length
+        changed.
     """
 
     def __init__(
@@ -40,6 +65,8 @@ class WordCompleter(Completer):
         sentence: bool = False,
         match_middle: bool = False,
         pattern: Optional[Pattern[str]] = None,
+        indexed: bool = False,
+        get_version: Optional[Callable[[], Hashable]] = None,
     ) -> None:
 
         assert not (WORD and sentence)
@@ -57,14 +84,57 @@ class WordCompleter(Completer):
         self.sentence = sentence
         self.match_middle = match_middle
         self.pattern = pattern
+        self.indexed = indexed
+        self.get_version = get_version
+
+        self._index: Optional[_WordIndex] = None
+
+    def _get_index(self) -> "_WordIndex":
+        """
+        Return the index of the current words, (re)building it when needed.
+        """
+        index = self._index
+
+        if self.get_version is not None:
+            version = self.get_version()
+            if (
+                index is not None
+                and index.version == version
+                and index.ignore_case == self.ignore_case
+            ):
+                return index
+        else:
+            version = None
+
+        words = self.words
+        if callable(words):
+            words = words()
+
+        if (
+            index is None
+            or index.version != version
+            or index.ignore_case != self.ignore_case
+            or index.words is not words
+            or index.size != len(words)
+        ):
+            index = self._index = _WordIndex(words, self.ignore_case, version)
+
+        return index
 
     def get_completions(
         self, document: Document, complete_event: CompleteEvent
     ) -> Iterable[Completion]:
+        index: Optional[_WordIndex] = None
+        words: Sequence[str]
+
         # Get list of words.
-        words = self.words
-        if callable(words):
-            words = words()
+        if self.indexed:
+            index = self._get_index()
+            words = index.words
+        elif callable(self.words):
+            words = self.words()
+        else:
+            words = self.words
 
         # Get word/text before cursor.
         if self.sentence:
@@ -87,13 +157,144 @@ class WordCompleter(Completer):
             else:
                 return word.startswith(word_before_cursor)
 
-        for a in words:
-            if word_matches(a):
-                display = self.display_dict.get(a, a)
-                display_meta = self.meta_dict.get(a, "")
-                yield Completion(
-                    a,
-                    -len(word_before_cursor),
-                    display=display,
-                    display_meta=display_meta,
-                )
+        matching_words: Iterable[str]
+
+        if index is not None:
+            if self.match_middle:
+                matching_words = index.containing(word_before_cursor)
+            else:
+                matching_words = index.starting_with(word_before_cursor)
+        else:
+            matching_words = filter(word_matches, words)
+
+        for a in matching_words:
+            display = self.display_dict.get(a, a)
+            display_meta = self.meta_dict.get(a, "")
+            yield Completion(
+                a,
+                -len(word_before_cursor),
+                display=display,
+                display_meta=display_meta,
+            )
+
+
+class _WordIndex:
+    """
+    Index over a list of words for :class:`.WordCompleter`.
+
+    For prefix matching, the (case folded) words are kept in a sorted array,
+    together with their original position. All the words with a given prefix
+    form a contiguous range, found by bisection.
+
+    For matching in the middle, all the words are joined in one string,
+    which is searched with `str.find`. A word that contains the text also
+    contains every trigram (substring of three characters) of the text. So,
+    for longer text, the positions of the words that contain each of its
+    trigrams are looked up, and only the words listed for the rarest trigram
+    are checked. These lists are found in the joined string the first time a
+    trigram is used, and kept for the following keystrokes. (Everything is
+    created when first needed.)
+    """
+
+    def __init__(
+        self, words: Sequence[str], ignore_case: bool, version: Hashable
+    ) -> None:
+        self.words = words
+        self.size = len(words)
+        self.ignore_case = ignore_case
+        self.version = version
+
+        if ignore_case:
+            self._keys = [w.lower() for w in words]
+        else:
+            self._keys = list(words)
+
+        self._order = sorted(range(len(self._keys)), key=self._keys.__getitem__)
+        self._sorted_keys = [self._keys[i] for i in self._order]
+
+        self._trigrams: Dict[str, List[int]] = {}
+        self._joined: Optional[str] = None
+        self._offsets: List[int] = []
+
+    def starting_with(self, prefix: str) -> Iterator[str]:
+        "Yield the words that start with `prefix`, in their original order."
+        if not prefix:
+            yield from self.words
+            return
+
+        keys = self._sorted_keys
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + "\U0010ffff", start)
+
+        for i in sorted(self._order[start:end]):
+            yield self.words[i]
+
+    def containing(self, text: str) -> Iterator[str]:
+        "Yield the words that contain `text`, in their original order."
+        words = self.words
+
+        if not text:
+            yield from words
+
+        elif _SEPARATOR in text:
+            for word, key in zip(words, self._keys):
+                if text in key:
+                    yield word
+
+        elif len(text) < _TRIGRAM:
+            for i in self._find(text):
+                yield words[i]
+
+        else:
+            candidates = min(
+                (
+                    self._trigram_positions(text[start : start + _TRIGRAM])
+                    for start in range(len(text) - _TRIGRAM + 1)
+                ),
+                key=len,
+            )
+            keys = self._keys
+
+            for i in candidates:
+                if text in keys[i]:
+                    yield words[i]
+
+    def _trigram_positions(self, trigram: str) -> List[int]:
+        "Positions of the words that contain `trigram`."
+        positions = self._trigrams.get(trigram)
+
+        if positions is None:
+            positions = self._trigrams[trigram] = list(self._find(trigram))
+
+        return positions
+
+    def _find(self, text: str) -> Iterator[int]:
+        """
+        Yield the positions of the words that contain `text`, by searching the
+        joined words. (`text` can't contain the separator.)
+        """
+        if self._joined is None:
+            self._joined = _SEPARATOR.join(self._keys)
+            self._offsets = list(
+                accumulate([0] + [len(k) + 1 for k in self._keys[:-1]])
+            )
+
+        joined = self._joined
+        offsets = self._offsets
+        pos = joined.find(text)
+
+        while pos >= 0:
+            i = bisect_right(offsets, pos) - 1
+            yield i
+
+            # Continue with the next word.
+            if i + 1 >= len(offsets):
+                break
+            pos = joined.find(text, offsets[i + 1])
+
+
+# Length of the substrings in `_WordIndex._trigrams`.
+_TRIGRAM = 3
+
+# Separates the words in `_WordIndex._joined`.
+_SEPARATOR = "\x00"
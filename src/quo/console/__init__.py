@@ -1,11 +1,25 @@
-from quo.console.console import Console
-from .current import (
-    #    AppSession,
-    #    create_app_session,
-    get_app as application,
-    #    get_app_or_none,
-    #    get_app_session,
-    #    set_app,
+from typing import TYPE_CHECKING
+
+from quo.utils.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .console import Console  # noqa: F401
+    from .current import get_app as application  # noqa: F401
+
+# Imported on first use. (`quo.filters` for instance imports
+# `quo.console.current`, which shouldn't import the `Console` class, and
+# everything it depends on.)
+__getattr__, __dir__ = lazy_attributes(
+    globals(),
+    {
+        "Console": ".console",
+        "application": ".current:get_app",
+        #    "AppSession": ".current",
+        #    "create_app_session": ".current",
+        #    "get_app_or_none": ".current",
+        #    "get_app_session": ".current",
+        #    "set_app": ".current",
+    },
 )
 
 # from .dummy import DummyApplication
@@ -16,13 +16,14 @@ from asyncio import (
     set_event_loop,
     sleep,
 )
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from subprocess import Popen
 from traceback import format_tb
 from typing import (
     Any,
     Awaitable,
     Callable,
+    ContextManager,
     Dict,
     FrozenSet,
     Generator,
@@ -53,7 +54,7 @@ from quo.eventloop import (
     run_in_executor_with_context,
 )
 from quo.eventloop.utils import call_soon_threadsafe
-from quo.filters import Condition, Filter, FilterOrBool, to_filter
+from quo.filters import Condition, Filter, FilterOrBool, filter_epoch, to_filter
 from quo.text.core import AnyFormattedText
 from quo.input.core import Input
 from quo.input.typeahead import get_typeahead, store_typeahead
@@ -87,6 +88,7 @@ from quo.style.transformation import DummyStyleTransformation, StyleTransformati
 from quo.utils.utils import Event, in_main_thread
 
 from .current import get_app_session, set_app
+from .latency import KeyLatency
 from .run_in_terminal import in_terminal, run_in_terminal
 try:
     import contextvars
@@ -153,6 +155,14 @@ class Console(Generic[_AppResult]):
         seconds. Useful if the applications runs in a thread other then then
         main thread where SIGWINCH can't be handled, or on Windows.
 
+    :param cache_filters: When True, cache the results of epoch stable filters
+        (see :func:`~quo.filters.filter_epoch`) while rendering and while
+        looking up the key bindings for a key press.
+
+    :param key_latency: :class:`~quo.console.latency.KeyLatency` instance, to
+        measure the time from reading key presses until their result is
+        painted.
+
     Filters:
 
     :param mouse_support: (:class:`~quo.filters.Filter` or
@@ -222,6 +232,8 @@ class Console(Generic[_AppResult]):
         max_render_postpone_time: Union[float, int, None] = 0.01,
         refresh_interval: Optional[float] = None,
         terminal_size_polling_interval: Optional[float] = 0.5,
+        cache_filters: bool = False,
+        key_latency: Optional[KeyLatency] = None,
         on_reset: Optional[onSuite] = None,
         on_invalidate: Optional[onSuite] = None,
         before_render: Optional[onSuite] = None,
@@ -271,6 +283,8 @@ class Console(Generic[_AppResult]):
         self.max_render_postpone_time = max_render_postpone_time
         self.refresh_interval = refresh_interval
         self.terminal_size_polling_interval = terminal_size_polling_interval
+        self.cache_filters = cache_filters
+        self.key_latency = key_latency
 
         # Events.
         self.on_invalidate = Event(self, on_invalidate)
@@ -511,6 +525,16 @@ class Console(Generic[_AppResult]):
         "True when a redraw operation has been scheduled."
         return self._invalidated
 
+    def filter_epoch(self) -> ContextManager[None]:
+        """
+        Context manager for code during which the application state doesn't
+        change. When `cache_filters` is set, the epoch stable filters are only
+        evaluated once within it.
+        """
+        if self.cache_filters:
+            return filter_epoch()
+        return nullcontext()
+
     def _redraw(self, render_as_done: bool = False) -> None:
         """
         Render the command line again. (Not thread safe!) (From other threads,
@@ -529,14 +553,20 @@ class Console(Generic[_AppResult]):
                 self.render_counter += 1
                 self.before_render.fire()
 
-                if render_as_done:
-                    if self.erase_when_done:
-                        self.renderer.erase()
+                with self.filter_epoch():
+                    if render_as_done:
+                        if self.erase_when_done:
+                            self.renderer.erase()
+                        else:
+                            # Draw in 'done' state and reset renderer.
+                            self.renderer.render(
+                                self, self.layout, is_done=render_as_done
+                            )
                     else:
-                        # Draw in 'done' state and reset renderer.
-                        self.renderer.render(self, self.layout, is_done=render_as_done)
-                else:
-                    self.renderer.render(self, self.layout)
+                        self.renderer.render(self, self.layout)
+
+                if self.key_latency is not None:
+                    self.key_latency.frame_flushed()
 
                 self.layout.update_parents_relations()
 
@@ -0,0 +1,150 @@
+"""
+Measuring the latency of key presses: the time between reading a key press
+from the input, and flushing a frame that shows its result to the output.
+"""
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Optional, Sequence, Tuple
+
+from quo.keys.list import Keys
+from quo.log import logger
+
+if TYPE_CHECKING:
+    from quo.keys.key_binding.key_bindings import Binding
+    from quo.keys.key_binding.key_processor import KeyPress
+
+__all__ = [
+    "KeyLatency",
+    "LatencyStats",
+]
+
+# Upper bounds (in seconds) of the default histogram buckets.
+_DEFAULT_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+class LatencyStats:
+    """
+    Rolling window of latency samples (in seconds).
+
+    :param size: Number of most recent samples to keep.
+    """
+
+    def __init__(self, size: int = 1000) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def clear(self) -> None:
+        self._samples.clear()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Return the given percentile (0-100) of the samples, or `None` when
+        there are no samples. (Nearest rank.)
+        """
+        if not self._samples:
+            return None
+
+        samples = sorted(self._samples)
+        index = int(round(percent / 100 * (len(samples) - 1)))
+        return samples[max(0, min(index, len(samples) - 1))]
+
+    def histogram(
+        self, bounds: Sequence[float] = _DEFAULT_BOUNDS
+    ) -> List[Tuple[float, int]]:
+        """
+        Count the samples per bucket. Return a list of (upper bound, count)
+        tuples. The last bucket has ``float("inf")`` as its bound.
+
+        :param bounds: Increasing upper bounds of the buckets, in seconds.
+        """
+        bounds = list(bounds) + [float("inf")]
+        counts = [0] * len(bounds)
+
+        for sample in self._samples:
+            for i, bound in enumerate(bounds):
+                if sample <= bound:
+                    counts[i] += 1
+                    break
+
+        return list(zip(bounds, counts))
+
+    def __repr__(self) -> str:
+        return "LatencyStats(samples=%r, p50=%r, p99=%r)" % (
+            len(self),
+            self.percentile(50),
+            self.percentile(99),
+        )
+
+
+class KeyLatency:
+    """
+    Collects, for every key press, how long it took until its key binding
+    was handled (`handled`), and until a frame that reflects the change was
+    flushed to the output (`painted`).
+
+    Pass an instance to :class:`~quo.console.Console` as `key_latency`, then
+    look at ``app.key_latency.painted.percentile(99)`` and so on.
+
+    :param size: Number of most recent key presses to keep statistics for.
+    :param slow_threshold: When given, log every key press of which the
+        painted latency is more than this number of seconds, together with
+        the key binding that handled it.
+    """
+
+    def __init__(
+        self, size: int = 1000, slow_threshold: Optional[float] = None
+    ) -> None:
+        self.slow_threshold = slow_threshold
+
+        self.handled = LatencyStats(size)
+        self.painted = LatencyStats(size)
+
+        # (key press, binding) that have been handled, but not painted yet.
+        self._pending: Deque[Tuple["KeyPress", "Binding"]] = deque(maxlen=size)
+
+    def key_handled(
+        self, key_presses: List["KeyPress"], binding: "Binding"
+    ) -> None:
+        """
+        Called by the `KeyProcessor` after `binding` handled `key_presses`.
+        """
+        now = time.monotonic()
+
+        for key_press in key_presses:
+            if key_press.key != Keys.CPRResponse:
+                self.handled.add(now - key_press.time)
+                self._pending.append((key_press, binding))
+
+    def frame_flushed(self) -> None:
+        """
+        Called after rendering, when the output has been flushed.
+        """
+        now = time.monotonic()
+        pending = self._pending
+
+        while pending:
+            key_press, binding = pending.popleft()
+            latency = now - key_press.time
+            self.painted.add(latency)
+
+            if self.slow_threshold is not None and latency > self.slow_threshold:
+                logger.warning(
+                    "Slow key press: %r took %.1f ms to paint (handled by %r).",
+                    key_press,
+                    latency * 1000,
+                    binding,
+                )
+
+    def reset(self) -> None:
+        "Forget all the samples."
+        self.handled.clear()
+        self.painted.clear()
+        self._pending.clear()
+
+    def __repr__(self) -> str:
+        return "KeyLatency(handled=%r, painted=%r)" % (self.handled, self.painted)
@@ -0,0 +1,20 @@
+"""
+Recording terminal sessions and replaying them against an application, to
+detect performance regressions. Usage::
+
+    recording = Recording.load("session.json")
+    result = await replay(create_app, recording)
+
+    regressions = result.compare(ReplayResult.load("baseline.json"))
+"""
+from .recording import RecordedEvent, Recording, record_session
+from .replay import RecordingOutput, ReplayResult, replay
+
+__all__ = [
+    "RecordedEvent",
+    "Recording",
+    "record_session",
+    "RecordingOutput",
+    "ReplayResult",
+    "replay",
+]
@@ -0,0 +1,175 @@
+"""
+Recording of the input of a terminal session, so that it can be replayed.
+"""
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from quo.console import Console
+from quo.input.posix_utils import PosixStdinReader
+from quo.input.videoterminal import Vt100
+from quo.output.core import Size
+
+__all__ = [
+    "RecordedEvent",
+    "Recording",
+    "record_session",
+]
+
+
+class RecordedEvent(NamedTuple):
+    """
+    Something that happened in a terminal session: either input was received
+    (`data`), or the terminal was resized (`size`).
+
+    :param time: Seconds since the start of the recording.
+    """
+
+    time: float
+    data: Optional[str] = None
+    size: Optional[Size] = None
+
+
+class Recording:
+    """
+    The input of a terminal session with its timing, and the changes of the
+    terminal size.
+
+    The input is stored as text, decoded like the Vt100 input does
+    ("surrogateescape" for invalid UTF-8), so that the original bytes can be
+    restored.
+
+    :param size: Size of the terminal at the start.
+    :param events: List of :class:`.RecordedEvent` instances.
+    """
+
+    def __init__(
+        self,
+        size: Optional[Size] = None,
+        events: Optional[List[RecordedEvent]] = None,
+    ) -> None:
+
+        self.size = size or Size(rows=24, columns=80)
+        self.events: List[RecordedEvent] = events or []
+        self._start = time.monotonic()
+
+    def add_input(self, data: str) -> None:
+        if data:
+            self.events.append(RecordedEvent(self._elapsed(), data=data))
+
+    def add_size(self, size: Size) -> None:
+        "Record the terminal size. (Nothing is added if it didn't change.)"
+        if size != self._get_last_size():
+            self.events.append(RecordedEvent(self._elapsed(), size=Size(*size)))
+
+    def _elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    def _get_last_size(self) -> Size:
+        for event in reversed(self.events):
+            if event.size is not None:
+                return event.size
+        return self.size
+
+    @property
+    def duration(self) -> float:
+        "Time of the last event."
+        return self.events[-1].time if self.events else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        events: List[List[Any]] = []
+
+        for event in self.events:
+            if event.size is not None:
+                rows, columns = event.size
+                events.append([event.time, "resize", rows, columns])
+            else:
+                events.append([event.time, "input", event.data])
+
+        return {
+            "version": 1,
+            "size": [self.size.rows, self.size.columns],
+            "events": events,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Recording":
+        events: List[RecordedEvent] = []
+
+        for event in data["events"]:
+            if event[1] == "resize":
+                events.append(RecordedEvent(event[0], size=Size(event[2], event[3])))
+            elif event[1] == "input":
+                events.append(RecordedEvent(event[0], data=event[2]))
+            else:
+                raise ValueError("Unknown event type: %r" % (event[1],))
+
+        return cls(size=Size(*data["size"]), events=events)
+
+    def save(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, filename: str) -> "Recording":
+        with open(filename, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def __repr__(self) -> str:
+        return "Recording(size=%r, events=%r)" % (self.size, len(self.events))
+
+
+class _RecordingStdinReader:
+    """
+    Wrapper around a `PosixStdinReader` that adds everything it reads to a
+    `Recording`.
+    """
+
+    def __init__(self, reader: PosixStdinReader, recording: Recording) -> None:
+        self.reader = reader
+        self.recording = recording
+
+    @property
+    def closed(self) -> bool:
+        return self.reader.closed
+
+    def read(self, count: int = 1024) -> str:
+        data = self.reader.read(count)
+        self.recording.add_input(data)
+        return data
+
+
+@contextmanager
+def record_session(app: Console, recording: Recording) -> Iterator[Recording]:
+    """
+    Record the input and the terminal size changes of `app` (which has to use
+    a Vt100 input) into `recording`. Usage::
+
+        recording = Recording()
+
+        with record_session(app, recording):
+            app.run()
+
+        recording.save("session.json")
+    """
+    input = app.input
+    if not isinstance(input, Vt100):
+        raise TypeError("Only a Vt100 input can be recorded. Got %r" % (input,))
+
+    def before_render(app: Console) -> None:
+        recording.add_size(app.output.get_size())
+
+    if not recording.events:
+        recording.size = app.output.get_size()
+        recording._start = time.monotonic()
+
+    reader = input.stdin_reader
+    input.stdin_reader = _RecordingStdinReader(reader, recording)  # type: ignore
+    app.before_render += before_render
+
+    try:
+        yield recording
+    finally:
+        app.before_render -= before_render
+        input.stdin_reader = reader
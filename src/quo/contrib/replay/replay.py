@@ -0,0 +1,198 @@
+"""
+Replaying a :class:`.Recording` against an application, for performance
+regression tests.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TextIO, cast
+
+from quo.console import Console
+from quo.console.current import create_app_session
+from quo.input.defaults import create_pipe_input
+from quo.output.videoterminal import Size, Vt100
+
+from .recording import Recording
+
+__all__ = [
+    "RecordingOutput",
+    "ReplayResult",
+    "replay",
+]
+
+
+class _CountingStdout:
+    "Stdout replacement that only counts the bytes that are written into it."
+
+    encoding = "utf-8"
+
+    def __init__(self) -> None:
+        self.bytes_written = 0
+        self.flushes = 0
+
+    def write(self, data: bytes) -> int:
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+    def isatty(self) -> bool:
+        # No cursor position requests: they would make replays
+        # nondeterministic.
+        return False
+
+
+class RecordingOutput(Vt100):
+    """
+    Vt100 output that doesn't go to a terminal, but counts the bytes that
+    would be written. The terminal size can be changed through `size`.
+
+    :param size: Initial terminal size.
+    """
+
+    def __init__(self, size: Optional[Size] = None) -> None:
+        self.size = size or Size(rows=24, columns=80)
+        self._stdout = _CountingStdout()
+
+        super().__init__(
+            cast(TextIO, self._stdout),
+            lambda: self.size,
+            term="xterm-256color",
+        )
+
+    @property
+    def bytes_written(self) -> int:
+        return self._stdout.bytes_written
+
+    @property
+    def flushes(self) -> int:
+        return self._stdout.flushes
+
+
+class ReplayResult(NamedTuple):
+    """
+    Measurements of a replay.
+
+    :param cpu_time: CPU time of the process during the replay, in seconds.
+    :param wall_time: Duration of the replay, in seconds.
+    :param frames: Number of times the user interface was rendered.
+    :param bytes_written: Number of bytes written to the output.
+    """
+
+    cpu_time: float
+    wall_time: float
+    frames: int
+    bytes_written: int
+
+    def save(self, filename: str) -> None:
+        "Store this result, to be used as a baseline later on."
+        with open(filename, "w") as f:
+            json.dump(self._asdict(), f)
+
+    @classmethod
+    def load(cls, filename: str) -> "ReplayResult":
+        with open(filename, "r") as f:
+            data: Dict[str, Any] = json.load(f)
+        return cls(**data)
+
+    def compare(
+        self, baseline: "ReplayResult", tolerance: float = 0.2
+    ) -> List[str]:
+        """
+        Compare with a `baseline` result. Return a description of every
+        measurement that is more than `tolerance` (a fraction) worse. An empty
+        list means: no regressions.
+
+        The wall time is not compared: with the recorded timing, it mostly
+        depends on the recording.
+        """
+        regressions: List[str] = []
+
+        for name in ("cpu_time", "frames", "bytes_written"):
+            value = getattr(self, name)
+            base = getattr(baseline, name)
+
+            if value > base * (1 + tolerance):
+                regressions.append("%s: %r (baseline: %r)" % (name, value, base))
+
+        return regressions
+
+
+async def replay(
+    create_app: Callable[[], "Console[Any]"],
+    recording: Recording,
+    speed: Optional[float] = 1.0,
+    settle_time: float = 0.1,
+) -> ReplayResult:
+    """
+    Replay `recording` against the application returned by `create_app`, and
+    measure it.
+
+    `create_app` is called in an app session with a pipe input and a
+    :class:`.RecordingOutput`, so that the application uses these, unless it
+    was given an input or output explicitly. Terminal size polling is turned
+    off: the size changes are replayed exactly where they were recorded.
+
+    When the application didn't exit when the recording ends, it's told to
+    exit after `settle_time` seconds.
+
+    :param speed: Replay this many times faster than recorded. `None` means: as
+        fast as possible, only yielding to the event loop between events.
+    """
+    input = create_pipe_input()
+    output = RecordingOutput(size=Size(*recording.size))
+
+    with create_app_session(input=input, output=output):
+        app = create_app()
+        app.terminal_size_polling_interval = None
+
+        async def feed() -> None:
+            while not app.is_running:
+                await asyncio.sleep(0)
+
+            start = time.monotonic()
+
+            for event in recording.events:
+                if speed is None:
+                    await asyncio.sleep(0)
+                else:
+                    delay = event.time / speed - (time.monotonic() - start)
+                    await asyncio.sleep(max(0, delay))
+
+                if not app.is_running:
+                    return
+
+                if event.size is not None:
+                    output.size = Size(*event.size)
+                    app._on_resize()
+                elif event.data is not None:
+                    input.send_bytes(event.data.encode("utf-8", "surrogateescape"))
+
+            await asyncio.sleep(settle_time)
+
+            if app.is_running and not app.is_done:
+                app.exit()
+
+        cpu_start = time.process_time()
+        wall_start = time.monotonic()
+
+        try:
+            feed_task = asyncio.ensure_future(feed())
+
+            try:
+                await app.run_async()
+            except (EOFError, KeyboardInterrupt):
+                # Exits through ctrl-d/ctrl-c are a normal end of a session.
+                pass
+            finally:
+                feed_task.cancel()
+
+            return ReplayResult(
+                cpu_time=time.process_time() - cpu_start,
+                wall_time=time.monotonic() - wall_start,
+                frames=app.render_counter,
+                bytes_written=output.bytes_written,
+            )
+        finally:
+            input.close()
@@ -1,4 +1,4 @@
-from .async_generator import generator_to_async_generator
+from .async_generator import generator_to_async_batches, generator_to_async_generator
 from .inputhook import (
     InputHookContext,
     InputHookSelector,
@@ -14,6 +14,7 @@ from .utils import (
 __all__ = [
     # Async generator
     "generator_to_async_generator",
+    "generator_to_async_batches",
     # Utils.
     "run_in_executor_with_context",
     "call_soon_threadsafe",
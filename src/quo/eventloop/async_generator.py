@@ -1,13 +1,15 @@
 """
 Implementation for async generators.
 """
-from asyncio import Queue, get_event_loop
-from typing import AsyncGenerator, Callable, Iterable, TypeVar, Union
+import threading
+from asyncio import Event, Queue, get_event_loop
+from typing import AsyncGenerator, Callable, Iterable, List, TypeVar, Union
 
 from .utils import run_in_executor_with_context
 
 __all__ = [
     "generator_to_async_generator",
+    "generator_to_async_batches",
 ]
 
 
@@ -72,3 +74,71 @@ async def generator_to_async_generator(
         # `RuntimeError: Event loop is closed` exception printed to stdout that
         # we can't handle.
         await runner_f
+
+
+async def generator_to_async_batches(
+    get_iterable: Callable[[], Iterable[_T]]
+) -> AsyncGenerator[List[_T], None]:
+    """
+    Like :func:`.generator_to_async_generator`, but yield lists of all the
+    items that were produced by the background thread since the previous
+    iteration, instead of one item at a time.
+
+    The background thread collects the items in a list, and only wakes up the
+    event loop when it adds an item to an empty list: one event loop callback
+    per batch, rather than per item. While the consumer is busy, the batch
+    grows.
+
+    :param get_iterable: Function that returns a generator or iterable when
+        called.
+    """
+    quitting = False
+    finished = False
+    items: List[_T] = []
+    lock = threading.Lock()
+    items_available = Event()
+    loop = get_event_loop()
+
+    def runner() -> None:
+        nonlocal finished
+
+        try:
+            for item in get_iterable():
+                if quitting:
+                    break
+
+                with lock:
+                    items.append(item)
+                    notify = len(items) == 1
+
+                if notify:
+                    loop.call_soon_threadsafe(items_available.set)
+
+        finally:
+            with lock:
+                finished = True
+            loop.call_soon_threadsafe(items_available.set)
+
+    runner_f = run_in_executor_with_context(runner)
+
+    try:
+        while True:
+            await items_available.wait()
+
+            # (Clear before taking the items: the thread sets it again for
+            # anything added later.)
+            items_available.clear()
+
+            with lock:
+                batch = items[:]
+                del items[:]
+                done = finished
+
+            if batch:
+                yield batch
+
+            if done:
+                break
+    finally:
+        quitting = True
+        await runner_f
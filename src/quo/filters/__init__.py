@@ -17,7 +17,14 @@ Filters can be chained using ``&`` and ``|`` operations, and inverted using the
     filter = has_focus('default') & ~ has_selection
 """
 from quo.filters.app import *
-from quo.filters.core import Always, Condition, Filter, FilterOrBool, Never
+from quo.filters.core import (
+    Always,
+    Condition,
+    Filter,
+    FilterOrBool,
+    Never,
+    filter_epoch,
+)
 from quo.filters.cli import *
 from quo.filters.utils import is_true, to_filter
 from quo.filters.app import vi_mode
@@ -59,6 +66,7 @@ __all__ = [
     "Always",
     "Condition",
     "FilterOrBool",
+    "filter_epoch",
     # utils.
     "is_true",
     "to_filter",
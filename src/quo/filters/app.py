@@ -1,7 +1,7 @@
 """
 Filters that accept a `Console` as argument.
 """
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Callable, cast
 
 from quo.console.current import get_app
 from quo.cache.core import memoized
@@ -46,6 +46,14 @@ __all__ = [
 ]
 
 
+def _app_condition(func: Callable[[], bool]) -> Condition:
+    """
+    Decorator for the filters below. They only look at the application state,
+    which doesn't change within an epoch, so their results can be cached.
+    """
+    return Condition(func, epoch_stable=True)
+
+
 @memoized()
 def has_focus(value: "FocusableElement") -> Condition:
     """
@@ -91,14 +99,14 @@ def has_focus(value: "FocusableElement") -> Condition:
                         return True
                 return False
 
-    @Condition
+    @_app_condition
     def has_focus_filter() -> bool:
         return test()
 
     return has_focus_filter
 
 
-@Condition
+@_app_condition
 def buffer_has_focus() -> bool:
     """
     Enabled when the currently focused control is a `BufferControl`.
@@ -106,7 +114,7 @@ def buffer_has_focus() -> bool:
     return get_app().layout.buffer_has_focus
 
 
-@Condition
+@_app_condition
 def has_selection() -> bool:
     """
     Enable when the current buffer has a selection.
@@ -114,7 +122,7 @@ def has_selection() -> bool:
     return bool(get_app().current_buffer.selection_state)
 
 
-@Condition
+@_app_condition
 def has_completions() -> bool:
     """
     Enable when the current buffer has completions.
@@ -123,7 +131,7 @@ def has_completions() -> bool:
     return state is not None and len(state.completions) > 0
 
 
-@Condition
+@_app_condition
 def completion_is_selected() -> bool:
     """
     True when the user selected a completion.
@@ -132,7 +140,7 @@ def completion_is_selected() -> bool:
     return complete_state is not None and complete_state.current_completion is not None
 
 
-@Condition
+@_app_condition
 def is_read_only() -> bool:
     """
     True when the current buffer is read only.
@@ -140,7 +148,7 @@ def is_read_only() -> bool:
     return get_app().current_buffer.read_only()
 
 
-@Condition
+@_app_condition
 def is_multiline() -> bool:
     """
     True when the current buffer has been marked as multiline.
@@ -148,19 +156,19 @@ def is_multiline() -> bool:
     return get_app().current_buffer.multiline()
 
 
-@Condition
+@_app_condition
 def has_validation_error() -> bool:
     "Current buffer has validation error."
     return get_app().current_buffer.validation_error is not None
 
 
-@Condition
+@_app_condition
 def has_arg() -> bool:
     "Enable when the input processor has an 'arg'."
     return get_app().key_processor.arg is not None
 
 
-@Condition
+@_app_condition
 def is_done() -> bool:
     """
     True when the CLI is returning, aborting or exiting.
@@ -178,6 +186,8 @@ def renderer_height_is_known() -> bool:
     the terminal. And usually it's nicer to wait with drawing bottom toolbars
     until we receive the height, in order to avoid flickering -- first drawing
     somewhere in the middle, and then again at the bottom.)
+
+    (Not cached within an epoch: the answer can arrive during rendering.)
     """
     return get_app().renderer.height_is_known
 
@@ -188,24 +198,24 @@ def in_editing_mode(editing_mode: EditingMode) -> Condition:
     Check whether a given editing mode is active. (Vi or Emacs.)
     """
 
-    @Condition
+    @_app_condition
     def in_editing_mode_filter() -> bool:
         return get_app().editing_mode == editing_mode
 
     return in_editing_mode_filter
 
 
-@Condition
+@_app_condition
 def in_paste_mode() -> bool:
     return get_app().paste_mode()
 
 
-@Condition
+@_app_condition
 def vi_mode() -> bool:
     return get_app().editing_mode == EditingMode.VI
 
 
-@Condition
+@_app_condition
 def vi_navigation_mode() -> bool:
     """
     Active when the set for Vi navigation key bindings are active.
@@ -229,7 +239,7 @@ def vi_navigation_mode() -> bool:
     )
 
 
-@Condition
+@_app_condition
 def vi_insert_mode() -> bool:
     from quo.keys.key_binding.vi_state import InputMode
 
@@ -248,7 +258,7 @@ def vi_insert_mode() -> bool:
     return app.vi_state.input_mode == InputMode.INSERT
 
 
-@Condition
+@_app_condition
 def vi_insert_multiple_mode() -> bool:
     from quo.keys.key_binding.vi_state import InputMode
 
@@ -267,7 +277,7 @@ def vi_insert_multiple_mode() -> bool:
     return app.vi_state.input_mode == InputMode.INSERT_MULTIPLE
 
 
-@Condition
+@_app_condition
 def vi_replace_mode() -> bool:
     from quo.keys.key_binding.vi_state import InputMode
 
@@ -286,7 +296,7 @@ def vi_replace_mode() -> bool:
     return app.vi_state.input_mode == InputMode.REPLACE
 
 
-@Condition
+@_app_condition
 def vi_replace_single_mode() -> bool:
     from quo.keys.key_binding.vi_state import InputMode
 
@@ -305,7 +315,7 @@ def vi_replace_single_mode() -> bool:
     return app.vi_state.input_mode == InputMode.REPLACE_SINGLE
 
 
-@Condition
+@_app_condition
 def vi_selection_mode() -> bool:
     app = get_app()
     if app.editing_mode != EditingMode.VI:
@@ -314,7 +324,7 @@ def vi_selection_mode() -> bool:
     return bool(app.current_buffer.selection_state)
 
 
-@Condition
+@_app_condition
 def vi_waiting_for_text_object_mode() -> bool:
     app = get_app()
     if app.editing_mode != EditingMode.VI:
@@ -323,7 +333,7 @@ def vi_waiting_for_text_object_mode() -> bool:
     return app.vi_state.operator_func is not None
 
 
-@Condition
+@_app_condition
 def vi_digraph_mode() -> bool:
     app = get_app()
     if app.editing_mode != EditingMode.VI:
@@ -332,7 +342,7 @@ def vi_digraph_mode() -> bool:
     return app.vi_state.waiting_for_digraph
 
 
-@Condition
+@_app_condition
 def vi_recording_macro() -> bool:
     "When recording a Vi macro."
     app = get_app()
@@ -342,13 +352,13 @@ def vi_recording_macro() -> bool:
     return app.vi_state.recording_register is not None
 
 
-@Condition
+@_app_condition
 def emacs_mode() -> bool:
     "When the Emacs bindings are active."
     return get_app().editing_mode == EditingMode.EMACS
 
 
-@Condition
+@_app_condition
 def emacs_insert_mode() -> bool:
     app = get_app()
     if (
@@ -360,7 +370,7 @@ def emacs_insert_mode() -> bool:
     return True
 
 
-@Condition
+@_app_condition
 def emacs_selection_mode() -> bool:
     app = get_app()
     return bool(
@@ -368,7 +378,7 @@ def emacs_selection_mode() -> bool:
     )
 
 
-@Condition
+@_app_condition
 def shift_selection_mode() -> bool:
     app = get_app()
     return bool(
@@ -377,14 +387,14 @@ def shift_selection_mode() -> bool:
     )
 
 
-@Condition
+@_app_condition
 def is_searching() -> bool:
     "When we are searching."
     app = get_app()
     return app.layout.is_searching
 
 
-@Condition
+@_app_condition
 def control_is_searchable() -> bool:
     "When the current UIControl is searchable."
     from quo.layout.controls import BufferControl
@@ -396,7 +406,7 @@ def control_is_searchable() -> bool:
     )
 
 
-@Condition
+@_app_condition
 def vi_search_direction_reversed() -> bool:
     "When the '/' and '?' key bindings for Vi-style searching have been reversed."
     return get_app().reverse_vi_search_direction()
@@ -1,7 +1,30 @@
 from abc import ABCMeta, abstractmethod
-from typing import Callable, Dict, Iterable, List, Tuple, Union, cast
-
-__all__ = ["Filter", "Never", "Always", "Condition", "FilterOrBool"]
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    from quo.eventloop.dummy_contextvars import ContextVar  # type: ignore
+
+__all__ = [
+    "Filter",
+    "Never",
+    "Always",
+    "Condition",
+    "FilterOrBool",
+    "filter_epoch",
+]
 
 
 class Filter(metaclass=ABCMeta):
@@ -10,8 +33,15 @@ class Filter(metaclass=ABCMeta):
     condition.
 
     The return value of ``__call__`` will tell if the feature should be active.
+
+    Filters that set `epoch_stable` promise that their value doesn't change
+    during an epoch (see :func:`.filter_epoch`), so that they are evaluated
+    only once per epoch.
     """
 
+    #: True when the value of this filter can be cached within an epoch.
+    epoch_stable = False
+
     @abstractmethod
     def __call__(self) -> bool:
         """
@@ -122,7 +152,14 @@ class _AndList(Filter):
             else:
                 self.filters.append(f)
 
+        self.epoch_stable = all(f.epoch_stable for f in self.filters)
+
     def __call__(self) -> bool:
+        if self.epoch_stable:
+            return _call_in_epoch(self, self._evaluate)
+        return self._evaluate()
+
+    def _evaluate(self) -> bool:
         return all(f() for f in self.filters)
 
     def __repr__(self) -> str:
@@ -143,7 +180,14 @@ class _OrList(Filter):
             else:
                 self.filters.append(f)
 
+        self.epoch_stable = all(f.epoch_stable for f in self.filters)
+
     def __call__(self) -> bool:
+        if self.epoch_stable:
+            return _call_in_epoch(self, self._evaluate)
+        return self._evaluate()
+
+    def _evaluate(self) -> bool:
         return any(f() for f in self.filters)
 
     def __repr__(self) -> str:
@@ -157,6 +201,7 @@ class _Invert(Filter):
 
     def __init__(self, filter: Filter) -> None:
         self.filter = filter
+        self.epoch_stable = filter.epoch_stable
 
     def __call__(self) -> bool:
         return not self.filter()
@@ -170,6 +215,8 @@ class Always(Filter):
     Always enable feature.
     """
 
+    epoch_stable = True
+
     def __call__(self) -> bool:
         return True
 
@@ -182,6 +229,8 @@ class Never(Filter):
     Never enable feature.
     """
 
+    epoch_stable = True
+
     def __call__(self) -> bool:
         return False
 
@@ -201,12 +250,18 @@ class Condition(Filter):
             return True
 
     :param func: Callable which takes no inputs and returns a boolean.
+    :param epoch_stable: When True, the result of `func` is cached within an
+        epoch. Only pass this when `func` depends on nothing that can change
+        while rendering or while looking up key bindings.
     """
 
-    def __init__(self, func: Callable[[], bool]) -> None:
+    def __init__(self, func: Callable[[], bool], epoch_stable: bool = False) -> None:
         self.func = func
+        self.epoch_stable = epoch_stable
 
     def __call__(self) -> bool:
+        if self.epoch_stable:
+            return _call_in_epoch(self, self.func)
         return self.func()
 
     def __repr__(self) -> str:
@@ -215,3 +270,40 @@ class Condition(Filter):
 
 # Often used as type annotation.
 FilterOrBool = Union[Filter, bool]
+
+
+# Results of the epoch stable filters in the current epoch, or `None` when no
+# epoch is active.
+_epoch_cache: "ContextVar[Optional[Dict[Filter, bool]]]" = ContextVar(
+    "_epoch_cache", default=None
+)
+
+
+@contextmanager
+def filter_epoch() -> Iterator[None]:
+    """
+    Context manager that marks an epoch: a stretch of code, like rendering the
+    layout or looking up the key bindings for a key press, during which the
+    application state doesn't change. Within an epoch, every filter with
+    `epoch_stable` set is evaluated at most once.
+
+    Nested epochs start with an empty cache.
+    """
+    token = _epoch_cache.set({})
+    try:
+        yield
+    finally:
+        _epoch_cache.reset(token)
+
+
+def _call_in_epoch(filter: Filter, evaluate: Callable[[], bool]) -> bool:
+    "Call `evaluate`, or take the result for `filter` from the epoch cache."
+    cache = _epoch_cache.get()
+    if cache is None:
+        return evaluate()
+
+    try:
+        return cache[filter]
+    except KeyError:
+        result = cache[filter] = evaluate()
+        return result
@@ -9,20 +9,57 @@ NOTE: There is no `DynamicHistory`:
 """
 
 import asyncio
+import atexit
 import datetime
+import gzip
+import mmap
 import os
+import queue
+import sqlite3
+import sys
+import tempfile
 import threading
+import time
+import uuid
+import weakref
 from abc import ABCMeta, abstractmethod
-from typing import AsyncGenerator, Iterable, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+from heapq import heapify, heappop
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import (
+    Any,
+    AsyncGenerator,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
 
 __all__ = [
     "History",
     "ThreadedHistory",
     "DummyHistory",
     "FileHistory",
+    "SharedFileHistory",
+    "SQLiteHistory",
     "InMemoryHistory",
 ]
 
+# Number of entries `History.load` takes from the backend before giving
+# control back to the event loop.
+_LOAD_BATCH_SIZE = 1000
+
+# How many times `FileHistory.compact` starts over, when another process
+# replaces the file while it's being compacted.
+_COMPACTION_ATTEMPTS = 3
+
 
 class History(metaclass=ABCMeta):
     """
@@ -39,6 +76,16 @@ class History(metaclass=ABCMeta):
         # item first.
         self._loaded_strings: List[str] = []
 
+        # Iterator over `load_history_strings()` while loading is in progress,
+        # and the number of strings appended so far. (Entries are inserted at
+        # the front, which shifts the position of running `load()` calls.)
+        self._loader: Optional[Iterator[str]] = None
+        self._appended_count = 0
+
+        # Index over the lines of `_loaded_strings`. (Created on first use,
+        # and synchronized lazily.)
+        self._line_index: Optional[_LineIndex] = None
+
     #
     # Methods expected by `Buffer`.
     #
@@ -53,13 +100,42 @@ class History(metaclass=ABCMeta):
         responsible here for both caching, and making sure that strings that
         were were appended to the history will be incorporated next time this
         method is called.
+
+        Entries are only taken from the backend as they are consumed. (The
+        `Buffer` stops consuming when it has enough entries, and continues
+        when the user goes back further or searches.)
         """
-        if not self._loaded:
-            self._loaded_strings = list(self.load_history_strings())
-            self._loaded = True
+        if not self._loaded and self._loader is None:
+            self._loaded_strings = []
+            self._loader = iter(self.load_history_strings())
 
-        for item in self._loaded_strings:
-            yield item
+        index = 0
+        appended_count = self._appended_count
+
+        while True:
+            # Entries appended in the meantime were inserted at the front.
+            index += self._appended_count - appended_count
+            appended_count = self._appended_count
+
+            if index < len(self._loaded_strings):
+                yield self._loaded_strings[index]
+                index += 1
+
+            elif self._loaded or self._loader is None:
+                break
+
+            else:
+                # Pull the next batch from the backend. Newest entries come
+                # first, so the history is usable before it's fully loaded.
+                # In between batches, give control back to the event loop.
+                batch = list(islice(self._loader, _LOAD_BATCH_SIZE))
+                self._loaded_strings.extend(batch)
+
+                if len(batch) < _LOAD_BATCH_SIZE:
+                    self._loaded = True
+                    self._loader = None
+                else:
+                    await asyncio.sleep(0)
 
     def get_strings(self) -> List[str]:
         """
@@ -71,8 +147,57 @@ class History(metaclass=ABCMeta):
     def append(self, string: str) -> None:
         "Add string to the history."
         self._loaded_strings.insert(0, string)
+        self._appended_count += 1
         self.store_string(string)
 
+    #
+    # Queries. (Used by auto suggestion and history completion.)
+    #
+
+    #: `True` when the backend answers queries from its own storage, rather
+    #: than from the strings loaded so far. Wrappers like `ThreadedHistory`
+    #: forward queries to such backends.
+    queries_storage = False
+
+    def find_line_starting_with(self, prefix: str) -> Optional[str]:
+        """
+        Return the most recent line of the history that starts with `prefix`
+        or `None`. (The first line :meth:`.get_lines_starting_with` would
+        yield.)
+
+        This is answered from an index which is kept up to date incrementally
+        while strings are loaded and appended, so it takes time proportional
+        to the prefix length rather than to the size of the history.
+        """
+        return self._synchronized_line_index().find(prefix)
+
+    def _synchronized_line_index(self) -> "_LineIndex":
+        index = self._line_index
+        if index is None:
+            index = self._line_index = _LineIndex()
+
+        index.synchronize(self._loaded_strings, self._appended_count)
+        return index
+
+    def get_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        """
+        Yield the lines of the history entries that start with `prefix`. Most
+        recent entry first, and within an entry, last line first.
+        """
+        return _lines_starting_with(list(self._loaded_strings), prefix)
+
+    def get_stripped_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        """
+        Yield the unique lines of the history that start with `prefix` after
+        stripping them, stripped and most recent first. (For the history lines
+        completion.)
+
+        This is answered from the same index as
+        :meth:`.find_line_starting_with`. Matching lines are ranked lazily,
+        so taking the first few doesn't rank all of them.
+        """
+        return self._synchronized_line_index().stripped_lines_starting_with(prefix)
+
     #
     # Implementation for specific backends.
     #
@@ -184,23 +309,52 @@ class ThreadedHistory(History):
             # written these entries back to disk and we will reload it.
             self._loaded_strings = []
 
-            for item in self.history.load_history_strings():
+            for i, item in enumerate(self.history.load_history_strings(), 1):
                 with self._lock:
                     self._loaded_strings.append(item)
 
+                    # Keep the line index up to date from this thread, so
+                    # that queries don't have to do it.
+                    if i % _LOAD_BATCH_SIZE == 0:
+                        self._synchronized_line_index()
+
                 for event in self._string_load_events:
                     event.set()
         finally:
             with self._lock:
                 self._loaded = True
+                self._synchronized_line_index()
             for event in self._string_load_events:
                 event.set()
 
     def append(self, string: str) -> None:
         with self._lock:
             self._loaded_strings.insert(0, string)
+            self._appended_count += 1
         self.store_string(string)
 
+    def find_line_starting_with(self, prefix: str) -> Optional[str]:
+        if self.history.queries_storage:
+            return self.history.find_line_starting_with(prefix)
+
+        with self._lock:
+            index = self._synchronized_line_index()
+        return index.find(prefix)
+
+    def get_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        if self.history.queries_storage:
+            return self.history.get_lines_starting_with(prefix)
+        with self._lock:
+            strings = list(self._loaded_strings)
+        return _lines_starting_with(strings, prefix)
+
+    def get_stripped_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        if self.history.queries_storage:
+            return self.history.get_stripped_lines_starting_with(prefix)
+        with self._lock:
+            index = self._synchronized_line_index()
+        return index.stripped_lines_starting_with(prefix)
+
     # All of the following are proxied to `self.history`.
 
     def load_history_strings(self) -> Iterable[str]:
@@ -259,52 +413,921 @@ class DummyHistory(History):
 class FileHistory(History):
     """
     :class:`.History` class that stores all strings in a file.
+
+    When `max_entries` or `max_bytes` is given, the file is compacted in a
+    background thread the first time the history is loaded, and again when it
+    grows beyond twice `max_bytes`. See :meth:`.compact`.
+
+    :param max_entries: Maximum number of entries to keep.
+    :param max_bytes: Maximum size of the history file in bytes.
+    :param archive: When `True`, entries dropped because of the limits are
+        appended to a gzip compressed file next to the history file
+        (``<filename>.archive.gz``), instead of being discarded.
     """
 
-    def __init__(self, filename: str) -> None:
+    def __init__(
+        self,
+        filename: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        archive: bool = False,
+    ) -> None:
         self.filename = filename
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.archive = archive
+
+        # Serializes writes to the file and the swap at the end of a
+        # compaction.
+        self._write_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
         super(FileHistory, self).__init__()
 
+    @property
+    def archive_filename(self) -> str:
+        return self.filename + ".archive.gz"
+
+    def compact(self) -> None:
+        """
+        Rewrite the history file: drop duplicate entries (keeping the most
+        recent occurrence) and enforce `max_entries` and `max_bytes`.
+
+        The new content is written to a temporary file which atomically
+        replaces the history file. Entries that are appended while the
+        compaction is running (by any process that appends through
+        `FileHistory`) are carried over: the file is swapped while holding
+        the file lock that appends take as well.
+        """
+        # When another process replaced the file (compacted it) after we read
+        # it, start over.
+        for _ in range(_COMPACTION_ATTEMPTS):
+            if self._compact_once():
+                return
+
+    def _compact_once(self) -> bool:
+        """
+        Compact the history file. Return `False` when nothing was done,
+        because the file was replaced while reading it.
+        """
+        if not os.path.exists(self.filename):
+            return True
+
+        with open(self.filename, "rb") as f:
+            data = f.read()
+            inode = os.fstat(f.fileno()).st_ino
+
+        kept, dropped = _compact_history_blocks(
+            _split_history_blocks(data), self.max_entries, self.max_bytes
+        )
+
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_filename = tempfile.mkstemp(
+            prefix=".%s." % os.path.basename(self.filename), dir=directory
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(b"".join(kept))
+
+                # Swap files while holding the locks, so that appends can't
+                # get lost in between.
+                with self._write_lock, _open_locked(self.filename, "rb") as original:
+                    if os.fstat(original.fileno()).st_ino != inode:
+                        os.remove(tmp_filename)
+                        return False
+
+                    original.seek(len(data))
+                    f.write(original.read())
+                    f.flush()
+                    os.replace(tmp_filename, self.filename)
+        except BaseException:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            raise
+
+        if self.archive and dropped:
+            with gzip.open(self.archive_filename, "ab") as f:
+                f.write(b"".join(dropped))
+
+        return True
+
+    def start_compaction(self) -> threading.Thread:
+        """
+        Run :meth:`.compact` in a background (daemon) thread. If a compaction
+        is already running, return that thread instead.
+        """
+        thread = self._compaction_thread
+
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=self._compact_in_thread, daemon=True)
+            self._compaction_thread = thread
+            thread.start()
+
+        return thread
+
+    def _compact_in_thread(self) -> None:
+        try:
+            self.compact()
+        except OSError:
+            # Not fatal. (E.g., Windows doesn't allow replacing a file which
+            # is still opened by a reader.) Try again next time.
+            pass
+
+    @property
+    def _has_limits(self) -> bool:
+        return self.max_entries is not None or self.max_bytes is not None
+
     def load_history_strings(self) -> Iterable[str]:
-        strings: List[str] = []
-        lines: List[str] = []
+        """
+        Yield the entries of the history file, most recent first.
+
+        The file is memory mapped and parsed backwards from the end, one batch
+        of entries at the time. So, the newest entries are available
+        immediately and older entries are only read when they are actually
+        consumed. The file is not kept open in between batches (that would
+        prevent a compaction from replacing it on Windows); the next batch is
+        read from where the previous one stopped. When the file was replaced
+        in the meantime, the replacement is read from the end, skipping the
+        entries that were yielded already.
+        """
+        if not os.path.exists(self.filename):
+            return
+
+        if self._has_limits and self._compaction_thread is None:
+            self.start_compaction()
+
+        inode: Optional[int] = None
+        position: Optional[int] = None
+        yielded: Set[str] = set()
+
+        while True:
+            try:
+                with open(self.filename, "rb") as f:
+                    st_ino = os.fstat(f.fileno()).st_ino
+                    if st_ino != inode:
+                        inode, position = st_ino, None
+
+                    try:
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:
+                        # Empty files can't be mapped.
+                        return
+
+                    with data:
+                        # The file was replaced when it's another inode, or
+                        # when it shrank. (Appends only make it grow.)
+                        entries: Iterator[Tuple[str, int]]
+
+                        if position is None or position > len(data):
+                            entries = (
+                                (string, start)
+                                for string, start in _iter_history_file_reversed(
+                                    data, len(data)
+                                )
+                                if string not in yielded
+                            )
+                        else:
+                            entries = _iter_history_file_reversed(data, position)
+
+                        batch = list(islice(entries, _LOAD_BATCH_SIZE))
+            except FileNotFoundError:
+                return
+
+            for string, _ in batch:
+                yielded.add(string)
+                yield string
+
+            if len(batch) < _LOAD_BATCH_SIZE:
+                return
+
+            # Continue before the start of the last entry.
+            position = batch[-1][1]
+
+    def store_string(self, string: str) -> None:
+        # Save to file. (Locked, so that a compaction in another process
+        # doesn't replace the file while we write.)
+        with self._write_lock, _open_locked(self.filename, "ab") as f:
+            f.write(_format_history_entry(string))
+            f.flush()
+            size = f.tell()
+
+        if self.max_bytes is not None and size > 2 * self.max_bytes:
+            self.start_compaction()
+
+
+def _iter_history_file_reversed(
+    data: "mmap.mmap", end: int
+) -> Iterator[Tuple[str, int]]:
+    """
+    Parse the content of a history file backwards, starting at `end`. Each
+    entry consists of consecutive lines starting with "+". Any other line
+    (timestamp comments, empty lines) separates entries.
+
+    Yield `(entry, start)` tuples, where `start` is the offset of the first
+    line of the entry. (Parsing can be resumed from there.)
+    """
+    chunks: List[bytes] = []
+    position = end
 
-        def add() -> None:
-            if lines:
-                # Join and drop trailing newline.
-                string = "".join(lines)[:-1]
+    def entry() -> str:
+        # Join and drop trailing newline.
+        return b"".join(reversed(chunks)).decode("utf-8", errors="replace")[:-1]
 
-                strings.append(string)
+    while position > 0:
+        # Start of the line that ends at `position`. (Including its newline.)
+        start = data.rfind(b"\n", 0, position - 1) + 1
 
-        if os.path.exists(self.filename):
-            with open(self.filename, "rb") as f:
-                for line_bytes in f:
-                    line = line_bytes.decode("utf-8", errors="replace")
+        if data[start : start + 1] == b"+":
+            chunks.append(data[start + 1 : position])
+        elif chunks:
+            yield entry(), position
+            chunks = []
 
-                    if line.startswith("+"):
-                        lines.append(line[1:])
-                    else:
-                        add()
-                        lines = []
+        position = start
 
-                add()
+    if chunks:
+        yield entry(), 0
 
-        # Reverse the order, because newest items have to go first.
-        return reversed(strings)
+
+class SharedFileHistory(FileHistory):
+    """
+    :class:`.FileHistory` meant to be shared by many sessions in one process.
+    (E.g. all the connections of a telnet or SSH server.)
+
+    Pass the same instance to all the prompts, or use :meth:`.for_file` to
+    get the instance for a given file. The file is loaded and indexed only
+    once; every `Buffer` reads from the same in-memory list.
+
+    Appends are handed to a single writer thread, which writes them in
+    batches while holding an exclusive lock on the file, so that several
+    processes can safely share one history file.
+    """
+
+    _instances: "weakref.WeakValueDictionary[str, SharedFileHistory]" = (
+        weakref.WeakValueDictionary()
+    )
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        filename: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        archive: bool = False,
+    ) -> None:
+        super().__init__(
+            filename, max_entries=max_entries, max_bytes=max_bytes, archive=archive
+        )
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_thread_lock = threading.Lock()
+
+        # Don't lose pending writes when the interpreter exits.
+        _shared_file_histories.add(self)
+
+    @classmethod
+    def for_file(cls, filename: str, **kwargs: Any) -> "SharedFileHistory":
+        """
+        Return the shared history instance for this file. It's created the
+        first time, later calls return the same instance. (Keyword arguments
+        are only used when creating it.)
+        """
+        key = os.path.abspath(filename)
+
+        with cls._instances_lock:
+            history = cls._instances.get(key)
+            if history is None:
+                history = cls(filename, **kwargs)
+                cls._instances[key] = history
+            return history
 
     def store_string(self, string: str) -> None:
-        # Save to file.
-        with open(self.filename, "ab") as f:
+        with self._writer_thread_lock:
+            self._queue.put(string)
+
+            # The writer thread stops when there's nothing left to write. (It
+            # holds a reference to this history.)
+            if self._writer_thread is None:
+                self._start_writer_thread()
+
+    def _start_writer_thread(self) -> None:
+        # (Called while holding `_writer_thread_lock`.)
+        self._writer_thread = threading.Thread(
+            target=self._in_writer_thread, daemon=True
+        )
+        self._writer_thread.start()
+
+    def flush(self) -> None:
+        """
+        Wait until all appended strings have been written to the file.
+        """
+        self._queue.join()
 
-            def write(t: str) -> None:
-                f.write(t.encode("utf-8"))
+    def _in_writer_thread(self) -> None:
+        try:
+            while True:
+                with self._writer_thread_lock:
+                    try:
+                        strings = [self._queue.get_nowait()]
+                    except queue.Empty:
+                        return
+
+                # Write everything that's pending in one go.
+                while True:
+                    try:
+                        strings.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                try:
+                    self._write_strings(strings)
+                finally:
+                    for _ in strings:
+                        self._queue.task_done()
+        finally:
+            # Never leave a dead thread behind, or `flush` would wait forever
+            # for the strings that are still queued.
+            with self._writer_thread_lock:
+                self._writer_thread = None
+                if not self._queue.empty():
+                    self._start_writer_thread()
+
+    def _write_strings(self, strings: List[str]) -> None:
+        # There's nobody to report errors to. Drop what can't be written
+        # (e.g., strings with lone surrogates can't be encoded), but don't
+        # kill the writer.
+        entries = []
+        for string in strings:
+            try:
+                entries.append(_format_history_entry(string))
+            except Exception:
+                pass
+
+        try:
+            with self._write_lock, _open_locked(self.filename, "ab") as f:
+                f.write(b"".join(entries))
+                f.flush()
+                size = f.tell()
+
+            if self.max_bytes is not None and size > 2 * self.max_bytes:
+                self.start_compaction()
+        except Exception:
+            pass
+
+    def __repr__(self) -> str:
+        return "SharedFileHistory(%r)" % (self.filename,)
 
-            write("\n# %s\n" % datetime.datetime.now())
-            for line in string.split("\n"):
-                write("+%s\n" % line)
 
+# All `SharedFileHistory` instances that are alive, flushed at exit. (Weak,
+# so that the histories of closed sessions can be garbage collected.)
+_shared_file_histories: "weakref.WeakSet[SharedFileHistory]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_shared_file_histories() -> None:
+    for history in list(_shared_file_histories):
+        history.flush()
+
+
+class SQLiteHistory(History):
+    """
+    :class:`.History` stored in an SQLite database.
+
+    Every entry is stored together with a timestamp, the working directory and
+    a session id. When the SQLite library supports it, a full text index
+    (FTS5, trigram tokenizer) is maintained, so that substring searches don't
+    have to scan the whole history. Otherwise, searching falls back to a table
+    scan inside SQLite.
+
+    :param filename: Path of the database file. (Created when it doesn't
+        exist.)
+    :param session_id: Identifies this session in the database. By default, a
+        random id is generated.
+    """
+
+    queries_storage = True
 
+    def __init__(self, filename: str, session_id: Optional[str] = None) -> None:
+        super().__init__()
+        self.filename = filename
+        self.session_id = session_id or uuid.uuid4().hex
+
+        # The connection is used from loader threads as well. Serialize access.
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._fts = False
+
+        with self._lock, self._connection as c:
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "id INTEGER PRIMARY KEY, string TEXT NOT NULL, "
+                "timestamp REAL NOT NULL, cwd TEXT, session TEXT)"
+            )
+            try:
+                c.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5("
+                    "string, content='history', content_rowid='id', "
+                    "tokenize='trigram')"
+                )
+                c.execute(
+                    "CREATE TRIGGER IF NOT EXISTS history_fts_insert "
+                    "AFTER INSERT ON history BEGIN "
+                    "INSERT INTO history_fts(rowid, string) "
+                    "VALUES (new.id, new.string); END"
+                )
+                c.execute(
+                    "CREATE TRIGGER IF NOT EXISTS history_fts_delete "
+                    "AFTER DELETE ON history BEGIN "
+                    "INSERT INTO history_fts(history_fts, rowid, string) "
+                    "VALUES ('delete', old.id, old.string); END"
+                )
+            except sqlite3.OperationalError:
+                # No FTS5 or no trigram tokenizer (SQLite < 3.34).
+                pass
+            else:
+                self._fts = True
+
+    def load_history_strings(self) -> Iterable[str]:
+        yield from self._select("SELECT string FROM history ORDER BY id DESC", ())
+
+    def store_string(self, string: str) -> None:
+        with self._lock, self._connection as c:
+            c.execute(
+                "INSERT INTO history (string, timestamp, cwd, session) "
+                "VALUES (?, ?, ?, ?)",
+                (string, time.time(), _getcwd(), self.session_id),
+            )
+
+    def query(
+        self,
+        text: str = "",
+        prefix: bool = False,
+        cwd: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the history entries that contain `text` (or start with `text`
+        when `prefix` is set). Most recent first.
+
+        :param cwd: Only entries stored in this working directory.
+        :param session_id: Only entries stored by this session.
+        :param limit: Maximum number of entries.
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+
+        if text:
+            # The trigram index can only be used for three or more characters.
+            if self._fts and len(text) >= 3:
+                conditions.append(
+                    "id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)"
+                )
+                params.append('"%s"' % text.replace('"', '""'))
+
+            if prefix:
+                conditions.append("substr(string, 1, ?) = ?")
+                params.extend([len(text), text])
+            else:
+                conditions.append("instr(string, ?) > 0")
+                params.append(text)
+
+        if cwd is not None:
+            conditions.append("cwd = ?")
+            params.append(cwd)
+
+        if session_id is not None:
+            conditions.append("session = ?")
+            params.append(session_id)
+
+        sql = "SELECT string FROM history"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return self._select(sql, params)
+
+    def find_line_starting_with(self, prefix: str) -> Optional[str]:
+        return next(self.get_lines_starting_with(prefix), None)
+
+    def get_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        return _lines_starting_with(self.query(prefix), prefix)
+
+    def get_stripped_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        return _stripped_lines_starting_with(self.query(prefix), prefix)
+
+    def _select(self, sql: str, params: Sequence[Any]) -> Iterator[str]:
+        """
+        Run a query and yield the first column of every row. Rows are fetched
+        in batches, so that consumers can stop early.
+        """
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+            rows = cursor.fetchmany(_LOAD_BATCH_SIZE)
+
+        while rows:
+            for row in rows:
+                yield row[0]
+
+            with self._lock:
+                rows = cursor.fetchmany(_LOAD_BATCH_SIZE)
+
+    def __repr__(self) -> str:
+        return "SQLiteHistory(%r)" % (self.filename,)
+
+
+#: Recency of a line is `entry_recency * _MAX_LINES_PER_ENTRY + line_number`,
+#: so that later lines of an entry count as more recent.
+_MAX_LINES_PER_ENTRY = 1 << 20
+
+#: When more lines than this share a prefix, `_LineIndex.find` walks the lines
+#: in order of recency instead of comparing the recency of every one of them.
+_MAX_RANGE_COMPARISONS = 64
+
+
+class _SortedLines:
+    """
+    Unique lines kept in a sorted list, so that the lines sharing a prefix
+    form one contiguous range, found with two bisections. A parallel list
+    holds the recency of every line. New lines are collected and merged in on
+    the next query: inserted one by one when there are few, by sorting
+    everything again when there are many.
+    """
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.recency: List[int] = []
+        self.recency_of: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+
+    def add(self, line: str, recency: int) -> None:
+        self.recency_of[line] = recency
+        self._dirty.add(line)
+
+    def merge(self) -> bool:
+        """
+        Merge the new lines in. Return `True` when anything changed.
+        """
+        if not self._dirty:
+            return False
+
+        lines = self.lines
+        recency = self.recency
+        recency_of = self.recency_of
+
+        if len(self._dirty) * 8 > len(lines):
+            lines[:] = sorted(recency_of)
+            recency[:] = [recency_of[l] for l in lines]
+        else:
+            for line in self._dirty:
+                i = bisect_left(lines, line)
+                if i < len(lines) and lines[i] == line:
+                    recency[i] = recency_of[line]
+                else:
+                    lines.insert(i, line)
+                    recency.insert(i, recency_of[line])
+
+        self._dirty.clear()
+        return True
+
+    def range(self, prefix: str) -> Tuple[int, int]:
+        "Start and end of the lines starting with `prefix`."
+        lines = self.lines
+        start = bisect_left(lines, prefix)
+        return start, bisect_left(lines, prefix + "\U0010ffff", start)
+
+
+class _LineIndex:
+    """
+    Index over the lines of a history.
+
+    The unique lines are kept sorted (see :class:`._SortedLines`), once as
+    they are, for finding the most recent line that starts with a prefix,
+    and once stripped, for the history lines completion, which matches the
+    stripped lines against the (stripped) text before the cursor.
+
+    The unique lines are also kept in order of recency. When many lines share
+    the prefix (a short prefix), the most recent one is found by walking the
+    lines newest first, up to the first match. (With many matches, that's
+    found early.) Otherwise, the recency of every line in the range is
+    compared. Either way, it's only proportional to the number of lines when
+    there are few matching lines, far back in the history.
+
+    The result of the previous query is remembered: when the user types one
+    more character and the previous line still matches, it's also the most
+    recent line for the longer prefix.
+
+    Likewise, all the stripped lines starting with a prefix are ranked with a
+    heap over their range, which is popped lazily. When the range holds a
+    large part of all the lines, walking the lines newest first is cheaper.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._lines = _SortedLines()
+        self._stripped_lines = _SortedLines()
+
+        # Lines in order of recency. Lines from appended entries (newest
+        # last, can contain duplicates) and from loaded entries (newest first).
+        self._newer_lines: List[str] = []
+        self._older_lines: List[str] = []
+
+        self._newest = 0
+        self._oldest = 0
+
+        # What has been synchronized. (The list object itself, because
+        # `History.load` can replace it.)
+        self._strings: Optional[List[str]] = None
+        self._strings_count = 0
+        self._appended_count = 0
+
+        self._last_query: Optional[Tuple[str, Optional[str]]] = None
+
+    def synchronize(self, strings: List[str], appended_count: int) -> None:
+        """
+        Index what was added to `strings` (a history's `_loaded_strings`)
+        since the last call. Appended strings were inserted at the front,
+        loaded strings at the end.
+        """
+        with self._lock:
+            appended = appended_count - self._appended_count
+            self._appended_count = appended_count
+
+            if strings is not self._strings or len(strings) < (
+                self._strings_count + appended
+            ):
+                # Replaced, start over.
+                self._reset()
+                self._strings = strings
+                self._appended_count = appended_count
+                appended = 0
+
+            for string in reversed(strings[:appended]):
+                self._newest += 1
+                self._add(string, self._newest)
+
+            for string in strings[self._strings_count + appended :]:
+                self._oldest -= 1
+                self._add(string, self._oldest)
+
+            self._strings_count = len(strings)
+
+    def _add(self, string: str, entry_recency: int) -> None:
+        sorted_lines = self._lines
+        stripped_lines = self._stripped_lines
+        base = entry_recency * _MAX_LINES_PER_ENTRY
+        lines = string.splitlines()
+
+        if entry_recency > 0:
+            # Newer than anything indexed so far.
+            for i, line in enumerate(lines):
+                recency = base + min(i, _MAX_LINES_PER_ENTRY - 1)
+                sorted_lines.add(line, recency)
+
+                stripped = line.strip()
+                if stripped:
+                    stripped_lines.add(stripped, recency)
+
+                self._newer_lines.append(line)
+        else:
+            # Older than anything indexed so far. Only add unknown lines.
+            # (The last line of an entry is the most recent one.)
+            for i in range(len(lines) - 1, -1, -1):
+                line = lines[i]
+                if line not in sorted_lines.recency_of:
+                    recency = base + min(i, _MAX_LINES_PER_ENTRY - 1)
+                    sorted_lines.add(line, recency)
+
+                    stripped = line.strip()
+                    if stripped and stripped not in stripped_lines.recency_of:
+                        stripped_lines.add(stripped, recency)
+
+                    self._older_lines.append(line)
+
+    def find(self, prefix: str) -> Optional[str]:
+        with self._lock:
+            sorted_lines = self._lines
+            if sorted_lines.merge():
+                self._last_query = None
+
+            last_query = self._last_query
+            if (
+                last_query is not None
+                and prefix.startswith(last_query[0])
+                and (last_query[1] is None or last_query[1].startswith(prefix))
+            ):
+                # Nothing matched the shorter prefix, or the previous result
+                # still matches.
+                result = last_query[1]
+            else:
+                lines = sorted_lines.lines
+                start, end = sorted_lines.range(prefix)
+
+                if start == end:
+                    result = None
+                elif end - start <= _MAX_RANGE_COMPARISONS:
+                    result = lines[
+                        max(range(start, end), key=sorted_lines.recency.__getitem__)
+                    ]
+                else:
+                    result = next(
+                        line for line in self._newest_first() if line.startswith(prefix)
+                    )
+
+            self._last_query = (prefix, result)
+            return result
+
+    def _newest_first(self) -> Iterator[str]:
+        """
+        All lines, most recent first. (Lines from appended entries can occur
+        more than once, the first occurrence is the most recent one.)
+        """
+        return chain(reversed(self._newer_lines), self._older_lines)
+
+    def stripped_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        """
+        Yield the unique stripped lines that start with `prefix`, most recent
+        first. Ranking is done lazily, taking the first few is cheap.
+        """
+        with self._lock:
+            stripped_lines = self._stripped_lines
+            stripped_lines.merge()
+            start, end = stripped_lines.range(prefix)
+
+            if (end - start) * 8 > len(stripped_lines.lines):
+                return self._walk_stripped_lines_starting_with(prefix)
+
+            # Copy the range, the lists can change while this is consumed.
+            heap = [
+                (-recency, line)
+                for line, recency in zip(
+                    stripped_lines.lines[start:end], stripped_lines.recency[start:end]
+                )
+            ]
+
+        heapify(heap)
+        return (heappop(heap)[1] for _ in range(len(heap)))
+
+    def _walk_stripped_lines_starting_with(self, prefix: str) -> Iterator[str]:
+        seen: Set[str] = set()
+
+        for line in self._newest_first():
+            line = line.strip()
+            if line and line.startswith(prefix) and line not in seen:
+                seen.add(line)
+                yield line
+
+
+def _lines_starting_with(strings: Iterable[str], prefix: str) -> Iterator[str]:
+    for string in strings:
+        for line in reversed(string.splitlines()):
+            if line.startswith(prefix):
+                yield line
+
+
+def _stripped_lines_starting_with(
+    strings: Iterable[str], prefix: str
+) -> Iterator[str]:
+    seen: Set[str] = set()
+
+    for string in strings:
+        for line in reversed(string.splitlines()):
+            line = line.strip()
+            if line and line.startswith(prefix) and line not in seen:
+                seen.add(line)
+                yield line
+
+
+def _getcwd() -> Optional[str]:
+    try:
+        return os.getcwd()
+    except OSError:
+        # The working directory was removed.
+        return None
+
+
+def _format_history_entry(string: str) -> bytes:
+    """
+    Serialize a history entry: a timestamp comment followed by the lines of
+    the entry, each prefixed with "+".
+    """
+    lines = ["\n# %s\n" % datetime.datetime.now()]
+    lines.extend("+%s\n" % line for line in string.split("\n"))
+    return "".join(lines).encode("utf-8")
+
+
+@contextmanager
+def _locked_file(f: BinaryIO) -> Iterator[None]:
+    """
+    Hold an exclusive (advisory) lock on the given file. This blocks until
+    other processes release their lock.
+    """
+    if sys.platform == "win32":
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def _open_locked(filename: str, mode: str) -> Iterator[BinaryIO]:
+    """
+    Open the file and hold an exclusive lock on it. When the file was
+    replaced while waiting for the lock (by a compaction), open the new file
+    instead.
+    """
+    while True:
+        with cast(BinaryIO, open(filename, mode)) as f:
+            with _locked_file(f):
+                try:
+                    replaced = os.stat(filename).st_ino != os.fstat(f.fileno()).st_ino
+                except FileNotFoundError:
+                    replaced = True
+
+                if not replaced:
+                    yield f
+                    return
+
+
+def _split_history_blocks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """
+    Split the content of a history file into `(header, body)` tuples, oldest
+    first. The header holds the lines preceding an entry (the timestamp
+    comment), the body holds the "+" lines of the entry.
+    """
+    blocks: List[Tuple[bytes, bytes]] = []
+    header: List[bytes] = []
+    body: List[bytes] = []
+
+    for line in data.splitlines(True):
+        if line.startswith(b"+"):
+            body.append(line)
+        else:
+            if body:
+                blocks.append((b"".join(header), b"".join(body)))
+                header = []
+                body = []
+            header.append(line)
+
+    if body:
+        blocks.append((b"".join(header), b"".join(body)))
+
+    return blocks
+
+
+def _compact_history_blocks(
+    blocks: List[Tuple[bytes, bytes]],
+    max_entries: Optional[int],
+    max_bytes: Optional[int],
+) -> Tuple[List[bytes], List[bytes]]:
+    """
+    Deduplicate history blocks, keeping the most recent occurrence, and apply
+    the limits. Returns the kept and the dropped (over the limit) blocks, both
+    oldest first.
+    """
+    seen = set()
+    kept: List[bytes] = []
+    dropped: List[bytes] = []
+    size = 0
+
+    # Walk backwards, so that the most recent entries are kept.
+    for header, body in reversed(blocks):
+        if body in seen:
+            continue
+        seen.add(body)
+
+        block = header + body
+        size += len(block)
+
+        if (max_entries is not None and len(kept) >= max_entries) or (
+            max_bytes is not None and size > max_bytes
+        ):
+            dropped.append(block)
+        else:
+            kept.append(block)
 
+    kept.reverse()
+    dropped.reverse()
+    return kept, dropped
 
 
 MemoryHistory = InMemoryHistory()
@@ -77,7 +77,8 @@ class Vt100(Input):
         self._buffer: List[KeyPress] = []  # Buffer to collect the Key objects.
         self.stdin_reader = PosixStdinReader(self._fileno, encoding=stdin.encoding)
         self.vt100_parser = Vt100Parser(
-            lambda key_press: self._buffer.append(key_press)
+            lambda key_press: self._buffer.append(key_press),
+            lambda key_presses: self._buffer.extend(key_presses),
         )
 
     def attach(self, input_ready_callback: Callable[[], None]) -> ContextManager[None]:
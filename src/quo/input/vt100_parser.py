@@ -2,7 +2,7 @@
 Parser for VT100 input stream.
 """
 import re
-from typing import Callable, Dict, Generator, Tuple, Union
+from typing import Callable, Dict, Generator, List, Optional, Pattern, Tuple, Union
 
 from quo.keys.key_binding.key_processor import KeyPress
 from quo.keys.list import Keys
@@ -10,6 +10,7 @@ from quo.i_o.output.ansi_escape_sequences import ANSI_SEQUENCES
 
 __all__ = [
     "Vt100Parser",
+    "add_ansi_sequence",
 ]
 
 
@@ -36,32 +37,126 @@ class _Flush:
     pass
 
 
-class _IsPrefixOfLongerMatchCache(Dict[str, bool]):
+_Match = Union[Keys, Tuple[Keys, ...]]
+
+
+class _SequenceTable:
     """
-    Dictionary that maps input sequences to a boolean indicating whether there is
-    any key that start with this characters.
+    Lookup table for the key sequences in `ANSI_SEQUENCES`.
+
+    This is a trie, flattened into a dictionary: it maps every prefix of
+    every sequence to a (match, is_prefix_of_longer_match) tuple, so that both
+    questions are answered with one lookup. (The CPR responses and mouse
+    events don't fit in the table, because they contain integer variables.
+    They are recognized with regexes.)
+
+    The table follows `ANSI_SEQUENCES`: sequences that are added to the
+    dictionary are added to the table when the size of the dictionary
+    changes. Use :func:`.add_ansi_sequence` to replace a sequence.
     """
 
-    def __missing__(self, prefix: str) -> bool:
-        # (hard coded) If this could be a prefix of a CPR response, return
-        # True.
-        if _cpr_response_prefix_re.match(prefix) or _mouse_event_prefix_re.match(
-            prefix
-        ):
-            result = True
+    def __init__(self, sequences: Dict[str, _Match]) -> None:
+        self.sequences = sequences
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._table: Dict[str, Tuple[Optional[_Match], bool]] = {}
+        self._size = 0
+        self._start_characters = {"\x1b"}  # CPR responses and mouse events.
+        self.plain_text_re = self._create_plain_text_re()
+        self.sync()
+
+    def sync(self) -> None:
+        """
+        Add the sequences that were added to the dictionary since the last
+        call. (The dictionary keeps the insertion order.)
+        """
+        size = len(self.sequences)
+
+        if size != self._size:
+            if size < self._size:
+                self._rebuild()
+                return
+
+            start_characters = set(self._start_characters)
+
+            for i, (sequence, key) in enumerate(self.sequences.items()):
+                if i >= self._size:
+                    self._add(sequence, key)
+                    start_characters.add(sequence[0])
+
+            self._size = size
+
+            if start_characters != self._start_characters:
+                self._start_characters = start_characters
+                self.plain_text_re = self._create_plain_text_re()
+
+    def _add(self, sequence: str, key: _Match) -> None:
+        table = self._table
+
+        if key:
+            for i in range(1, len(sequence)):
+                prefix = sequence[:i]
+                match, _ = table.get(prefix, (None, False))
+                table[prefix] = (match, True)
+
+        _, is_prefix_of_longer_match = table.get(sequence, (None, False))
+        table[sequence] = (key, is_prefix_of_longer_match)
+
+    def add(self, sequence: str, key: _Match) -> None:
+        """
+        Add (or replace) a sequence, in the dictionary and in the table.
+        """
+        self.sync()
+
+        if sequence in self.sequences:
+            self.sequences[sequence] = key
+            self._rebuild()
         else:
-            # If this could be a prefix of anything else, also return True.
-            result = any(
-                v
-                for k, v in ANSI_SEQUENCES.items()
-                if k.startswith(prefix) and k != prefix
-            )
+            self.sequences[sequence] = key
+            self.sync()
 
-        self[prefix] = result
-        return result
+    def _create_plain_text_re(self) -> Pattern[str]:
+        """
+        Regex matching a run of characters that can't start a key sequence.
+        (These are simply inserted.)
+        """
+        return re.compile(
+            "[^%s]+" % "".join(re.escape(c) for c in sorted(self._start_characters))
+        )
 
+    def lookup(self, prefix: str) -> Tuple[Optional[_Match], bool]:
+        """
+        Return a (match, is_prefix_of_longer_match) tuple for this prefix.
+        """
+        self.sync()
 
-_IS_PREFIX_OF_LONGER_MATCH_CACHE = _IsPrefixOfLongerMatchCache()
+        match, is_prefix_of_longer_match = self._table.get(prefix, (None, False))
+
+        # (hard coded) CPR responses and mouse events.
+        if prefix.startswith("\x1b["):
+            if _cpr_response_re.match(prefix):
+                match = Keys.CPRResponse
+            elif _mouse_event_re.match(prefix):
+                match = Keys.Vt100MouseEvent
+
+            if _cpr_response_prefix_re.match(prefix) or _mouse_event_prefix_re.match(
+                prefix
+            ):
+                is_prefix_of_longer_match = True
+
+        return match, is_prefix_of_longer_match
+
+
+_SEQUENCE_TABLE = _SequenceTable(ANSI_SEQUENCES)
+
+
+def add_ansi_sequence(sequence: str, key: _Match) -> None:
+    """
+    Register a (custom) key sequence of the terminal. `key` is a `Keys` value,
+    or a tuple of them.
+    """
+    _SEQUENCE_TABLE.add(sequence, key)
 
 
 class Vt100Parser:
@@ -78,17 +173,26 @@ class Vt100Parser:
         i.feed('data\x01...')
 
     :attr feed_key_callback: Function that will be called when a key is parsed.
+    :attr feed_keys_callback: (Optional.) Function that will be called with a
+        list of keys, for a run of plain text characters. When not given,
+        `feed_key_callback` is called for each of them.
     """
 
     # Lookup table of ANSI escape sequences for a VT100 terminal
     # Hint: in order to know what sequences your terminal writes to stdin, run
     #       "od -c" and start typing.
-    def __init__(self, feed_key_callback: Callable[[KeyPress], None]) -> None:
+    def __init__(
+        self,
+        feed_key_callback: Callable[[KeyPress], None],
+        feed_keys_callback: Optional[Callable[[List[KeyPress]], None]] = None,
+    ) -> None:
         self.feed_key_callback = feed_key_callback
+        self.feed_keys_callback = feed_keys_callback
         self.reset()
 
     def reset(self, request: bool = False) -> None:
         self._in_bracketed_paste = False
+        self._prefix = ""
         self._start_parser()
 
     def _start_parser(self) -> None:
@@ -102,31 +206,21 @@ class Vt100Parser:
         """
         Return the key (or keys) that maps to this prefix.
         """
-        # (hard coded) If we match a CPR response, return Keys.CPRResponse.
-        # (This one doesn't fit in the ANSI_SEQUENCES, because it contains
-        # integer variables.)
-        if _cpr_response_re.match(prefix):
-            return Keys.CPRResponse
-
-        elif _mouse_event_re.match(prefix):
-            return Keys.Vt100MouseEvent
-
-        # Otherwise, use the mappings.
-        try:
-            return ANSI_SEQUENCES[prefix]
-        except KeyError:
-            return None
+        return _SEQUENCE_TABLE.lookup(prefix)[0]
 
     def _input_parser_generator(self) -> Generator[None, Union[str, _Flush], None]:
         """
         Coroutine (state machine) for the input parser.
+
+        The current prefix is kept in `self._prefix`, so that `feed` knows
+        when the state machine is idle.
         """
-        prefix = ""
         retry = False
         flush = False
 
         while True:
             flush = False
+            prefix = self._prefix
 
             if retry:
                 retry = False
@@ -141,8 +235,7 @@ class Vt100Parser:
 
             # If we have some data, check for matches.
             if prefix:
-                is_prefix_of_longer_match = _IS_PREFIX_OF_LONGER_MATCH_CACHE[prefix]
-                match = self._get_match(prefix)
+                match, is_prefix_of_longer_match = _SEQUENCE_TABLE.lookup(prefix)
 
                 # Exact matches found, call handlers..
                 if (flush or not is_prefix_of_longer_match) and match:
@@ -167,6 +260,8 @@ class Vt100Parser:
                         self._call_handler(prefix[0], prefix[0])
                         prefix = prefix[1:]
 
+            self._prefix = prefix
+
     def _call_handler(
         self, key: Union[str, Keys, Tuple[Keys, ...]], insert_text: str
     ) -> None:
@@ -214,16 +309,43 @@ class Vt100Parser:
 
                 self.feed(remaining)
 
-        # Handle normal input character by character.
+        # Handle normal input. Runs of plain text are handled at once, only
+        # the other characters go (one by one) through the parser.
         else:
-            for i, c in enumerate(data):
+            i = 0
+            length = len(data)
+            _SEQUENCE_TABLE.sync()
+            match_plain_text = _SEQUENCE_TABLE.plain_text_re.match
+            send = self._input_parser.send
+
+            while i < length:
                 if self._in_bracketed_paste:
                     # Quit loop and process from this position when the parser
                     # entered bracketed paste.
                     self.feed(data[i:])
                     break
-                else:
-                    self._input_parser.send(c)
+
+                if not self._prefix:
+                    m = match_plain_text(data, i)
+                    if m is not None:
+                        self._call_plain_text_handler(m.group())
+                        i = m.end()
+                        continue
+
+                send(data[i])
+                i += 1
+
+    def _call_plain_text_handler(self, text: str) -> None:
+        """
+        Callback to handler, for a run of characters that are inserted as-is.
+        """
+        key_presses = [KeyPress(c, c) for c in text]
+
+        if self.feed_keys_callback is not None:
+            self.feed_keys_callback(key_presses)
+        else:
+            for key_press in key_presses:
+                self.feed_key_callback(key_press)
 
     def flush(self) -> None:
         """
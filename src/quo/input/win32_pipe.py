@@ -44,7 +44,10 @@ class Win32PipeInput(_Win32InputBase, PipeInput):
 
         # Parser for incoming keys.
         self._buffer: List[KeyPress] = []  # Buffer to collect the Key objects.
-        self.vt100_parser = Vt100Parser(lambda key: self._buffer.append(key))
+        self.vt100_parser = Vt100Parser(
+            lambda key: self._buffer.append(key),
+            lambda keys: self._buffer.extend(keys),
+        )
 
         # Identifier for every PipeInput for the hash.
         self.__class__._id += 1
@@ -1,7 +1,39 @@
-from .list import Keys
-from .key_binding.key_bindings import Bind, ConditionalKeyBindings, merge_key_bindings
+from typing import TYPE_CHECKING, Any
+
+from quo.utils.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .key_binding.key_bindings import (  # noqa: F401
+        Bind,
+        Bind as KeyBinder,
+        ConditionalKeyBindings,
+        merge_key_bindings,
+    )
+    from .list import Keys  # noqa: F401
+
+    bind: Bind
+
 #from quo.keys.key_binding.vi_state import InputMode
 
-KeyBinder = Bind
+# Imported on first use, so that importing `quo.keys.list` for instance
+# doesn't import the key bindings.
+_getattr, __dir__ = lazy_attributes(
+    globals(),
+    {
+        "Keys": ".list",
+        "Bind": ".key_binding.key_bindings",
+        "ConditionalKeyBindings": ".key_binding.key_bindings",
+        "merge_key_bindings": ".key_binding.key_bindings",
+        "KeyBinder": ".key_binding.key_bindings:Bind",
+    },
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "bind":
+        # Global key bindings, shared by everything that uses `quo.keys.bind`.
+        from .key_binding.key_bindings import Bind
+
+        return globals().setdefault("bind", Bind())
 
-bind = Bind()
+    return _getattr(name)
@@ -37,6 +37,10 @@ def load_emacs_bindings() -> KeyBindingsBase:
     """
     Some e-macs extensions.
     """
+    return ConditionalKeyBindings(_create_emacs_bindings, emacs_mode)
+
+
+def _create_emacs_bindings() -> KeyBinder:
     # Overview of Readline emacs commands:
     # http://www.catonmat.net/download/readline-emacs-editing-mode-cheat-sheet.pdf
     key_bindings = KeyBinder()
@@ -332,10 +336,14 @@ def load_emacs_bindings() -> KeyBindingsBase:
 
         unindent(buffer, from_, to + 1, count=event.arg)
 
-    return ConditionalKeyBindings(key_bindings, emacs_mode)
+    return key_bindings
 
 
 def load_emacs_search_bindings() -> KeyBindingsBase:
+    return ConditionalKeyBindings(_create_emacs_search_bindings, emacs_mode)
+
+
+def _create_emacs_search_bindings() -> KeyBinder:
     key_bindings = KeyBinder()
     handle = key_bindings.add
     from . import search
@@ -398,14 +406,17 @@ def load_emacs_search_bindings() -> KeyBindingsBase:
             count=event.arg,
         )
 
-    return ConditionalKeyBindings(key_bindings, emacs_mode)
+    return key_bindings
 
 
 def load_emacs_shift_selection_bindings() -> KeyBindingsBase:
     """
     Bindings to select text with shift + cursor movements
     """
+    return ConditionalKeyBindings(_create_emacs_shift_selection_bindings, emacs_mode)
+
 
+def _create_emacs_shift_selection_bindings() -> KeyBinder:
     key_bindings = KeyBinder()
     handle = key_bindings.add
 
@@ -554,4 +565,4 @@ def load_emacs_shift_selection_bindings() -> KeyBindingsBase:
         key_press = event.key_sequence[0]
         event.key_processor.feed(key_press, first=True)
 
-    return ConditionalKeyBindings(key_bindings, emacs_mode)
+    return key_bindings
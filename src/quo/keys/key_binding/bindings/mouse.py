@@ -98,7 +98,7 @@ def load_mouse_bindings() -> KeyBinder:
                 return
 
             # Call the mouse handler from the renderer.
-            handler = event.app.renderer.mouse_handlers.mouse_handlers[y][x]
+            handler = event.app.renderer.mouse_handlers.get_mouse_handler(x, y)
             handler(MouseEvent(position=Point(x=x, y=y), event_type=mouse_event_type))
 
     @key_bindings.add(Keys.ScrollUp)
@@ -145,7 +145,7 @@ def load_mouse_bindings() -> KeyBinder:
             y -= rows_above_cursor
 
             # Call the mouse event handler.
-            handler = event.app.renderer.mouse_handlers.mouse_handlers[y][x]
+            handler = event.app.renderer.mouse_handlers.get_mouse_handler(x, y)
             handler(MouseEvent(position=Point(x=x, y=y), event_type=event_type))
 
     return key_bindings
@@ -566,7 +566,10 @@ def call_last_kbd_macro(event: E) -> None:
     macro = event.app.emacs_state.macro
 
     if macro:
-        event.app.key_processor.feed_multiple(macro, first=True)
+        # Feed copies, so that they are timestamped now.
+        event.app.key_processor.feed_multiple(
+            [KeyPress(k.key, k.data) for k in macro], first=True
+        )
 
 
 @register("print-last-kbd-macro")
@@ -33,7 +33,6 @@ from quo.filters.app import (
     vi_waiting_for_text_object_mode,
 )
 from quo.input.vt100_parser import Vt100Parser
-from quo.keys.key_binding.digraphs import DIGRAPHS
 from quo.keys.key_binding.key_processor import KeyPress, KeyPressEvent
 from quo.keys.key_binding.vi_state import CharacterFind, InputMode
 from quo.keys.list import Keys
@@ -377,6 +376,10 @@ def load_vi_bindings() -> KeyBindingsBase:
     # Overview of Readline Vi commands:
     # http://www.catonmat.net/download/bash-vi-editing-mode-cheat-sheet.pdf
     """
+    return ConditionalKeyBindings(_create_vi_bindings, vi_mode)
+
+
+def _create_vi_bindings() -> KeyBinder:
     # Note: Some key bindings have the "~IsReadOnly()" filter added. This
     #       prevents the handler to be executed when the focus is on a
     #       read-only buffer.
@@ -2084,6 +2087,9 @@ def load_vi_bindings() -> KeyBindingsBase:
         """
         Insert digraph.
         """
+        # The digraphs table is big; only import it when it's used.
+        from quo.keys.key_binding.digraphs import DIGRAPHS
+
         try:
             # Lookup.
             code: Tuple[str, str] = (
@@ -2161,7 +2167,7 @@ def load_vi_bindings() -> KeyBindingsBase:
         # Use vt100 parser for this.
         keys: List[KeyPress] = []
 
-        parser = Vt100Parser(keys.append)
+        parser = Vt100Parser(keys.append, keys.extend)
         parser.feed(macro.text)
         parser.flush()
 
@@ -2169,10 +2175,14 @@ def load_vi_bindings() -> KeyBindingsBase:
         for _ in range(event.arg):
             event.app.key_processor.feed_multiple(keys, first=True)
 
-    return ConditionalKeyBindings(key_bindings, vi_mode)
+    return key_bindings
 
 
 def load_vi_search_bindings() -> KeyBindingsBase:
+    return ConditionalKeyBindings(_create_vi_search_bindings, vi_mode)
+
+
+def _create_vi_search_bindings() -> KeyBinder:
     key_bindings = KeyBinder()
     handle = key_bindings.add
     from . import search
@@ -2218,4 +2228,4 @@ def load_vi_search_bindings() -> KeyBindingsBase:
     # `abort_search` would be a meaningful alternative.
     handle("escape")(search.accept_search)
 
-    return ConditionalKeyBindings(key_bindings, vi_mode)
+    return key_bindings
@@ -39,6 +39,7 @@ from typing import (
     TYPE_CHECKING,
     Awaitable,
     Callable,
+    Dict,
     Hashable,
     List,
     Optional,
@@ -169,6 +170,67 @@ class KeyBindingsBase(metaclass=ABCMeta):
 T = TypeVar("T", bound=Union[KeyHandlerCallable, Binding])
 
 
+class _TrieNode:
+    """
+    Node in the trie over the key sequences of the bindings in a `Bind`.
+    `Keys.Any` is stored as a regular key; lookups follow it as a wildcard.
+    """
+
+    __slots__ = ("children", "bindings", "longer_bindings")
+
+    def __init__(self) -> None:
+        self.children: Dict[Union[Keys, str], "_TrieNode"] = {}
+
+        # (index, binding) tuples of the bindings for the key sequence that
+        # ends here, and of the bindings for longer key sequences.
+        self.bindings: List[Tuple[int, Binding]] = []
+        self.longer_bindings: List[Tuple[int, Binding]] = []
+
+    def add(self, index: int, binding: Binding) -> None:
+        node = self
+
+        for key in binding.keys:
+            node.longer_bindings.append((index, binding))
+            child = node.children.get(key)
+
+            if child is None:
+                child = node.children[key] = _TrieNode()
+            node = child
+
+        node.bindings.append((index, binding))
+
+    def find(self, keys: KeysTuple) -> List["_TrieNode"]:
+        """
+        Return the nodes that match the key sequence, either by key or by
+        `Keys.Any`.
+        """
+        nodes = [self]
+
+        for key in keys:
+            next_nodes = []
+
+            for node in nodes:
+                child = node.children.get(key)
+                if child is not None:
+                    next_nodes.append(child)
+
+                if key != Keys.Any:
+                    child = node.children.get(Keys.Any)
+                    if child is not None:
+                        next_nodes.append(child)
+
+            if not next_nodes:
+                return []
+            nodes = next_nodes
+
+        return nodes
+
+
+def _any_count(binding: Binding) -> int:
+    "Number of `Keys.Any` wildcards in the key sequence of the binding."
+    return sum(1 for k in binding.keys if k == Keys.Any)
+
+
 class Bind(KeyBindingsBase):
     """
     A container for a set of key bindings.
@@ -201,11 +263,33 @@ class Bind(KeyBindingsBase):
         ] = SimpleCache(maxsize=1000)
         self.__version = 0  # For cache invalidation.
 
+        # Trie over the key sequences, and the number of bindings it contains.
+        # New bindings are added incrementally; it's rebuilt after a removal.
+        self._trie = _TrieNode()
+        self._trie_size = 0
+
     def _clear_cache(self) -> None:
         self.__version += 1
         self._get_bindings_for_keys_cache.clear()
         self._get_bindings_starting_with_keys_cache.clear()
 
+    def _get_trie(self) -> _TrieNode:
+        """
+        Return the trie, after adding the bindings that were appended since
+        the last call.
+        """
+        bindings = self._bindings
+
+        if len(bindings) < self._trie_size:
+            self._trie = _TrieNode()
+            self._trie_size = 0
+
+        for index in range(self._trie_size, len(bindings)):
+            self._trie.add(index, bindings[index])
+
+        self._trie_size = len(bindings)
+        return self._trie
+
     @property
     def bindings(self) -> List[Binding]:
         return self._bindings
@@ -329,6 +413,8 @@ class Bind(KeyBindingsBase):
                     found = True
 
         if found:
+            self._trie = _TrieNode()
+            self._trie_size = 0
             self._clear_cache()
         else:
             # No key binding found for this function. Raise ValueError.
@@ -344,26 +430,13 @@ class Bind(KeyBindingsBase):
         """
 
         def get() -> List[Binding]:
-            result: List[Tuple[int, Binding]] = []
+            result = [
+                item for node in self._get_trie().find(keys) for item in node.bindings
+            ]
 
-            for b in self.bindings:
-                if len(keys) == len(b.keys):
-                    match = True
-                    any_count = 0
-
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
-
-                        if i == Keys.Any:
-                            any_count += 1
-
-                    if match:
-                        result.append((any_count, b))
-
-            # Place bindings that have more 'Any' occurrences in them at the end.
-            result = sorted(result, key=lambda item: -item[0])
+            # Keep the order in which the bindings were added, but place
+            # bindings that have more 'Any' occurrences in them at the end.
+            result.sort(key=lambda item: (-_any_count(item[1]), item[0]))
 
             return [item[1] for item in result]
 
@@ -380,17 +453,17 @@ class Bind(KeyBindingsBase):
         """
 
         def get() -> List[Binding]:
-            result = []
-            for b in self.bindings:
-                if len(keys) < len(b.keys):
-                    match = True
-                    for i, j in zip(b.keys, keys):
-                        if i != j and i != Keys.Any:
-                            match = False
-                            break
-                    if match:
-                        result.append(b)
-            return result
+            nodes = self._get_trie().find(keys)
+
+            if len(nodes) == 1:
+                return [item[1] for item in nodes[0].longer_bindings]
+
+            # Wildcards matched: restore the order in which the bindings were
+            # added.
+            result = [item for node in nodes for item in node.longer_bindings]
+            result.sort(key=lambda item: item[0])
+
+            return [item[1] for item in result]
 
         return self._get_bindings_starting_with_keys_cache.get(keys, get)
 
@@ -519,41 +592,126 @@ class ConditionalKeyBindings(_Proxy):
     When new key bindings are added to this object. They are also
     enable/disabled according to the given `filter`.
 
-    :param registries: List of :class:`.Bind` objects.
+    Instead of key bindings, a function that creates them can be passed. It
+    is called the first time that `filter` is true, so that key bindings that
+    are never enabled (like the Vi bindings in Emacs mode) are never created.
+    Until then, this behaves as an empty set of key bindings.
+
+    :param bind: :class:`.KeyBindingsBase` object, or a callable that returns
+        one.
     :param filter: :class:`~quo.filters.Filter` object.
     """
 
-    def __init__(self, bind: KeyBindingsBase, filter: FilterOrBool = True) -> None:
+    def __init__(
+        self,
+        bind: Union[KeyBindingsBase, Callable[[], KeyBindingsBase]],
+        filter: FilterOrBool = True,
+    ) -> None:
 
         _Proxy.__init__(self)
 
-        self.bind = bind
+        self._bind: KeyBindingsBase
+        self._create_bind: Optional[Callable[[], KeyBindingsBase]]
+
+        if isinstance(bind, KeyBindingsBase):
+            self._bind = bind
+            self._create_bind = None
+        else:
+            self._bind = Bind()
+            self._create_bind = bind
+
         self.filter = to_filter(filter)
 
+        # Maps the ids of the original bindings to (original, copy) tuples.
+        # The copies are reused when the original key bindings change.
+        self._copies: Dict[int, Tuple[Binding, Binding]] = {}
+        self._bindings_list: List[Binding] = []
+        self._get_bindings_for_keys_cache: SimpleCache[
+            KeysTuple, List[Binding]
+        ] = SimpleCache(maxsize=1000)
+        self._get_bindings_starting_with_keys_cache: SimpleCache[
+            KeysTuple, List[Binding]
+        ] = SimpleCache(maxsize=1000)
+
+    @property
+    def bind(self) -> KeyBindingsBase:
+        "The wrapped key bindings. (Created now, if this didn't happen yet.)"
+        self._load()
+        return self._bind
+
+    def _load(self) -> None:
+        if self._create_bind is not None:
+            create_bind = self._create_bind
+            self._create_bind = None
+            self._bind = create_bind()
+
     def _update_cache(self) -> None:
         "If the original key bindings was changed. Update our copy version."
-        expected_version = self.bind._version
+        if self._create_bind is not None:
+            if not self.filter():
+                return
+            self._load()
+
+        expected_version = self._bind._version
 
         if self._last_version != expected_version:
-            bindings2 = Bind()
+            copies = self._copies
+            self._copies = {}
 
-            # Copy all bindings from `self.key_bindings`, adding our condition.
-            for b in self.bind.bindings:
-                bindings2.bindings.append(
-                    Binding(
-                        keys=b.keys,
-                        handler=b.handler,
-                        filter=self.filter & b.filter,
-                        eager=b.eager,
-                        is_global=b.is_global,
-                        save_before=b.save_before,
-                        record_in_macro=b.record_in_macro,
-                    )
-                )
+            for b in self._bind.bindings:
+                item = copies.get(id(b))
 
-            self._bindings2 = bindings2
+                if item is None or item[0] is not b:
+                    item = (b, self._copy(b))
+                self._copies[id(b)] = item
+
+            self._bindings_list = [item[1] for item in self._copies.values()]
+            self._get_bindings_for_keys_cache.clear()
+            self._get_bindings_starting_with_keys_cache.clear()
             self._last_version = expected_version
 
+    def _copy(self, b: Binding) -> Binding:
+        "Copy of the binding, with our condition added."
+        return Binding(
+            keys=b.keys,
+            handler=b.handler,
+            filter=self.filter & b.filter,
+            eager=b.eager,
+            is_global=b.is_global,
+            save_before=b.save_before,
+            record_in_macro=b.record_in_macro,
+        )
+
+    def _copies_of(self, bindings: List[Binding]) -> List[Binding]:
+        result = []
+
+        for b in bindings:
+            item = self._copies.get(id(b))
+
+            if item is None or item[0] is not b:
+                item = self._copies[id(b)] = (b, self._copy(b))
+            result.append(item[1])
+
+        return result
+
+    @property
+    def bindings(self) -> List[Binding]:
+        self._update_cache()
+        return self._bindings_list
+
+    def get_bindings_for_keys(self, keys: KeysTuple) -> List[Binding]:
+        self._update_cache()
+        return self._get_bindings_for_keys_cache.get(
+            keys, lambda: self._copies_of(self._bind.get_bindings_for_keys(keys))
+        )
+
+    def get_bindings_starting_with_keys(self, keys: KeysTuple) -> List[Binding]:
+        self._update_cache()
+        return self._get_bindings_starting_with_keys_cache.get(
+            keys,
+            lambda: self._copies_of(self._bind.get_bindings_starting_with_keys(keys)),
+        )
+
 
 class _MergedKeyBindings(_Proxy):
     """
@@ -569,6 +727,17 @@ class _MergedKeyBindings(_Proxy):
         _Proxy.__init__(self)
         self.registries = registries
 
+        # The lookups are answered by combining the (cached) results of the
+        # registries, so that a change in one of them doesn't require
+        # rebuilding anything for the others.
+        self._bindings_list: Optional[List[Binding]] = None
+        self._get_bindings_for_keys_cache: SimpleCache[
+            KeysTuple, List[Binding]
+        ] = SimpleCache(maxsize=1000)
+        self._get_bindings_starting_with_keys_cache: SimpleCache[
+            KeysTuple, List[Binding]
+        ] = SimpleCache(maxsize=1000)
+
     def _update_cache(self) -> None:
         """
         If one of the original registries was changed. Update our merged
@@ -577,13 +746,45 @@ class _MergedKeyBindings(_Proxy):
         expected_version = tuple(r._version for r in self.registries)
 
         if self._last_version != expected_version:
-            bindings2 = Bind()
+            self._bindings_list = None
+            self._get_bindings_for_keys_cache.clear()
+            self._get_bindings_starting_with_keys_cache.clear()
+            self._last_version = expected_version
 
-            for reg in self.registries:
-                bindings2.bindings.extend(reg.bindings)
+    @property
+    def bindings(self) -> List[Binding]:
+        self._update_cache()
 
-            self._bindings2 = bindings2
-            self._last_version = expected_version
+        if self._bindings_list is None:
+            self._bindings_list = [b for r in self.registries for b in r.bindings]
+        return self._bindings_list
+
+    def get_bindings_for_keys(self, keys: KeysTuple) -> List[Binding]:
+        self._update_cache()
+
+        def get() -> List[Binding]:
+            result = [
+                b for r in self.registries for b in r.get_bindings_for_keys(keys)
+            ]
+
+            # Every registry places the bindings with more 'Any' occurrences
+            # at the end. Do the same for the combination. (The sort is
+            # stable.)
+            result.sort(key=lambda b: -_any_count(b))
+            return result
+
+        return self._get_bindings_for_keys_cache.get(keys, get)
+
+    def get_bindings_starting_with_keys(self, keys: KeysTuple) -> List[Binding]:
+        self._update_cache()
+        return self._get_bindings_starting_with_keys_cache.get(
+            keys,
+            lambda: [
+                b
+                for r in self.registries
+                for b in r.get_bindings_starting_with_keys(keys)
+            ],
+        )
 
 
 def merge_key_bindings(bindings: Sequence[KeyBindingsBase]) -> _MergedKeyBindings:
@@ -6,6 +6,7 @@ the input in the :class:`~quo.inputstream.InputStream` instance.
 The `KeyProcessor` will according to the implemented keybindings call the
 correct callbacks when new key presses are feed through `feed`.
 """
+import time
 import weakref
 from asyncio import Task, sleep
 from collections import deque
@@ -35,6 +36,8 @@ class KeyPress:
     """
     :param key: A `Keys` instance or text (one character).
     :param data: The received string on stdin. (Often vt100 escape codes.)
+
+    `time` is the moment (`time.monotonic`) at which the key press was read.
     """
 
     def __init__(self, key: Union[Keys, str], data: Optional[str] = None) -> None:
@@ -48,6 +51,7 @@ class KeyPress:
 
         self.key = key
         self.data = data
+        self.time = time.monotonic()
 
     def __repr__(self) -> str:
         return "%s(key=%r, data=%r)" % (self.__class__.__name__, self.key, self.data)
@@ -64,6 +68,9 @@ NOTE: the implementation is very similar to the VT100 parser.
 """
 _Flush = KeyPress("?", data="_Flush")
 
+# The modules that define the default key bindings.
+_DEFAULT_BINDINGS = "quo.keys.key_binding.bindings."
+
 
 class KeyProcessor:
     """
@@ -163,16 +170,20 @@ class KeyProcessor:
 
             # If we have some key presses, check for matches.
             if buffer:
-                matches = self._get_matches(buffer)
+                # (Nothing changes the state until a handler is called.)
+                with get_app().filter_epoch():
+                    matches = self._get_matches(buffer)
 
-                if flush:
-                    is_prefix_of_longer_match = False
-                else:
-                    is_prefix_of_longer_match = self._is_prefix_of_longer_match(buffer)
+                    if flush:
+                        is_prefix_of_longer_match = False
+                    else:
+                        is_prefix_of_longer_match = self._is_prefix_of_longer_match(
+                            buffer
+                        )
 
-                # When eager matches were found, give priority to them and also
-                # ignore all the longer matches.
-                eager_matches = [m for m in matches if m.eager()]
+                    # When eager matches were found, give priority to them and
+                    # also ignore all the longer matches.
+                    eager_matches = [m for m in matches if m.eager()]
 
                 if eager_matches:
                     matches = eager_matches
@@ -264,6 +275,11 @@ class KeyProcessor:
             is_flush = key_press is _Flush
             is_cpr = key_press.key == Keys.CPRResponse
 
+            # Handle a run of typed characters at once, if possible.
+            if not is_flush and not is_cpr and self.input_queue and not app.is_done:
+                if self._process_self_insert_run(key_press):
+                    continue
+
             if not is_flush and not is_cpr:
                 self.before_key_press.fire()
 
@@ -288,6 +304,119 @@ class KeyProcessor:
         if not is_flush:
             self._start_timeout()
 
+    def _is_plain_character(self, key_press: KeyPress) -> bool:
+        """
+        True when only the bindings that come with quo for `Keys.Any` (and no
+        binding for this key in particular, nor a longer key sequence) can
+        handle this key press. The filters of those bindings depend on the
+        mode, never on the text, so typing doesn't change which one handles
+        the next character.
+        """
+        if isinstance(key_press.key, Keys):
+            return False
+
+        keys = (key_press.key,)
+
+        return not self._bindings.get_bindings_starting_with_keys(keys) and all(
+            b.keys == (Keys.Any,)
+            and getattr(b.handler, "__module__", "").startswith(_DEFAULT_BINDINGS)
+            for b in self._bindings.get_bindings_for_keys(keys)
+        )
+
+    def _process_self_insert_run(self, key_press: KeyPress) -> bool:
+        """
+        When `key_press` and the key presses that follow in the queue are all
+        plain characters, handled by the default "self-insert" binding, handle
+        them together: with one `Buffer.insert_text` call instead of one per
+        character. This makes a burst of typed characters (or a paste without
+        bracketed paste) much cheaper.
+
+        This only happens when the result is the same as handling the key
+        presses one by one: nothing is attached to the `before_key_press`,
+        `after_key_press` and `on_text_insert` events (which would fire in
+        between), and no other binding can match one of the characters. The
+        undo stack gets the same intermediate states.
+
+        Return False (and do nothing) when this doesn't apply.
+        """
+        from quo.keys.key_binding.bindings.named_commands import get_by_name
+
+        app = get_app()
+        buffer = app.current_buffer
+
+        # Only when the state machine is idle and there's nothing special.
+        if (
+            self.key_buffer
+            or self.arg is not None
+            or app.vi_state.temporary_navigation_mode
+            or buffer.read_only()
+            or self.before_key_press.has_handlers()
+            or self.after_key_press.has_handlers()
+            or buffer.on_text_insert.has_handlers()
+            or not self._is_plain_character(key_press)
+        ):
+            return False
+
+        with app.filter_epoch():
+            matches = self._get_matches([key_press])
+
+            if (
+                not matches
+                or matches[-1].handler is not get_by_name("self-insert").handler
+                or any(m.eager() for m in matches)
+            ):
+                return False
+
+        # All plain characters have the same candidate bindings, so the same
+        # binding handles all of them.
+        binding = matches[-1]
+        key_presses = [key_press]
+        queue = self.input_queue
+
+        while queue and self._is_plain_character(queue[0]):
+            key_presses.append(queue.popleft())
+
+        if len(key_presses) == 1:
+            return False
+
+        # Find the key presses before which the undo state would have been
+        # saved, if they were handled one by one.
+        save_before = [
+            i
+            for i in range(1, len(key_presses))
+            if binding.save_before(
+                KeyPressEvent(
+                    weakref.ref(self),
+                    arg=None,
+                    key_sequence=key_presses[i : i + 1],
+                    previous_key_sequence=key_presses[i - 1 : i],
+                    is_repeat=True,
+                )
+            )
+        ]
+
+        text = buffer.text
+        cursor_position = buffer.cursor_position
+
+        # Handle as one key press, which carries all the data.
+        data = "".join(k.data for k in key_presses)
+        self._call_handler(
+            binding,
+            key_sequence=[KeyPress(key_press.key, data)],
+            recorded_key_sequence=key_presses,
+        )
+
+        # Save the intermediate states, so that undo behaves the same. (The
+        # "self-insert" command inserts the data before the cursor, and never
+        # overwrites. In overwrite mode, another binding handles the keys.)
+        for i in save_before:
+            buffer._save_state_to_undo_stack(
+                text[:cursor_position] + data[:i] + text[cursor_position:],
+                cursor_position + i,
+            )
+
+        return True
+
     def empty_queue(self) -> List[KeyPress]:
         """
         Empty the input queue. Return the unprocessed input.
@@ -299,7 +428,16 @@ class KeyProcessor:
         key_presses = [k for k in key_presses if k.key != Keys.CPRResponse]
         return key_presses
 
-    def _call_handler(self, handler: Binding, key_sequence: List[KeyPress]) -> None:
+    def _call_handler(
+        self,
+        handler: Binding,
+        key_sequence: List[KeyPress],
+        recorded_key_sequence: Optional[List[KeyPress]] = None,
+    ) -> None:
+        """
+        :param recorded_key_sequence: The key presses to remember (and to
+            record in a macro), when these are not `key_sequence`.
+        """
         app = get_app()
         was_recording_emacs = app.emacs_state.is_recording
         was_recording_vi = bool(app.vi_state.recording_register)
@@ -334,7 +472,14 @@ class KeyProcessor:
         if was_temporary_navigation_mode:
             self._leave_vi_temp_navigation_mode(event)
 
-        self._previous_key_sequence = key_sequence
+        if app.key_latency is not None:
+            app.key_latency.key_handled(recorded_key_sequence or key_sequence, handler)
+
+        if recorded_key_sequence is not None:
+            key_sequence = recorded_key_sequence
+            self._previous_key_sequence = key_sequence[-1:]
+        else:
+            self._previous_key_sequence = key_sequence
         self._previous_handler = handler
 
         # Record the key sequence in our macro. (Only if we're in macro mode
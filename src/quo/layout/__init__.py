@@ -44,58 +44,52 @@ And one prepared menu:
 - CompletionsMenu
 
 """
-from .containers import (
-   # AnyContainer,
-    ColorColumn,
-    ConditionalContainer,
-    #Container,
-    DynamicContainer,
-    Float,
-    FloatContainer,
-    #HorizontalAlign,
-    HSplit,
-    #ScrollOffsets,
-    #VerticalAlign,
-    VSplit,
-    Window,
-    #WindowAlign,
-    #WindowRenderInfo,
-    #is_container,
-    #to_container,
-   # to_window,
-)
-
-from .controls import (
-    BufferControl,
-    DummyControl,
-    FormattedTextControl,
-    SearchBufferControl,
-    UIContent,
-    UIControl,
-)
-from .dimension import (
-  #  AnyDimension,
-    D,
-    Dimension,
-   # is_dimension,
-   # max_layout_dimensions,
-   # sum_layout_dimensions,
-   # to_dimension,
-)
-#from .layout import Layout, walk
-
-from .margin import (
-        ConditionalMargin,
-        NumberedMargin,
-        ScrollbarMargin
-        )
- #   Margin,
-# NumberedMargin,
-#    PromptMargin,
-#    ScrollbarMargin,
-#)
-from .menus import CompletionsMenu, MultiColumnCompletionsMenu
-from .scrollable_pane import ScrollablePane
+from typing import TYPE_CHECKING
+
+from quo.utils.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .containers import (
+        AnyContainer,
+        ColorColumn,
+        ConditionalContainer,
+        Container,
+        DynamicContainer,
+        Float,
+        FloatContainer,
+        HorizontalAlign,
+        HSplit,
+        ScrollOffsets,
+        VerticalAlign,
+        VSplit,
+        Window,
+        WindowAlign,
+        WindowRenderInfo,
+        is_container,
+        to_container,
+        to_window,
+    )
+    from .controls import (
+        BufferControl,
+        DummyControl,
+        FormattedTextControl,
+        SearchBufferControl,
+        UIContent,
+        UIControl,
+    )
+    from .dimension import (
+        D,
+        AnyDimension,
+        Dimension,
+        is_dimension,
+        max_layout_dimensions,
+        sum_layout_dimensions,
+        to_dimension,
+    )
+    from .layout import Layout, walk
+    from .margin import ConditionalMargin, Margin, NumberedMargin, ScrollbarMargin
+    from .menus import CompletionsMenu, MultiColumnCompletionsMenu
+    from .scrollable_pane import ScrollablePane
 
 __all__ = [
     # Layout.
@@ -146,3 +140,57 @@ __all__ = [
     "CompletionsMenu",
     "MultiColumnCompletionsMenu",
 ]
+
+# Imported on first use. (Importing `quo.layout.containers` for instance,
+# shouldn't import the menus, margins and so on.)
+__getattr__, __dir__ = lazy_attributes(
+    globals(),
+    {
+        # Layout.
+        "Layout": ".layout",
+        "walk": ".layout",
+        # Dimensions.
+        "AnyDimension": ".dimension",
+        "Dimension": ".dimension",
+        "D": ".dimension",
+        "sum_layout_dimensions": ".dimension",
+        "max_layout_dimensions": ".dimension",
+        "to_dimension": ".dimension",
+        "is_dimension": ".dimension",
+        # Containers.
+        "AnyContainer": ".containers",
+        "Container": ".containers",
+        "HorizontalAlign": ".containers",
+        "VerticalAlign": ".containers",
+        "HSplit": ".containers",
+        "VSplit": ".containers",
+        "FloatContainer": ".containers",
+        "Float": ".containers",
+        "WindowAlign": ".containers",
+        "Window": ".containers",
+        "WindowRenderInfo": ".containers",
+        "ConditionalContainer": ".containers",
+        "ScrollOffsets": ".containers",
+        "ColorColumn": ".containers",
+        "to_container": ".containers",
+        "to_window": ".containers",
+        "is_container": ".containers",
+        "DynamicContainer": ".containers",
+        "ScrollablePane": ".scrollable_pane",
+        # Controls.
+        "BufferControl": ".controls",
+        "SearchBufferControl": ".controls",
+        "DummyControl": ".controls",
+        "FormattedTextControl": ".controls",
+        "UIControl": ".controls",
+        "UIContent": ".controls",
+        # Margins.
+        "Margin": ".margin",
+        "NumberedMargin": ".margin",
+        "ScrollbarMargin": ".margin",
+        "ConditionalMargin": ".margin",
+        # Menus.
+        "CompletionsMenu": ".menus",
+        "MultiColumnCompletionsMenu": ".menus",
+    },
+)
@@ -1,15 +1,12 @@
 import math
-from itertools import zip_longest
 from typing import (
     TYPE_CHECKING,
     Callable,
     Dict,
-    Iterable,
     List,
     NamedTuple,
     Optional,
     Tuple,
-    TypeVar,
     Union,
     cast,
 )
@@ -53,6 +50,64 @@ E = KeyPressEvent
 
 Point = NamedTuple("Point", [("x", int), ("y", int)])
 
+# Maximum number of completions that are measured for one rendering. (The
+# others are measured during the next renderings.)
+_MAX_MEASURED_COMPLETIONS = 500
+
+# Maximum number of formatted menu items to keep.
+_MAX_CACHED_MENU_ITEMS = 1000
+
+
+class _CompletionWidths:
+    """
+    Maximum widths of the completions in a list, maintained incrementally.
+
+    While completions are streaming in, the completion list only grows, so
+    only the new completions have to be measured. For huge lists, at most
+    `_MAX_MEASURED_COMPLETIONS` are measured per call, which means that the
+    maximum is based on a part of the list until the following renderings
+    catch up. (Wider completions are trimmed in the meantime.)
+    """
+
+    def __init__(self) -> None:
+        self._completions: Optional[List[Completion]] = None
+        self._measured = 0
+
+        #: Width of the widest `display_text`.
+        self.width = 0
+
+        #: Width of the widest `display_meta_text`.
+        self.meta_width = 0
+
+        #: True when any of the completions has meta text.
+        self.has_meta = False
+
+    def update(self, completions: List[Completion]) -> "_CompletionWidths":
+        """
+        Measure the completions that were added since the previous call.
+        """
+        if completions is not self._completions or len(completions) < self._measured:
+            self._completions = completions
+            self._measured = 0
+            self.width = 0
+            self.meta_width = 0
+            self.has_meta = False
+
+        end = min(len(completions), self._measured + _MAX_MEASURED_COMPLETIONS)
+
+        for i in range(self._measured, end):
+            c = completions[i]
+            self.width = max(self.width, get_width(c.display_text))
+
+            meta_text = c.display_meta_text
+            if meta_text:
+                self.has_meta = True
+                self.meta_width = max(self.meta_width, get_width(meta_text))
+
+        self._measured = end
+        return self
+
+
 class CompletionsMenuControl(UIControl):
     """
     Helper for drawing the complete menu to the screen.
@@ -68,6 +123,15 @@ class CompletionsMenuControl(UIControl):
     # of 1.)
     MIN_WIDTH = 7
 
+    def __init__(self) -> None:
+        self._widths = _CompletionWidths()
+
+        # Formatted menu items. Maps (index, is_current, menu_width,
+        # menu_meta_width) to (completion, fragments).
+        self._item_cache: Dict[
+            Tuple[int, bool, int, int], Tuple[Completion, StyleAndTextTuples]
+        ] = {}
+
     def has_focus(self) -> bool:
         return False
 
@@ -110,10 +174,21 @@ class CompletionsMenuControl(UIControl):
                 width - menu_width, complete_state
             )
             show_meta = self._show_meta(complete_state)
+            item_cache = self._item_cache
+
+            if len(item_cache) > _MAX_CACHED_MENU_ITEMS:
+                item_cache.clear()
 
+            # Only the visible lines are requested.
             def get_line(i: int) -> StyleAndTextTuples:
                 c = completions[i]
                 is_current_completion = i == index
+                key = (i, is_current_completion, menu_width, menu_meta_width)
+
+                cached = item_cache.get(key)
+                if cached is not None and cached[0] is c:
+                    return cached[1]
+
                 result = _get_menu_item_fragments(
                     c, is_current_completion, menu_width, space_after=True
                 )
@@ -122,6 +197,8 @@ class CompletionsMenuControl(UIControl):
                     result += self._get_menu_item_meta_fragments(
                         c, is_current_completion, menu_meta_width
                     )
+
+                item_cache[key] = (c, result)
                 return result
 
             return UIContent(
@@ -136,19 +213,14 @@ class CompletionsMenuControl(UIControl):
         """
         Return ``True`` if we need to show a column with meta information.
         """
-        return any(c.display_meta_text for c in complete_state.completions)
+        return self._widths.update(complete_state.completions).has_meta
 
     def _get_menu_width(self, max_width: int, complete_state: CompletionState) -> int:
         """
         Return the width of the main column.
         """
-        return min(
-            max_width,
-            max(
-                self.MIN_WIDTH,
-                max(get_width(c.display_text) for c in complete_state.completions) + 2,
-            ),
-        )
+        widths = self._widths.update(complete_state.completions)
+        return min(max_width, max(self.MIN_WIDTH, widths.width + 2))
 
     def _get_menu_meta_width(
         self, max_width: int, complete_state: CompletionState
@@ -156,14 +228,10 @@ class CompletionsMenuControl(UIControl):
         """
         Return the width of the meta column.
         """
+        widths = self._widths.update(complete_state.completions)
 
-        def meta_width(completion: Completion) -> int:
-            return get_width(completion.display_meta_text)
-
-        if self._show_meta(complete_state):
-            return min(
-                max_width, max(meta_width(c) for c in complete_state.completions) + 2
-            )
+        if widths.has_meta:
+            return min(max_width, widths.meta_width + 2)
         else:
             return 0
 
@@ -340,6 +408,14 @@ class MultiColumnCompletionMenuControl(UIControl):
         self._render_right_arrow = False
         self._render_width = 0
 
+        self._widths = _CompletionWidths()
+
+        # Formatted menu items. Maps (index, is_current, column_width) to
+        # (completion, fragments).
+        self._item_cache: Dict[
+            Tuple[int, bool, int], Tuple[Completion, StyleAndTextTuples]
+        ] = {}
+
     def reset(self) -> None:
         self.scroll = 0
 
@@ -401,22 +477,8 @@ class MultiColumnCompletionMenuControl(UIControl):
         column_width = self._get_column_width(complete_state)
         self._render_pos_to_completion = {}
 
-        _T = TypeVar("_T")
-
-        def grouper(
-            n: int, iterable: Iterable[_T], fillvalue: Optional[_T] = None
-        ) -> Iterable[List[_T]]:
-            "grouper(3, 'ABCDEFG', 'x') --> ABC DEF Gxx"
-            args = [iter(iterable)] * n
-            return zip_longest(fillvalue=fillvalue, *args)
-
-        def is_current_completion(completion: Completion) -> bool:
-            "Returns True when this completion is the currently selected one."
-            return (
-                complete_state is not None
-                and complete_state.complete_index is not None
-                and c == complete_state.current_completion
-            )
+        completions = complete_state.completions
+        complete_index = complete_state.complete_index
 
         # Space required outside of the regular columns, for displaying the
         # left and right arrow.
@@ -435,24 +497,30 @@ class MultiColumnCompletionMenuControl(UIControl):
 
         visible_columns = max(1, (width - self._required_margin) // column_width)
 
-        columns_ = list(grouper(height, complete_state.completions))
-        rows_ = list(zip(*columns_))
+        # The completions are laid out column by column. Only the visible
+        # columns are formatted.
+        total_columns = int(math.ceil(len(completions) / float(height)))
+        row_count = height if completions else 0
 
         # Make sure the current completion is always visible: update scroll offset.
-        selected_column = (complete_state.complete_index or 0) // height
+        selected_column = (complete_index or 0) // height
         self.scroll = min(
             selected_column, max(self.scroll, selected_column - visible_columns + 1)
         )
 
         render_left_arrow = self.scroll > 0
-        render_right_arrow = self.scroll < len(rows_[0]) - visible_columns
+        render_right_arrow = self.scroll < total_columns - visible_columns
+
+        visible_column_indexes = range(
+            self.scroll, min(total_columns, self.scroll + visible_columns)
+        )
 
         # Write completions to screen.
         fragments_for_line = []
 
-        for row_index, row in enumerate(rows_):
+        for row_index in range(row_count):
             fragments: StyleAndTextTuples = []
-            middle_row = row_index == len(rows_) // 2
+            middle_row = row_index == row_count // 2
 
             # Draw left arrow if we have hidden completions on the left.
             if render_left_arrow:
@@ -463,10 +531,13 @@ class MultiColumnCompletionMenuControl(UIControl):
                 fragments.append(("", " "))
 
             # Draw row content.
-            for column_index, c in enumerate(row[self.scroll :][:visible_columns]):
-                if c is not None:
-                    fragments += _get_menu_item_fragments(
-                        c, is_current_completion(c), column_width, space_after=False
+            for column_index, column in enumerate(visible_column_indexes):
+                i = column * height + row_index
+
+                if i < len(completions):
+                    c = completions[i]
+                    fragments += self._get_menu_item_fragments(
+                        i, c, i == complete_index, column_width
                     )
 
                     # Remember render position for mouse click handler.
@@ -495,7 +566,7 @@ class MultiColumnCompletionMenuControl(UIControl):
 
         self._rendered_rows = height
         self._rendered_columns = visible_columns
-        self._total_columns = len(columns_)
+        self._total_columns = total_columns
         self._render_left_arrow = render_left_arrow
         self._render_right_arrow = render_right_arrow
         self._render_width = (
@@ -505,13 +576,34 @@ class MultiColumnCompletionMenuControl(UIControl):
         def get_line(i: int) -> StyleAndTextTuples:
             return fragments_for_line[i]
 
-        return UIContent(get_line=get_line, line_count=len(rows_))
+        return UIContent(get_line=get_line, line_count=row_count)
+
+    def _get_menu_item_fragments(
+        self, index: int, completion: Completion, is_current: bool, width: int
+    ) -> StyleAndTextTuples:
+        """
+        Formatted menu item, cached.
+        """
+        key = (index, is_current, width)
+        cached = self._item_cache.get(key)
+
+        if cached is not None and cached[0] is completion:
+            return cached[1]
+
+        if len(self._item_cache) > _MAX_CACHED_MENU_ITEMS:
+            self._item_cache.clear()
+
+        fragments = _get_menu_item_fragments(
+            completion, is_current, width, space_after=False
+        )
+        self._item_cache[key] = (completion, fragments)
+        return fragments
 
     def _get_column_width(self, complete_state: CompletionState) -> int:
         """
         Return the width of each column.
         """
-        return max(get_width(c.display_text) for c in complete_state.completions) + 1
+        return self._widths.update(complete_state.completions).width + 1
 
     def mouse_handler(self, mouse_event: MouseEvent) -> "NotImplementedOrNone":
         """
@@ -631,11 +723,14 @@ class MultiColumnCompletionsMenu(HSplit):
         # we are returning the input.
         full_filter = has_completions & ~is_done & extra_filter
 
+        widths = _CompletionWidths()
+
         @Condition
         def any_completion_has_meta() -> bool:
             complete_state = get_app().current_buffer.complete_state
-            return complete_state is not None and any(
-                c.display_meta for c in complete_state.completions
+            return (
+                complete_state is not None
+                and widths.update(complete_state.completions).has_meta
             )
 
         # Create child windows.
@@ -657,7 +752,7 @@ class MultiColumnCompletionsMenu(HSplit):
         )
 
         meta_window = ConditionalContainer(
-            content=Window(content=_SelectedCompletionMetaControl()),
+            content=Window(content=_SelectedCompletionMetaControl(widths)),
             filter=show_meta & full_filter & any_completion_has_meta,
         )
 
@@ -670,6 +765,9 @@ class _SelectedCompletionMetaControl(UIControl):
     Control that shows the meta information of the selected completion.
     """
 
+    def __init__(self, widths: Optional[_CompletionWidths] = None) -> None:
+        self._widths = widths or _CompletionWidths()
+
     def preferred_width(self, max_available_width: int) -> Optional[int]:
         """
         Report the width of the longest meta text as the preferred width of this control.
@@ -681,7 +779,7 @@ class _SelectedCompletionMetaControl(UIControl):
         app = get_app()
         if app.current_buffer.complete_state:
             state = app.current_buffer.complete_state
-            return 2 + max(get_width(c.display_meta_text) for c in state.completions)
+            return 2 + self._widths.update(state.completions).meta_width
         else:
             return 0
 
@@ -1,36 +1,47 @@
-from collections import defaultdict
-from itertools import product
-from typing import Callable, DefaultDict, Tuple
+from typing import Callable, List, NamedTuple
 
 from quo.mouse_events import MouseEvent
 
 __all__ = [
     "MouseHandler",
+    "MouseHandlerRegion",
     "MouseHandlers",
 ]
 
 MouseHandler = Callable[[MouseEvent], None]
 
 
+def _dummy_callback(mouse_event: MouseEvent) -> None:
+    """
+    :param mouse_event: `MouseEvent` instance.
+    """
+
+
+class MouseHandlerRegion(NamedTuple):
+    """
+    Rectangle with a mouse handler. (`x_max` and `y_max` are exclusive.)
+    """
+
+    x_min: int
+    x_max: int
+    y_min: int
+    y_max: int
+    handler: MouseHandler
+
+
 class MouseHandlers:
     """
     Two dimensional raster of callbacks for mouse events.
+
+    The handlers are stored as a list of rectangles, in the order in which
+    they were set: a rectangle covers the ones before it. Setting a handler
+    is cheap this way, which matters because it happens for every window on
+    every render. The handler for a position is only looked up when a mouse
+    event arrives.
     """
 
     def __init__(self) -> None:
-        def dummy_callback(mouse_event: MouseEvent) -> None:
-            """
-            :param mouse_event: `MouseEvent` instance.
-            """
-
-        # NOTE: Previously, the data structure was a dictionary mapping (x,y)
-        # to the handlers. This however would be more inefficient when copying
-        # over the mouse handlers of the visible region in the scrollable pane.
-
-        # Map y (row) to x (column) to handlers.
-        self.mouse_handlers: DefaultDict[
-            int, DefaultDict[int, MouseHandler]
-        ] = defaultdict(lambda: defaultdict(lambda: dummy_callback))
+        self.regions: List[MouseHandlerRegion] = []
 
     def set_mouse_handler_for_range(
         self,
@@ -43,8 +54,41 @@ class MouseHandlers:
         """
         Set mouse handler for a region.
         """
-        for y in range(y_min, y_max):
-            row = self.mouse_handlers[y]
+        if x_min < x_max and y_min < y_max:
+            self.regions.append(MouseHandlerRegion(x_min, x_max, y_min, y_max, handler))
+
+    def get_mouse_handler(self, x: int, y: int) -> MouseHandler:
+        """
+        Return the mouse handler for this position. (A handler that does
+        nothing when none was set.)
+        """
+        for region in reversed(self.regions):
+            if region.x_min <= x < region.x_max and region.y_min <= y < region.y_max:
+                return region.handler
+
+        return _dummy_callback
+
+    @property
+    def mouse_handlers(self) -> "_MouseHandlersView":
+        """
+        Read-only view that maps y (row) to x (column) to handler. (For
+        backwards compatibility, use `get_mouse_handler` instead.)
+        """
+        return _MouseHandlersView(self)
+
+
+class _MouseHandlersView:
+    def __init__(self, mouse_handlers: MouseHandlers) -> None:
+        self._mouse_handlers = mouse_handlers
+
+    def __getitem__(self, y: int) -> "_MouseHandlersRowView":
+        return _MouseHandlersRowView(self._mouse_handlers, y)
+
+
+class _MouseHandlersRowView:
+    def __init__(self, mouse_handlers: MouseHandlers, y: int) -> None:
+        self._mouse_handlers = mouse_handlers
+        self._y = y
 
-            for x in range(x_min, x_max):
-                row[x] = handler
+    def __getitem__(self, x: int) -> MouseHandler:
+        return self._mouse_handlers.get_mouse_handler(x, self._y)
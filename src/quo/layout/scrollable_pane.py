@@ -164,7 +164,7 @@ class ScrollablePane(Container):
         temp_screen.draw_all_floats()
 
         # If anything in the virtual screen is focused, move vertical scroll to
-        from quo.console import get_app
+        from quo.console.current import get_app
 
         focused_window = get_app().layout.current_window
 
@@ -312,17 +312,24 @@ class ScrollablePane(Container):
                 mouse_handler_wrappers[handler] = new_handler
             return mouse_handler_wrappers[handler]
 
-        # Copy handlers.
-        mouse_handlers_dict = mouse_handlers.mouse_handlers
-        temp_mouse_handlers_dict = temp_mouse_handlers.mouse_handlers
-
-        for y in range(write_position.height):
-            if y in temp_mouse_handlers_dict:
-                temp_mouse_row = temp_mouse_handlers_dict[y + self.vertical_scroll]
-                mouse_row = mouse_handlers_dict[y + ypos]
-                for x in range(virtual_width):
-                    if x in temp_mouse_row:
-                        mouse_row[x + xpos] = wrap_mouse_handler(temp_mouse_row[x])
+        # Copy the handlers, clipped to the visible part.
+        y_min = self.vertical_scroll
+        y_max = self.vertical_scroll + write_position.height
+
+        for region in temp_mouse_handlers.regions:
+            x_from = max(region.x_min, 0)
+            x_to = min(region.x_max, virtual_width)
+            y_from = max(region.y_min, y_min)
+            y_to = min(region.y_max, y_max)
+
+            if x_from < x_to and y_from < y_to:
+                mouse_handlers.set_mouse_handler_for_range(
+                    x_min=x_from + xpos,
+                    x_max=x_to + xpos,
+                    y_min=y_from - self.vertical_scroll + ypos,
+                    y_max=y_to - self.vertical_scroll + ypos,
+                    handler=wrap_mouse_handler(region.handler),
+                )
 
     def _copy_over_write_positions(
         self, screen: Screen, temp_screen: Screen, write_position: WritePosition
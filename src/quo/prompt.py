@@ -12,12 +12,15 @@ the history in between several calls.
 
 """
 from asyncio import get_event_loop
+import sys
+import types
 import warnings
 from contextlib import contextmanager
 from enum import Enum
 from functools import partial
 from typing import (
     TYPE_CHECKING,
+    Any,
     Callable,
     Generic,
     Iterator,
@@ -1539,3 +1542,20 @@ def create_confirm_session(text: str, suffix: str = " (y/n) ") -> Prompt[bool]:
 
 def continuation(width, line_number, wrap_count):
     return "." * width
+
+
+class _PromptModule(types.ModuleType):
+    """
+    `quo` exports the :func:`prompt` function under the name of this module,
+    and imports it lazily. When this module is imported first (``from
+    quo.prompt import Prompt``), the import binds the module to
+    ``quo.prompt``, after executing it. (So, it can't be undone from here.)
+    Calling the module calls the function, like it did when `quo` imported
+    the function eagerly.
+    """
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return prompt(*args, **kwargs)
+
+
+sys.modules[__name__].__class__ = _PromptModule
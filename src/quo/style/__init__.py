@@ -1,35 +1,38 @@
 """
 Styling for quo applications.
 """
-#from .core import (
-  #  ANSI_COLOR_NAMES,
- #   DEFAULT_ATTRS,
- #   Attrs,
-  #  BaseStyle,
-  #  DummyStyle,
-  #  DynamicStyle,
-#)
-#from .defaults import default_pygments_style, default_ui_style
-#from .webcolors import NAMED_COLORS
-#from .pygments import (
- #   pygments_token_to_classname,
- #   style_from_pygments_cls,
- #   style_from_pygments_dict,
-#)
-#
-#from .style import Priority, Style, merge_styles, parse_color
-from .style import merge_styles, Style
-#from .transformation import (
- #   AdjustBrightnessStyleTransformation,
-#    ConditionalStyleTransformation,
-  #  DummyStyleTransformation,
- #   DynamicStyleTransformation,
- #   ReverseStyleTransformation,
- #   SetDefaultColorStyleTransformation,
-#    StyleTransformation,
- #   SwapLightAndDarkStyleTransformation,
-#    merge_style_transformations,
-#)
+from typing import TYPE_CHECKING
+
+from quo.utils.lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .core import (
+        ANSI_COLOR_NAMES,
+        DEFAULT_ATTRS,
+        Attrs,
+        BaseStyle,
+        DummyStyle,
+        DynamicStyle,
+    )
+    from .defaults import default_pygments_style, default_ui_style
+    from .pygments import (
+        pygments_token_to_classname,
+        style_from_pygments_cls,
+        style_from_pygments_dict,
+    )
+    from .style import Priority, Style, merge_styles, parse_color
+    from .transformation import (
+        AdjustBrightnessStyleTransformation,
+        ConditionalStyleTransformation,
+        DummyStyleTransformation,
+        DynamicStyleTransformation,
+        ReverseStyleTransformation,
+        SetDefaultColorStyleTransformation,
+        StyleTransformation,
+        SwapLightAndDarkStyleTransformation,
+        merge_style_transformations,
+    )
+    from .webcolors import NAMED_COLORS
 
 __all__ = [
     # Base.
@@ -65,3 +68,41 @@ __all__ = [
     "NAMED_COLORS",
 ]
 
+# Imported on first use. (Importing `quo.style.core` for instance, shouldn't
+# import the default styles.)
+__getattr__, __dir__ = lazy_attributes(
+    globals(),
+    {
+        # Base.
+        "Attrs": ".core",
+        "DEFAULT_ATTRS": ".core",
+        "ANSI_COLOR_NAMES": ".core",
+        "BaseStyle": ".core",
+        "DummyStyle": ".core",
+        "DynamicStyle": ".core",
+        # Defaults.
+        "default_ui_style": ".defaults",
+        "default_pygments_style": ".defaults",
+        # Style.
+        "Style": ".style",
+        "Priority": ".style",
+        "merge_styles": ".style",
+        "parse_color": ".style",
+        # Style transformation.
+        "StyleTransformation": ".transformation",
+        "SwapLightAndDarkStyleTransformation": ".transformation",
+        "ReverseStyleTransformation": ".transformation",
+        "SetDefaultColorStyleTransformation": ".transformation",
+        "AdjustBrightnessStyleTransformation": ".transformation",
+        "DummyStyleTransformation": ".transformation",
+        "ConditionalStyleTransformation": ".transformation",
+        "DynamicStyleTransformation": ".transformation",
+        "merge_style_transformations": ".transformation",
+        # Pygments.
+        "style_from_pygments_cls": ".pygments",
+        "style_from_pygments_dict": ".pygments",
+        "pygments_token_to_classname": ".pygments",
+        # Named colors.
+        "NAMED_COLORS": ".webcolors",
+    },
+)
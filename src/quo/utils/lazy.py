@@ -0,0 +1,66 @@
+"""
+Lazy attributes for packages (PEP 562). Importing a package, or any of its
+submodules, doesn't import everything that the package exports; every
+attribute is imported the first time it's accessed.
+"""
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+__all__ = [
+    "lazy_attributes",
+]
+
+
+def lazy_attributes(
+    package_globals: Dict[str, Any], attributes: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Create the module level `__getattr__` and `__dir__` functions of a
+    package. Usage (in the `__init__.py` of the package)::
+
+        __getattr__, __dir__ = lazy_attributes(
+            globals(),
+            {
+                "Window": ".containers",
+                "KeyBinder": ".key_binding.key_bindings:Bind",
+            },
+        )
+
+    Submodules of the package that weren't imported yet are also imported
+    when they are accessed as an attribute.
+
+    :param package_globals: `globals()` of the package. Imported attributes
+        are stored in there, so that they are only looked up once.
+    :param attributes: Maps the attribute names to the module (relative to the
+        package) that defines them. Append ":name" when the attribute has a
+        different name in that module.
+    """
+    package = package_globals["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        try:
+            location = attributes[name]
+        except KeyError:
+            pass
+        else:
+            module_name, _, attribute = location.partition(":")
+            value = getattr(
+                importlib.import_module(module_name, package), attribute or name
+            )
+            package_globals[name] = value
+            return value
+
+        if not name.startswith("__"):
+            submodule = "%s.%s" % (package, name)
+            try:
+                return importlib.import_module(submodule)
+            except ModuleNotFoundError as e:
+                if e.name != submodule:
+                    raise
+
+        raise AttributeError("module %r has no attribute %r" % (package, name))
+
+    def __dir__() -> List[str]:
+        return sorted(set(package_globals) | set(attributes))
+
+    return __getattr__, __dir__
@@ -83,6 +83,10 @@ class Event(Generic[_Sender]):
         "Alias for just calling the event."
         self()
 
+    def has_handlers(self) -> bool:
+        "True when at least one handler is attached."
+        return bool(self._handlers)
+
     def add_handler(self, handler: Callable[[_Sender], None]) -> None:
         """
         Add another handler to this callback.
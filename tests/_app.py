@@ -0,0 +1,52 @@
+"""
+Helpers for running quo code that needs a current application.
+"""
+import asyncio
+
+from quo.console.console import Console
+from quo.console.current import set_app
+from quo.input.posix_pipe import PosixPipeInput
+from quo.layout.containers import Window
+from quo.layout.controls import BufferControl, FormattedTextControl
+from quo.layout.layout import Layout
+from quo.output import DummyOutput
+
+
+def create_app(buffer=None):
+    """
+    Create an application, which isn't running. When a buffer is given, it's
+    the current buffer. (Close `app.input` when done.)
+    """
+    if buffer is None:
+        control = FormattedTextControl("")
+    else:
+        control = BufferControl(buffer=buffer)
+
+    return Console(
+        layout=Layout(Window(control)),
+        input=PosixPipeInput(),
+        output=DummyOutput(),
+    )
+
+
+def run_in_app(coroutine_function):
+    """
+    Run a coroutine with a (not running) application set as the current one,
+    so that buffers can start their background tasks.
+    """
+    app = create_app()
+
+    async def run():
+        with set_app(app):
+            return await coroutine_function()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        app.input.close()
+
+
+async def settle():
+    "Give the background tasks a few event loop iterations."
+    for _ in range(10):
+        await asyncio.sleep(0)
@@ -0,0 +1,112 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from quo.eventloop import generator_to_async_batches, generator_to_async_generator
+
+
+# Callbacks that `run_in_executor` schedules to set its future.
+_FUTURE_CALLBACKS = ("_set_state", "_call_set_state")
+
+
+def _collect(async_generator):
+    async def collect():
+        return [item async for item in async_generator]
+
+    return asyncio.run(collect())
+
+
+def test_generator_to_async_generator():
+    assert _collect(generator_to_async_generator(lambda: range(100))) == list(
+        range(100)
+    )
+
+
+def test_batches_contain_all_items_in_order():
+    batches = _collect(generator_to_async_batches(lambda: range(10000)))
+
+    assert list(itertools.chain(*batches)) == list(range(10000))
+    assert all(batches)
+
+
+def test_batches_wake_up_the_event_loop_once_per_batch():
+    async def test():
+        loop = asyncio.get_running_loop()
+        callbacks = []
+        call_soon_threadsafe = loop.call_soon_threadsafe
+
+        def counting_call_soon_threadsafe(callback, *a):
+            # (Not counting the callbacks of the executor future.)
+            if getattr(callback, "__name__", None) not in _FUTURE_CALLBACKS:
+                callbacks.append(callback)
+            return call_soon_threadsafe(callback, *a)
+
+        loop.call_soon_threadsafe = counting_call_soon_threadsafe
+
+        batches = []
+        async for batch in generator_to_async_batches(lambda: range(10000)):
+            batches.append(batch)
+            # A slow consumer.
+            time.sleep(0.01)
+
+        # One callback per batch, plus one for the end.
+        assert len(callbacks) <= len(batches) + 1
+        assert len(batches) < 100
+
+    asyncio.run(test())
+
+
+def test_batches_dont_wait_for_more_items():
+    received = threading.Event()
+
+    def slow_generator():
+        yield 1
+        # Only continues when the first item was received.
+        assert received.wait(5)
+        yield 2
+
+    async def test():
+        start = time.monotonic()
+        batches = []
+
+        async for batch in generator_to_async_batches(slow_generator):
+            batches.append(batch)
+            received.set()
+
+        assert batches == [[1], [2]]
+        assert time.monotonic() - start < 5
+
+    asyncio.run(test())
+
+
+def test_batches_stop_the_thread_when_closed():
+    produced = []
+
+    def endless():
+        for i in itertools.count():
+            produced.append(i)
+            time.sleep(0.001)
+            yield i
+
+    async def test():
+        batches = generator_to_async_batches(endless)
+        assert (await batches.__anext__())[0] == 0
+        await batches.aclose()
+
+        count = len(produced)
+        await asyncio.sleep(0.05)
+        assert len(produced) == count
+
+    asyncio.run(test())
+
+
+def test_batches_exception_in_generator():
+    def failing():
+        yield 1
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        _collect(generator_to_async_batches(failing))
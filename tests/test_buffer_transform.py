@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from quo.buffer import Buffer, indent, unindent
+from quo.document import Document
+
+
+def _buffer(text, cursor_position=0):
+    buffer = Buffer()
+    buffer.document = Document(text, cursor_position)
+    return buffer
+
+
+def test_transform_line_range():
+    buffer = _buffer("a\nb\nc\nd")
+    buffer.transform_line_range(1, 3, lambda l: "# " + l)
+
+    assert buffer.text == "a\n# b\n# c\nd"
+    assert buffer.document.cursor_position_row == 0
+
+
+def test_transform_line_range_cursor_row():
+    buffer = _buffer("a\nb\nc")
+    buffer.transform_line_range(0, 3, str.upper, cursor_row=2)
+
+    assert buffer.text == "A\nB\nC"
+    assert buffer.cursor_position == 4
+
+
+def test_transform_line_range_out_of_range_rows_are_skipped():
+    buffer = _buffer("a\nb")
+    buffer.transform_line_range(-5, 10, str.upper)
+    assert buffer.text == "A\nB"
+
+    buffer.transform_line_range(5, 10, lambda l: "x")
+    assert buffer.text == "A\nB"
+
+
+def test_transform_line_range_is_one_undo_step():
+    text = "\n".join("line %i" % i for i in range(1000))
+    buffer = _buffer(text)
+
+    buffer.transform_line_range(0, 1000, lambda l: "# " + l)
+    assert buffer.text.count("# ") == 1000
+
+    buffer.undo()
+    assert buffer.text == text
+
+
+def test_transform_line_range_without_undo():
+    buffer = _buffer("a")
+    buffer.transform_line_range(0, 1, str.upper, save_to_undo=False)
+
+    assert buffer._undo_stack == []
+
+
+def test_transform_lines_range_and_iterator_give_same_result():
+    text = "a\nb\nc\nd"
+
+    assert _buffer(text).transform_lines(range(1, 3), str.upper) == "a\nB\nC\nd"
+    assert _buffer(text).transform_lines([1, 2], str.upper) == "a\nB\nC\nd"
+    assert _buffer(text).transform_lines([3, 7], str.upper) == "a\nb\nc\nD"
+    assert _buffer(text).transform_lines(range(0, 4, 2), str.upper) == "A\nb\nC\nd"
+
+
+def test_transform_line_range_async():
+    buffer = _buffer("a\nb")
+
+    applied = asyncio.run(buffer.transform_line_range_async(0, 2, str.upper))
+
+    assert applied
+    assert buffer.text == "A\nB"
+
+
+def test_transform_line_range_async_discards_outdated_result():
+    buffer = _buffer("a\nb")
+
+    def transform(line):
+        # Runs in the worker thread, while the text is being edited.
+        buffer.text = "changed"
+        return line.upper()
+
+    applied = asyncio.run(buffer.transform_line_range_async(0, 2, transform))
+
+    assert not applied
+    assert buffer.text == "changed"
+
+
+@pytest.mark.parametrize("count", [1, 2])
+def test_indent_and_unindent(count):
+    buffer = _buffer("a\nb\nc", cursor_position=2)
+
+    indent(buffer, 0, 2, count=count)
+    prefix = "    " * count
+    assert buffer.text == "%sa\n%sb\nc" % (prefix, prefix)
+    assert buffer.document.cursor_position_row == 1
+    assert buffer.document.cursor_position_col == len(prefix)
+
+    unindent(buffer, 0, 2, count=count)
+    assert buffer.text == "a\nb\nc"
+
+    buffer.undo()
+    assert buffer.text == "%sa\n%sb\nc" % (prefix, prefix)
+
+
+def test_join_selected_lines_cursor_position():
+    buffer = _buffer("aaa\n  bbb\nccc")
+    buffer.start_selection()
+    buffer.cursor_position = len("aaa\n  bbb")
+
+    buffer.join_selected_lines()
+
+    # (Every joined line gets the separator, like before.)
+    assert buffer.text == "aaa bbb \nccc"
+    assert buffer.cursor_position == len("aaa")
@@ -0,0 +1,124 @@
+from quo.completion import (
+    CachingCompleter,
+    CompleteEvent,
+    Completer,
+    Completion,
+    FuzzyCompleter,
+    WordCompleter,
+)
+from quo.document import Document
+
+
+class _CountingCompleter(Completer):
+    "Completer that counts how often it's called."
+
+    def __init__(self, completer):
+        self.completer = completer
+        self.calls = 0
+
+    def get_completions(self, document, complete_event):
+        self.calls += 1
+        return self.completer.get_completions(document, complete_event)
+
+
+def _texts(completer, text):
+    completions = completer.get_completions(Document(text), CompleteEvent())
+    return [c.text for c in completions]
+
+
+def _completer(words, **kwargs):
+    inner = _CountingCompleter(WordCompleter(words, **kwargs))
+    return inner, CachingCompleter(inner, **kwargs)
+
+
+def test_narrows_previous_completions():
+    inner, completer = _completer(["apple", "apricot", "banana"])
+
+    assert _texts(completer, "a") == ["apple", "apricot"]
+    assert _texts(completer, "ap") == ["apple", "apricot"]
+    assert _texts(completer, "apr") == ["apricot"]
+    assert inner.calls == 1
+
+    completions = list(completer.get_completions(Document("apr"), CompleteEvent()))
+    assert completions[0].start_position == -3
+
+    # Going back (deleting) isn't a narrowing.
+    assert _texts(completer, "a") == ["apple", "apricot"]
+    assert inner.calls == 2
+
+
+def test_separator_calls_wrapped_completer():
+    inner, completer = _completer(["apple", "apricot"])
+
+    _texts(completer, "a")
+    assert _texts(completer, "a a") == ["apple", "apricot"]
+    assert inner.calls == 2
+
+    # Changed text after the cursor.
+    list(completer.get_completions(Document("a ab", 3), CompleteEvent()))
+    assert inner.calls == 3
+
+
+def test_match_middle_and_ignore_case():
+    inner, completer = _completer(
+        ["Apple", "pineapple", "grape"], match_middle=True, ignore_case=True
+    )
+
+    assert _texts(completer, "p") == ["Apple", "pineapple", "grape"]
+    assert _texts(completer, "pp") == ["Apple", "pineapple"]
+    assert _texts(completer, "ppl") == ["Apple", "pineapple"]
+    assert inner.calls == 1
+
+
+def test_partially_consumed_completions_are_not_cached():
+    inner, completer = _completer(["apple", "apricot"])
+
+    next(iter(completer.get_completions(Document("a"), CompleteEvent())))
+    assert _texts(completer, "ap") == ["apple", "apricot"]
+    assert inner.calls == 2
+
+
+def test_invalidate_and_version():
+    words = ["apple"]
+    version = [0]
+    inner = _CountingCompleter(WordCompleter(lambda: words))
+    completer = CachingCompleter(inner, get_version=lambda: version[0])
+
+    assert _texts(completer, "a") == ["apple"]
+
+    words.append("apricot")
+    version[0] += 1
+    assert _texts(completer, "ap") == ["apple", "apricot"]
+
+    words.append("apex")
+    completer.invalidate()
+    assert _texts(completer, "ap") == ["apple", "apricot", "apex"]
+    assert inner.calls == 3
+
+
+def test_keeps_completion_attributes():
+    class MetaCompleter(Completer):
+        def get_completions(self, document, complete_event):
+            yield Completion(
+                "apple", -len(document.text), display="APPLE", display_meta="fruit"
+            )
+
+    completer = CachingCompleter(MetaCompleter())
+    _texts(completer, "a")
+
+    (completion,) = completer.get_completions(Document("ap"), CompleteEvent())
+    assert completion.display_text == "APPLE"
+    assert completion.display_meta_text == "fruit"
+    assert completion.start_position == -2
+
+
+def test_inside_fuzzy_completer():
+    # The fuzzy completer calls the wrapped completer with the text before
+    # the word: that's cached while typing the word.
+    inner, completer = _completer(["django_migrations", "dinosaur"])
+    fuzzy = FuzzyCompleter(completer)
+
+    assert _texts(fuzzy, "d") == ["dinosaur", "django_migrations"]
+    assert _texts(fuzzy, "dm") == ["django_migrations"]
+    assert _texts(fuzzy, "dsa") == ["dinosaur"]
+    assert inner.calls == 1
@@ -0,0 +1,126 @@
+import asyncio
+import itertools
+import threading
+import time
+
+from quo.buffer import Buffer
+from quo.completion import (
+    CompleteEvent,
+    Completer,
+    Completion,
+    ThreadedCompleter,
+    until_cancelled,
+)
+from quo.completion.core import _COMPLETION_BATCH_SIZE
+from quo.document import Document
+
+from ._app import run_in_app, settle
+
+
+class _EndlessCompleter(Completer):
+    "Completer that produces completions until it's closed."
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.produced = 0
+        self.closed = threading.Event()
+
+    def get_completions(self, document, complete_event):
+        try:
+            for i in itertools.count():
+                self.produced += 1
+                yield Completion("c%i" % i)
+                time.sleep(self.delay)
+        finally:
+            self.closed.set()
+
+
+def test_complete_event_cancel_and_deadline():
+    event = CompleteEvent()
+    assert not event.cancelled
+
+    event.cancel()
+    assert event.cancelled
+
+    event = CompleteEvent()
+    event.deadline = time.monotonic() - 1
+    assert event.cancelled
+
+
+def test_until_cancelled():
+    event = CompleteEvent()
+    endless = (Completion(str(i)) for i in itertools.count())
+    completions = until_cancelled(endless, event)
+
+    assert [c.text for c in itertools.islice(completions, 3)] == ["0", "1", "2"]
+    event.cancel()
+    assert list(completions) == []
+
+
+def test_default_batches_stop_when_cancelled():
+    completer = _EndlessCompleter()
+    event = CompleteEvent()
+
+    async def test():
+        batches = completer.get_completion_batches_async(Document(), event)
+        batch = await batches.__anext__()
+        assert len(batch) == _COMPLETION_BATCH_SIZE
+
+        event.cancel()
+        assert [b async for b in batches] == []
+
+    asyncio.run(test())
+    assert completer.produced <= _COMPLETION_BATCH_SIZE + 1
+
+
+def test_threaded_completer_stops_thread_when_cancelled():
+    completer = _EndlessCompleter(delay=0.001)
+    event = CompleteEvent()
+
+    async def test():
+        threaded = ThreadedCompleter(completer)
+        async for _ in threaded.get_completion_batches_async(Document(), event):
+            event.cancel()
+            break
+
+    asyncio.run(test())
+    assert completer.closed.wait(1)
+
+
+def test_buffer_completion_timeout():
+    completer = _EndlessCompleter(delay=0.01)
+
+    async def test():
+        buffer = Buffer(completer=ThreadedCompleter(completer), completion_timeout=0.2)
+        buffer.start_completion()
+
+        await asyncio.sleep(0.5)
+        assert completer.closed.is_set()
+
+        # The completions found until then are kept.
+        count = len(buffer.complete_state.completions)
+        assert 0 < count < 50
+
+        await asyncio.sleep(0.1)
+        assert len(buffer.complete_state.completions) == count
+
+    run_in_app(test)
+
+
+def test_buffer_cancels_completer_when_text_changes():
+    completer = _EndlessCompleter(delay=0.01)
+
+    async def test():
+        buffer = Buffer(completer=ThreadedCompleter(completer))
+        buffer.start_completion()
+        await asyncio.sleep(0.05)
+        assert not completer.closed.is_set()
+
+        buffer.insert_text("a")
+        await settle()
+        await asyncio.sleep(0.05)
+
+        assert completer.closed.is_set()
+        assert buffer.complete_state is None
+
+    run_in_app(test)
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import stat
+import threading
+
+import pytest
+
+from quo.completion import CompleteEvent, ExecutableCompleter, PathCompleter
+from quo.document import Document
+
+
+def _complete(completer, text):
+    return list(completer.get_completions(Document(text), CompleteEvent()))
+
+
+def _displays(completer, text):
+    return [c.display_text for c in _complete(completer, text)]
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for name in ["b.txt", "a.txt", "ab.py", "other"]:
+        (tmp_path / name).write_text("")
+    (tmp_path / "adir").mkdir()
+    (tmp_path / "adir" / "inner.txt").write_text("")
+    return tmp_path
+
+
+def test_path_completer(directory):
+    completer = PathCompleter(get_paths=lambda: [str(directory)])
+
+    assert _displays(completer, "a") == ["a.txt", "ab.py", "adir/"]
+    assert [c.text for c in _complete(completer, "a")] == [".txt", "b.py", "dir"]
+    assert _displays(completer, "adir/") == ["inner.txt"]
+    assert _displays(completer, "x") == []
+    assert _displays(completer, "missing/") == []
+
+
+def test_path_completer_options(directory):
+    completer = PathCompleter(get_paths=lambda: [str(directory)], only_directories=True)
+    assert _displays(completer, "") == ["adir/"]
+
+    completer = PathCompleter(
+        get_paths=lambda: [str(directory)],
+        file_filter=lambda name: name.endswith(".py"),
+        min_input_len=1,
+    )
+    assert _displays(completer, "") == []
+    assert _displays(completer, "a") == ["ab.py"]
+
+
+def test_path_completer_merges_directories(tmp_path):
+    for directory, names in [("one", ["a1", "a3"]), ("two", ["a2", "a4"])]:
+        (tmp_path / directory).mkdir()
+        for name in names:
+            (tmp_path / directory / name).write_text("")
+
+    completer = PathCompleter(
+        get_paths=lambda: [str(tmp_path / "one"), str(tmp_path / "two")]
+    )
+    assert _displays(completer, "a") == ["a1", "a2", "a3", "a4"]
+
+
+def test_path_completer_caches_listings(directory, monkeypatch):
+    completer = PathCompleter(get_paths=lambda: [str(directory)])
+    scandir = os.scandir
+    calls = []
+
+    def counting_scandir(path):
+        calls.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+
+    _displays(completer, "a")
+    _displays(completer, "ab")
+    assert len(calls) == 1
+
+    # A changed directory is listed again.
+    (directory / "abc").write_text("")
+    mtime = os.stat(directory).st_mtime_ns + 10 ** 9
+    os.utime(directory, ns=(mtime, mtime))
+
+    assert _displays(completer, "ab") == ["ab.py", "abc"]
+    assert len(calls) == 2
+
+
+def test_path_completer_async(directory):
+    completer = PathCompleter(get_paths=lambda: [str(directory)])
+
+    async def get_batches():
+        return [
+            [c.display_text for c in batch]
+            async for batch in completer.get_completion_batches_async(
+                Document("a"), CompleteEvent()
+            )
+        ]
+
+    async def get_completions():
+        return [
+            c.display_text
+            async for c in completer.get_completions_async(
+                Document("a"), CompleteEvent()
+            )
+        ]
+
+    expected = ["a.txt", "ab.py", "adir/"]
+    assert sum(asyncio.run(get_batches()), []) == expected
+    assert asyncio.run(get_completions()) == expected
+
+
+def _make_executable(path):
+    path.write_text("")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Uses the executable bit.")
+def test_executable_completer(tmp_path, monkeypatch):
+    for directory in ["one", "two"]:
+        (tmp_path / directory).mkdir()
+    _make_executable(tmp_path / "one" / "tool")
+    _make_executable(tmp_path / "two" / "tool")
+    _make_executable(tmp_path / "two" / "toolbox")
+    (tmp_path / "two" / "tool.txt").write_text("")
+
+    monkeypatch.setenv(
+        "PATH", os.pathsep.join([str(tmp_path / "one"), str(tmp_path / "two")])
+    )
+    completer = ExecutableCompleter(refresh_interval=0)
+
+    assert _displays(completer, "to") == ["tool", "tool", "toolbox"]
+    completer._refresh_thread.join()
+    assert _displays(completer, "to") == ["tool", "tool", "toolbox"]
+    assert _displays(completer, "") == []
+
+    # Refreshed in the background.
+    _make_executable(tmp_path / "two" / "total")
+    mtime = os.stat(tmp_path / "two").st_mtime_ns + 10 ** 9
+    os.utime(tmp_path / "two", ns=(mtime, mtime))
+
+    _complete(completer, "to")
+    completer._refresh_thread.join()
+    assert _displays(completer, "tot") == ["total"]
+
+    # Paths with a directory go through the `PathCompleter`. (An absolute
+    # path is the same directory for every `PATH` entry.)
+    assert set(_displays(completer, str(tmp_path / "two") + "/t")) == {
+        "tool",
+        "toolbox",
+        "total",
+    }
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Uses the executable bit.")
+def test_executable_completer_index_is_built_in_background(tmp_path, monkeypatch):
+    _make_executable(tmp_path / "tool")
+    (tmp_path / "tool.txt").write_text("")
+    monkeypatch.setenv("PATH", str(tmp_path))
+
+    building = threading.Event()
+    refresh_index = ExecutableCompleter._refresh_index
+
+    def slow_refresh_index(self):
+        building.wait()
+        refresh_index(self)
+
+    monkeypatch.setattr(ExecutableCompleter, "_refresh_index", slow_refresh_index)
+    completer = ExecutableCompleter()
+
+    # Until the index is ready, the `PATH` directories are searched.
+    assert _displays(completer, "to") == ["tool"]
+    assert completer._index is None
+
+    building.set()
+    completer._refresh_thread.join()
+    assert completer._index is not None
+    assert _displays(completer, "to") == ["tool"]
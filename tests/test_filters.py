@@ -0,0 +1,123 @@
+from quo.console.current import get_app
+from quo.filters import Always, Condition, Never, filter_epoch
+from quo.keys.key_binding.key_bindings import Bind
+from quo.keys.key_binding.key_processor import KeyPress
+
+from ._app import create_app, run_in_app
+
+
+class Counter:
+    "Condition function that counts how often it's evaluated."
+
+    def __init__(self, value=True):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_stable_condition_is_evaluated_once_per_epoch():
+    func = Counter()
+    condition = Condition(func, epoch_stable=True)
+
+    with filter_epoch():
+        assert condition()
+        func.value = False
+        assert condition()
+    assert func.calls == 1
+
+    # A new epoch, and outside of an epoch: evaluated again.
+    with filter_epoch():
+        assert not condition()
+    assert not condition()
+    assert not condition()
+    assert func.calls == 4
+
+
+def test_condition_is_not_stable_by_default():
+    func = Counter()
+    condition = Condition(func)
+
+    with filter_epoch():
+        condition()
+        condition()
+    assert func.calls == 2
+
+
+def test_nested_epochs_start_empty():
+    func = Counter()
+    condition = Condition(func, epoch_stable=True)
+
+    with filter_epoch():
+        condition()
+        with filter_epoch():
+            condition()
+            condition()
+        condition()
+    assert func.calls == 2
+
+
+def test_combined_filters():
+    stable = Condition(Counter(), epoch_stable=True)
+    unstable = Condition(Counter())
+
+    assert Always().epoch_stable and Never().epoch_stable
+    assert (stable & stable).epoch_stable
+    assert (stable | ~stable).epoch_stable
+    assert not (stable & unstable).epoch_stable
+    assert not (stable | unstable).epoch_stable
+    assert not (~unstable).epoch_stable
+
+    func = Counter(False)
+    combined = Condition(func, epoch_stable=True) | Condition(Counter(True))
+
+    # Only the stable part is cached.
+    with filter_epoch():
+        assert combined()
+        assert combined()
+    assert func.calls == 1
+
+
+def test_console_filter_epoch():
+    func = Counter()
+    condition = Condition(func, epoch_stable=True)
+
+    for cache_filters, calls in [(False, 2), (True, 1)]:
+        app = create_app()
+        app.cache_filters = cache_filters
+        func.calls = 0
+
+        try:
+            with app.filter_epoch():
+                condition()
+                condition()
+        finally:
+            app.input.close()
+
+        assert func.calls == calls
+
+
+def test_key_binding_lookup_is_an_epoch():
+    func = Counter()
+    condition = Condition(func, epoch_stable=True)
+    handled = []
+
+    bind = Bind()
+    bind.add("x", filter=condition)(lambda event: handled.append(1))
+    bind.add("x", filter=condition)(lambda event: handled.append(2))
+
+    async def press_x(cache_filters):
+        app = get_app()
+        app.bind = bind
+        app.cache_filters = cache_filters
+        func.calls = 0
+
+        app.key_processor.feed(KeyPress("x"))
+        app.key_processor.process_keys()
+        return func.calls
+
+    assert run_in_app(lambda: press_x(False)) == 2
+    assert run_in_app(lambda: press_x(True)) == 1
+    assert handled == [2, 2]
@@ -0,0 +1,138 @@
+import random
+import re
+
+import pytest
+
+from quo.completion import (
+    CompleteEvent,
+    FuzzyCompleter,
+    FuzzyWordCompleter,
+    WordCompleter,
+)
+from quo.document import Document
+
+
+def _complete(completer, text):
+    return list(completer.get_completions(Document(text), CompleteEvent()))
+
+
+def _texts(completer, text):
+    return [c.text for c in _complete(completer, text)]
+
+
+def _is_subsequence(word, text):
+    it = iter(text)
+    return all(c in it for c in word)
+
+
+def test_fuzzy_matches_same_candidates_as_regex():
+    rng = random.Random(0)
+    alphabet = "abcAB_-x"
+    words = sorted(
+        {
+            "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 12)))
+            for _ in range(500)
+        }
+    )
+
+    for _ in range(50):
+        typed = "".join(rng.choice("abcx") for _ in range(rng.randrange(1, 4)))
+        completer = FuzzyWordCompleter(words, WORD=True)
+        regex = re.compile(".*?".join(map(re.escape, typed)), re.IGNORECASE)
+
+        completions = _complete(completer, typed)
+        assert sorted(c.text for c in completions) == sorted(
+            w for w in words if regex.search(w)
+        )
+
+        for c in completions:
+            # The highlighted window starts and ends with a matched character
+            # and contains the input in order.
+            highlighted = "".join(
+                text for style, text in c.display if ".inside" in style
+            ).lower()
+            assert highlighted[0] == typed[0].lower()
+            assert highlighted[-1] == typed[-1].lower()
+            assert _is_subsequence(typed.lower(), highlighted)
+
+
+def test_fuzzy_ranking():
+    completer = FuzzyWordCompleter(
+        ["xdjmx", "djangomigrations", "DjangoMigrations", "django_migrations"]
+    )
+
+    # Word boundaries first, then camelCase humps, then the shortest gaps.
+    assert _texts(completer, "djm") == [
+        "django_migrations",
+        "DjangoMigrations",
+        "xdjmx",
+        "djangomigrations",
+    ]
+
+
+def test_fuzzy_exact_case_bonus():
+    completer = FuzzyWordCompleter(["abc", "ABC"])
+
+    assert _texts(completer, "AB") == ["ABC", "abc"]
+    assert _texts(completer, "ab") == ["abc", "ABC"]
+
+
+def test_fuzzy_max_results():
+    words = ["w%03i" % i for i in range(300)] + ["wx_%i" % i for i in range(10)]
+    completer = FuzzyCompleter(WordCompleter(words))
+    limited = FuzzyCompleter(WordCompleter(words), max_results=5)
+
+    assert _texts(limited, "w1") == _texts(completer, "w1")[:5]
+
+    # Also without input.
+    assert _texts(limited, "") == words[:5]
+
+
+def test_fuzzy_without_input_keeps_order():
+    completer = FuzzyWordCompleter(["b", "a", "c"])
+
+    completions = _complete(completer, "")
+    assert [c.text for c in completions] == ["b", "a", "c"]
+    assert [c.display_text for c in completions] == ["b", "a", "c"]
+
+
+def test_fuzzy_display_and_start_position():
+    completer = FuzzyWordCompleter(["leopard", "gorilla", "dinosaur", "cat", "bee"])
+
+    completions = _complete(completer, "x oar")
+    assert [c.text for c in completions] == ["leopard", "dinosaur"]
+    assert all(c.start_position == -3 for c in completions)
+
+    assert completions[0].display == [
+        ("class:fuzzymatch.outside", "le"),
+        ("class:fuzzymatch.inside.character", "o"),
+        ("class:fuzzymatch.inside", "p"),
+        ("class:fuzzymatch.inside.character", "a"),
+        ("class:fuzzymatch.inside.character", "r"),
+        ("class:fuzzymatch.outside", "d"),
+    ]
+
+
+@pytest.mark.parametrize("word", ["İstanbul", "straße"])
+def test_fuzzy_characters_that_change_length_when_lowercased(word):
+    completer = FuzzyWordCompleter([word, "other"], WORD=True)
+
+    completions = _complete(completer, word[-3:])
+    assert [c.text for c in completions] == [word]
+    assert "".join(text for _, text in completions[0].display) == word
+
+
+def test_fuzzy_disabled():
+    completer = FuzzyCompleter(WordCompleter(["abc", "xabc"]), enable_fuzzy=False)
+
+    assert _texts(completer, "ab") == ["abc"]
+
+
+def test_fuzzy_word_completer_with_changing_words():
+    words = ["abc"]
+    completer = FuzzyWordCompleter(lambda: words)
+
+    assert _texts(completer, "a") == ["abc"]
+
+    words.append("abd")
+    assert _texts(completer, "ab") == ["abc", "abd"]
@@ -0,0 +1,639 @@
+import asyncio
+import gc
+import gzip
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import weakref
+
+import pytest
+
+import quo.history
+from quo.buffer import Buffer
+from quo.completion.auto_suggest import AutoSuggestFromHistory, ThreadedAutoSuggest
+from quo.document import Document
+from quo.history import (
+    FileHistory,
+    InMemoryHistory,
+    SharedFileHistory,
+    SQLiteHistory,
+)
+from quo.search import SearchState
+
+from ._app import run_in_app, settle
+
+
+def _load(history):
+    async def load():
+        return [item async for item in history.load()]
+
+    return asyncio.run(load())
+
+
+@pytest.fixture
+def history_file(tmp_path):
+    return str(tmp_path / "history")
+
+
+def test_file_history_newest_first(history_file):
+    history = FileHistory(history_file)
+    for string in ["one", "two\nlines", "three"]:
+        history.store_string(string)
+
+    assert _load(FileHistory(history_file)) == ["three", "two\nlines", "one"]
+
+
+def test_file_history_reads_existing_format(history_file):
+    with open(history_file, "wb") as f:
+        f.write(
+            b"\n# 2023-01-01 00:00:00\n+first\n"
+            b"\n# 2023-01-02 00:00:00\n+multi\n+line\n"
+            b"+no separator\n"
+            b"\n# 2023-01-03 00:00:00\n+caf\xc3\xa9 \xff\n"
+        )
+
+    assert _load(FileHistory(history_file)) == [
+        "caf\xe9 �",
+        "multi\nline\nno separator",
+        "first",
+    ]
+
+
+def test_file_history_missing_or_empty_file(history_file):
+    assert _load(FileHistory(history_file)) == []
+
+    open(history_file, "wb").close()
+    assert _load(FileHistory(history_file)) == []
+
+
+def test_file_history_is_read_lazily(history_file):
+    history = FileHistory(history_file)
+    for i in range(10):
+        history.store_string("entry %i" % i)
+
+    strings = iter(FileHistory(history_file).load_history_strings())
+    assert next(strings) == "entry 9"
+    assert next(strings) == "entry 8"
+
+
+def _open_files():
+    fds = "/proc/self/fd"
+    return {os.path.realpath(os.path.join(fds, fd)) for fd in os.listdir(fds)}
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_file_history_is_closed_between_batches(history_file):
+    history = FileHistory(history_file)
+    for i in range(2500):
+        history.store_string("entry %i" % i)
+
+    strings = iter(FileHistory(history_file).load_history_strings())
+    assert next(strings) == "entry 2499"
+    assert os.path.realpath(history_file) not in _open_files()
+
+    assert len(list(strings)) == 2499
+
+
+def test_file_history_continues_in_replaced_file(history_file):
+    history = FileHistory(history_file)
+    for i in range(2500):
+        history.store_string("entry %i" % i)
+
+    strings = iter(FileHistory(history_file).load_history_strings())
+    first_batch = [next(strings) for _ in range(1000)]
+    assert first_batch[-1] == "entry 1500"
+
+    # Replace the file, like a compaction does. Entries that were loaded
+    # already are skipped.
+    history = FileHistory(history_file + ".new")
+    for string in ["entry 0", "entry 1", "entry 2000", "new"]:
+        history.store_string(string)
+    os.replace(history.filename, history_file)
+
+    assert list(strings) == ["new", "entry 1", "entry 0"]
+
+
+def test_load_incorporates_appended_strings():
+    history = InMemoryHistory(["a", "b"])
+    assert _load(history) == ["b", "a"]
+
+    history.append("c")
+    assert _load(history) == ["c", "b", "a"]
+    assert history.get_strings() == ["a", "b", "c"]
+
+
+def test_load_append_while_loading():
+    history = InMemoryHistory(["e%i" % i for i in range(3000)])
+
+    async def load():
+        result = []
+        async for item in history.load():
+            result.append(item)
+            if len(result) == 10:
+                history.append("new")
+        return result
+
+    result = asyncio.run(load())
+
+    # Nothing skipped or duplicated. (The new entry was inserted in front of
+    # the position of the running load.)
+    assert len(result) == 3000
+    assert result[:2] == ["e2999", "e2998"]
+    assert result[-1] == "e0"
+
+
+def test_buffer_loads_older_entries_on_demand():
+    from quo.buffer import _HISTORY_READ_AHEAD
+
+    history = InMemoryHistory(["e%i" % i for i in range(5 * _HISTORY_READ_AHEAD)])
+
+    async def test():
+        buffer = Buffer(history=history)
+        buffer.load_history_if_not_yet_loaded()
+        await settle()
+
+        # Only the read ahead is loaded. (Plus the current input.)
+        assert len(buffer._working_lines) == _HISTORY_READ_AHEAD + 1
+        assert len(history.get_strings()) < 5 * _HISTORY_READ_AHEAD
+
+        # Going back loads more.
+        buffer.history_backward(count=200)
+        assert buffer.text == "e%i" % (5 * _HISTORY_READ_AHEAD - 200)
+        await settle()
+        assert len(buffer._working_lines) == _HISTORY_READ_AHEAD + 201
+
+        # Searching loads everything.
+        buffer._search(SearchState("e3"))
+        await settle()
+        assert len(buffer._working_lines) == 5 * _HISTORY_READ_AHEAD + 1
+        assert buffer._load_history_task.done()
+
+    run_in_app(test)
+
+
+def test_buffer_history_search_loads_everything():
+    history = InMemoryHistory(["match"] + ["e%i" % i for i in range(3000)])
+
+    async def test():
+        buffer = Buffer(history=history, enable_history_search=True)
+        buffer.load_history_if_not_yet_loaded()
+        await settle()
+
+        buffer.text = "ma"
+        buffer.history_backward()
+        await settle()
+
+        assert len(buffer._working_lines) == 3002
+
+    run_in_app(test)
+
+
+def test_compact_drops_duplicates_and_old_entries(history_file):
+    history = FileHistory(history_file, max_entries=3)
+    for string in ["a", "b", "a", "c", "d", "c"]:
+        history.store_string(string)
+
+    history.compact()
+
+    # Duplicates keep their most recent position.
+    assert _load(FileHistory(history_file)) == ["c", "d", "a"]
+
+
+def test_compact_max_bytes_and_archive(history_file):
+    history = FileHistory(history_file, max_bytes=200, archive=True)
+    for i in range(20):
+        history.store_string("entry %i" % i)
+
+    history.compact()
+
+    assert os.path.getsize(history_file) <= 200
+    kept = _load(FileHistory(history_file))
+    assert kept[0] == "entry 19"
+
+    with gzip.open(history.archive_filename, "rb") as f:
+        archived = f.read().decode("utf-8")
+    assert "+entry 0\n" in archived
+    assert "+%s\n" % kept[-1] not in archived
+
+
+def test_compact_keeps_entries_appended_while_compacting(history_file, monkeypatch):
+    history = FileHistory(history_file, max_entries=100)
+    history.store_string("old")
+
+    compact_history_blocks = quo.history._compact_history_blocks
+
+    def compact_and_append(*a):
+        # Another writer appends after the file has been read.
+        FileHistory(history_file).store_string("appended")
+        return compact_history_blocks(*a)
+
+    monkeypatch.setattr(quo.history, "_compact_history_blocks", compact_and_append)
+    history.compact()
+
+    assert _load(FileHistory(history_file)) == ["appended", "old"]
+
+
+def test_compact_starts_over_when_file_was_replaced(history_file, monkeypatch):
+    history = FileHistory(history_file, max_entries=100)
+    history.store_string("a")
+
+    compact_history_blocks = quo.history._compact_history_blocks
+    calls = []
+
+    def compact_and_replace(*a):
+        calls.append(a)
+        if len(calls) == 1:
+            # Another process compacts (replaces) the file in the meantime.
+            with open(history_file + ".new", "wb") as f:
+                f.write(quo.history._format_history_entry("replaced"))
+            os.replace(history_file + ".new", history_file)
+        return compact_history_blocks(*a)
+
+    monkeypatch.setattr(quo.history, "_compact_history_blocks", compact_and_replace)
+    history.compact()
+
+    assert len(calls) == 2
+    assert _load(FileHistory(history_file)) == ["replaced"]
+
+
+def test_compact_doesnt_lose_appends_from_other_processes(history_file):
+    history = FileHistory(history_file, max_entries=10000)
+    count = 300
+
+    writer = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from quo.history import FileHistory\n"
+            "history = FileHistory(sys.argv[1])\n"
+            "for i in range(%i):\n"
+            "    history.store_string('entry %%i' %% i)\n" % count,
+            history_file,
+        ],
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+    )
+    while writer.poll() is None:
+        history.compact()
+    assert writer.returncode == 0
+
+    strings = _load(FileHistory(history_file))
+    assert sorted(strings) == sorted("entry %i" % i for i in range(count))
+
+
+def _run_python(code, *args):
+    subprocess.run(
+        [sys.executable, "-c", code] + list(args),
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+        check=True,
+    )
+
+
+def test_shared_file_history(history_file):
+    history = SharedFileHistory.for_file(history_file)
+    assert SharedFileHistory.for_file(history_file) is history
+
+    for i in range(100):
+        history.append("entry %i" % i)
+    history.flush()
+
+    assert _load(FileHistory(history_file))[:2] == ["entry 99", "entry 98"]
+    assert history.get_strings()[-1] == "entry 99"
+
+
+def test_shared_file_history_is_flushed_at_exit(history_file):
+    _run_python(
+        "import sys\n"
+        "from quo.history import SharedFileHistory\n"
+        "history = SharedFileHistory(sys.argv[1])\n"
+        "for i in range(1000):\n"
+        "    history.store_string('entry %i' % i)\n",
+        history_file,
+    )
+
+    assert len(_load(FileHistory(history_file))) == 1000
+
+
+def test_shared_file_history_survives_unwritable_strings(history_file):
+    history = SharedFileHistory(history_file)
+    history.store_string("before")
+    history.store_string("lone \udc80 surrogate")
+    history.store_string("after")
+
+    flush = threading.Thread(target=history.flush, daemon=True)
+    flush.start()
+    flush.join(timeout=5)
+    assert not flush.is_alive()
+
+    assert _load(FileHistory(history_file)) == ["after", "before"]
+
+    # The writer thread is started again for later appends.
+    history.store_string("later")
+    history.flush()
+    assert _load(FileHistory(history_file))[0] == "later"
+
+
+def test_shared_file_histories_are_garbage_collected(history_file):
+    history = SharedFileHistory(history_file)
+    history.store_string("a")
+    history.flush()
+
+    history_ref = weakref.ref(history)
+    del history
+    # (The writer thread stops by itself, once the queue is empty.)
+    for _ in range(100):
+        gc.collect()
+        if history_ref() is None:
+            break
+        time.sleep(0.01)
+
+    assert history_ref() is None
+    assert len(quo.history._shared_file_histories) == 0
+
+
+def test_shared_file_history_appends_to_compacted_file(history_file):
+    history = SharedFileHistory(history_file, max_entries=10000)
+    count = 300
+
+    writer = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from quo.history import SharedFileHistory\n"
+            "history = SharedFileHistory(sys.argv[1])\n"
+            "for i in range(%i):\n"
+            "    history.store_string('entry %%i' %% i)\n"
+            "    if i %% 10 == 0:\n"
+            "        history.flush()\n" % count,
+            history_file,
+        ],
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+    )
+    while writer.poll() is None:
+        history.compact()
+    assert writer.returncode == 0
+
+    strings = _load(FileHistory(history_file))
+    assert sorted(strings) == sorted("entry %i" % i for i in range(count))
+
+
+@pytest.fixture
+def sqlite_history(tmp_path):
+    history = SQLiteHistory(str(tmp_path / "history.db"), session_id="one")
+    for string in ["git status", "git commit -m 'a \"b\"'", "ls", "echo git"]:
+        history.store_string(string)
+    return history
+
+
+def test_sqlite_history_load(sqlite_history):
+    assert _load(sqlite_history) == [
+        "echo git",
+        "ls",
+        "git commit -m 'a \"b\"'",
+        "git status",
+    ]
+
+    # Stored entries survive reopening the database.
+    reopened = SQLiteHistory(sqlite_history.filename)
+    assert _load(reopened)[0] == "echo git"
+
+
+@pytest.mark.parametrize("fts", [True, False])
+def test_sqlite_history_query(sqlite_history, fts):
+    if fts and not sqlite_history._fts:
+        pytest.skip("No FTS5 trigram tokenizer.")
+    sqlite_history._fts = fts
+
+    assert list(sqlite_history.query("git")) == [
+        "echo git",
+        "git commit -m 'a \"b\"'",
+        "git status",
+    ]
+    assert list(sqlite_history.query("git", prefix=True)) == [
+        "git commit -m 'a \"b\"'",
+        "git status",
+    ]
+    assert list(sqlite_history.query("git", limit=1)) == ["echo git"]
+    assert list(sqlite_history.query('"b"')) == ["git commit -m 'a \"b\"'"]
+    assert list(sqlite_history.query("s")) == ["ls", "git status"]
+    assert list(sqlite_history.query("nothing")) == []
+    assert len(list(sqlite_history.query())) == 4
+
+
+def test_sqlite_history_query_session_and_cwd(sqlite_history, tmp_path, monkeypatch):
+    other = SQLiteHistory(sqlite_history.filename, session_id="two")
+    monkeypatch.chdir(tmp_path)
+    other.store_string("git push")
+
+    assert list(sqlite_history.query("git", session_id="two")) == ["git push"]
+    assert list(sqlite_history.query("git", session_id="one"))[0] == "echo git"
+    assert list(sqlite_history.query(cwd=os.getcwd())) == ["git push"]
+
+
+def test_sqlite_history_line_queries(tmp_path):
+    history = SQLiteHistory(str(tmp_path / "history.db"))
+    history.store_string("first\nsecond line")
+    history.store_string("second")
+
+    assert history.find_line_starting_with("sec") == "second"
+    assert list(history.get_lines_starting_with("sec")) == ["second", "second line"]
+    assert list(history.get_stripped_lines_starting_with("second")) == [
+        "second",
+        "second line",
+    ]
+
+
+def _most_recent_line_starting_with(history, prefix):
+    for string in reversed(history.get_strings()):
+        for line in reversed(string.splitlines()):
+            if line.startswith(prefix):
+                return line
+    return None
+
+
+@pytest.mark.parametrize("count", [10, 3000])
+def test_find_line_starting_with(count):
+    rng = random.Random(count)
+    words = ["git", "ls", "echo", "cd", "grep", "python"]
+
+    def random_entry():
+        return "\n".join(
+            "%s %i" % (rng.choice(words), rng.randrange(count))
+            for _ in range(rng.choice([1, 1, 1, 3]))
+        )
+
+    history = InMemoryHistory([random_entry() for _ in range(count)])
+    _load(history)
+
+    prefixes = ["", "g", "gi", "git ", "git 1", "python 2", "x", "ls 99"]
+
+    for _ in range(3):
+        for prefix in prefixes:
+            expected = _most_recent_line_starting_with(history, prefix)
+            assert history.find_line_starting_with(prefix) == expected, prefix
+
+        # Appended entries are the most recent.
+        history.append(random_entry())
+
+
+@pytest.mark.parametrize("count", [10, 3000])
+def test_get_stripped_lines_starting_with(count):
+    rng = random.Random(count)
+    words = ["git", "ls", "echo", "cd", "grep", "python"]
+
+    def random_line():
+        indent = rng.choice(["", "  "])
+        return "%s%s %i" % (indent, rng.choice(words), rng.randrange(count))
+
+    def random_entry():
+        return "\n".join(random_line() for _ in range(rng.choice([1, 1, 1, 3])))
+
+    history = InMemoryHistory([random_entry() for _ in range(count)])
+    _load(history)
+
+    # (The short prefixes match most lines, the long ones a few.)
+    prefixes = ["", "g", "git ", "git 1", "python 2", "x"]
+
+    for _ in range(3):
+        for prefix in prefixes:
+            expected = []
+            for string in reversed(history.get_strings()):
+                for line in reversed(string.splitlines()):
+                    line = line.strip()
+                    if line.startswith(prefix) and line not in expected:
+                        expected.append(line)
+
+            result = history.get_stripped_lines_starting_with(prefix)
+            assert list(result) == expected, prefix
+
+        history.append(random_entry())
+
+
+def test_find_line_starting_with_growing_prefix():
+    history = InMemoryHistory(["git status", "git stash", "grep x"])
+    _load(history)
+
+    assert history.find_line_starting_with("g") == "grep x"
+    assert history.find_line_starting_with("gi") == "git stash"
+    assert history.find_line_starting_with("git stat") == "git status"
+    assert history.find_line_starting_with("git statx") is None
+    assert history.find_line_starting_with("git statxy") is None
+
+    history.append("git statxyz")
+    assert history.find_line_starting_with("git statxy") == "git statxyz"
+
+
+def test_auto_suggest_from_history():
+    history = InMemoryHistory(["git status", "second\nlast line"])
+    buffer = Buffer(history=history)
+    _load(history)
+
+    def suggest(auto_suggest, text):
+        document = Document(text, len(text))
+        suggestion = asyncio.run(auto_suggest.get_suggestion_async(buffer, document))
+        return suggestion and suggestion.text
+
+    for auto_suggest in [
+        AutoSuggestFromHistory(),
+        ThreadedAutoSuggest(AutoSuggestFromHistory()),
+    ]:
+        assert suggest(auto_suggest, "git s") == "tatus"
+        assert suggest(auto_suggest, "first\nla") == "st line"
+        assert suggest(auto_suggest, "nothing") is None
+        assert suggest(auto_suggest, "  ") is None
+
+
+def test_history_lookups_load_older_entries():
+    from quo.buffer import _HISTORY_READ_AHEAD
+
+    history = InMemoryHistory(
+        ["old entry"] + ["e%i" % i for i in range(3 * _HISTORY_READ_AHEAD)]
+    )
+
+    async def test():
+        buffer = Buffer(history=history, auto_suggest=AutoSuggestFromHistory())
+        buffer.load_history_if_not_yet_loaded()
+        await settle()
+        assert len(buffer._working_lines) == _HISTORY_READ_AHEAD + 1
+
+        # Looking for a suggestion loads the rest of the history.
+        buffer.text = "old"
+        await buffer._async_suggester()
+        await settle()
+        assert len(buffer._working_lines) == 3 * _HISTORY_READ_AHEAD + 2
+
+        await buffer._async_suggester()
+        assert buffer.suggestion.text == " entry"
+
+    run_in_app(test)
+
+    async def test_completion():
+        buffer = Buffer(history=history)
+        buffer.load_history_if_not_yet_loaded()
+        await settle()
+
+        buffer.insert_text("old")
+        buffer.start_history_lines_completion()
+        await settle()
+        assert len(buffer._working_lines) == 3 * _HISTORY_READ_AHEAD + 2
+
+        buffer.start_history_lines_completion()
+        return [c.text for c in buffer.complete_state.completions]
+
+    assert run_in_app(test_completion) == ["old", "old entry"]
+
+
+def test_history_lines_completion_includes_unsaved_edits():
+    history = InMemoryHistory(["git status", "git commit\ngit push"])
+
+    async def test():
+        buffer = Buffer(history=history)
+        buffer.load_history_if_not_yet_loaded()
+        await settle()
+
+        # Edit the oldest entry, without accepting it.
+        buffer.history_backward(count=2)
+        buffer.text = "git status --short"
+        buffer.history_forward(count=2)
+
+        buffer.insert_text("git s")
+        buffer.start_history_lines_completion()
+
+        completions = buffer.complete_state.completions
+        return [(c.text, c.display_meta_text) for c in completions]
+
+    assert run_in_app(test) == [
+        ("git s", "Current, line 1"),
+        ("git status --short", "History 1, line 1"),
+        ("git status", "History"),
+    ]
+
+
+def test_history_lines_completion_streams_batches():
+    from quo.buffer import _HISTORY_LINES_COMPLETION_BATCH
+
+    count = 3 * _HISTORY_LINES_COMPLETION_BATCH + 10
+    history = InMemoryHistory(["line %i" % i for i in range(count)] + ["other"])
+
+    async def test():
+        buffer = Buffer(history=history)
+        buffer.load_history_if_not_yet_loaded()
+        await settle()
+
+        buffer.insert_text("line")
+        buffer.start_history_lines_completion()
+        completions = buffer.complete_state.completions
+
+        # (The current line comes first.)
+        assert len(completions) == _HISTORY_LINES_COMPLETION_BATCH
+        assert completions[1].text == "line %i" % (count - 1)
+
+        await settle()
+        assert len(completions) == count + 1
+        assert completions[-1].text == "line 0"
+
+    run_in_app(test)
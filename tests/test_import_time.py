@@ -0,0 +1,84 @@
+"""
+Run the import time budgets of tools/import_time.py.
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+TOOLS = os.path.join(os.path.dirname(__file__), os.pardir, "tools")
+
+spec = importlib.util.spec_from_file_location(
+    "import_time", os.path.join(TOOLS, "import_time.py")
+)
+import_time = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_time)
+
+# Shared machines are slower, and noisier, than the ones the budgets were set
+# for. (The forbidden modules are always checked.)
+SCALE = float(os.environ.get("QUO_IMPORT_TIME_SCALE", "3"))
+
+
+@pytest.mark.parametrize(
+    "budget", import_time.BUDGETS, ids=[b.statement for b in import_time.BUDGETS]
+)
+def test_import_budget(budget):
+    _, modules = import_time.measure(budget.statement)  # Warm up.
+
+    for module in budget.forbidden_modules:
+        assert module not in modules, "%r imports %r" % (budget.statement, module)
+
+    milliseconds = min(import_time.measure(budget.statement)[0] for _ in range(3))
+    assert milliseconds <= budget.milliseconds * SCALE
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        env=dict(os.environ, PYTHONPATH=import_time.SRC),
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout.split()
+
+
+def test_prompt_is_the_function():
+    assert _run(
+        "import types, quo\n"
+        "from quo import prompt\n"
+        "import quo.prompt\n"
+        "print(callable(prompt), isinstance(quo.prompt, types.FunctionType))\n"
+    ) == ["True", "True"]
+
+
+@pytest.mark.parametrize(
+    "imports",
+    [
+        "from quo.prompt import Prompt\nfrom quo import prompt\n",
+        "import quo\n"
+        "from quo.keys import bind\n"
+        "from quo.prompt import Prompt\n"
+        "prompt = quo.prompt\n",
+    ],
+)
+def test_prompt_after_importing_the_submodule(imports):
+    assert _run(
+        imports + "import quo.prompt as module\n"
+        "module.prompt = lambda *a, **kw: print('called', *a, *kw.values())\n"
+        "prompt('text', default='default')\n"
+    ) == ["called", "text", "default"]
+
+
+def test_lazy_attributes():
+    assert _run(
+        "import sys, quo\n"
+        "print('quo.i_o.termui' in sys.modules)\n"
+        "quo.echo\n"
+        "print('quo.i_o.termui' in sys.modules)\n"
+        "print('echo' in dir(quo), 'confirm' in dir(quo))\n"
+    ) == ["False", "True", "True", "True"]
+
+    with pytest.raises(subprocess.CalledProcessError):
+        _run("import quo; quo.does_not_exist")
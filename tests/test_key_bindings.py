@@ -0,0 +1,279 @@
+import asyncio
+import random
+from itertools import product
+
+import pytest
+
+from quo.buffer import Buffer
+from quo.console.current import set_app
+from quo.enums import EditingMode
+from quo.filters import Condition
+from quo.input.vt100_parser import Vt100Parser
+from quo.keys.key_binding.bindings import vi
+from quo.keys.key_binding.defaults import load_key_bindings
+from quo.keys.key_binding.key_bindings import (
+    Bind,
+    Binding,
+    ConditionalKeyBindings,
+    merge_key_bindings,
+)
+from quo.keys.list import Keys
+
+from ._app import create_app
+
+KEYS = ["a", "b", "c", Keys.ControlX, Keys.Escape, Keys.Any]
+
+
+def handler(event):
+    pass
+
+
+def _reference_for_keys(bindings, keys):
+    "The linear scan that the trie replaced."
+    result = []
+
+    for b in bindings:
+        if len(keys) == len(b.keys) and all(
+            i == j or i == Keys.Any for i, j in zip(b.keys, keys)
+        ):
+            result.append((sum(1 for i in b.keys if i == Keys.Any), b))
+
+    return [b for _, b in sorted(result, key=lambda item: -item[0])]
+
+
+def _reference_starting_with(bindings, keys):
+    return [
+        b
+        for b in bindings
+        if len(keys) < len(b.keys)
+        and all(i == j or i == Keys.Any for i, j in zip(b.keys, keys))
+    ]
+
+
+def _queries(length=3):
+    for n in range(length + 1):
+        yield from product([k for k in KEYS if k != Keys.Any] + [Keys.Any], repeat=n)
+
+
+def _random_bindings(bind, rng, count):
+    for _ in range(count):
+        keys = [rng.choice(KEYS) for _ in range(rng.randint(1, 3))]
+        bind.add(*keys)(handler)
+
+
+def _check(bind, all_bindings):
+    for keys in _queries():
+        assert bind.get_bindings_for_keys(keys) == _reference_for_keys(
+            all_bindings, keys
+        ), keys
+        assert bind.get_bindings_starting_with_keys(
+            keys
+        ) == _reference_starting_with(all_bindings, keys), keys
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lookups_match_reference(seed):
+    bind = Bind()
+    _random_bindings(bind, random.Random(seed), 40)
+
+    _check(bind, bind.bindings)
+
+
+def test_lookups_after_adding_and_removing():
+    rng = random.Random(1)
+    bind = Bind()
+    _random_bindings(bind, rng, 20)
+    _check(bind, bind.bindings)
+
+    # Added incrementally.
+    _random_bindings(bind, rng, 20)
+    _check(bind, bind.bindings)
+
+    # Removal rebuilds the trie.
+    bind.remove(*bind.bindings[3].keys)
+    _check(bind, bind.bindings)
+
+    @bind.add("a", "b")
+    def other(event):
+        pass
+
+    bind.remove(other)
+    _check(bind, bind.bindings)
+
+
+def test_wildcard_order():
+    bind = Bind()
+    any_any = bind.add(Keys.Any, Keys.Any)(lambda e: None)
+    a_any = bind.add("a", Keys.Any)(lambda e: None)
+    a_b = bind.add("a", "b")(lambda e: None)
+
+    assert [b.handler for b in bind.get_bindings_for_keys(("a", "b"))] == [
+        any_any,
+        a_any,
+        a_b,
+    ]
+    assert [b.handler for b in bind.get_bindings_starting_with_keys(("a",))] == [
+        any_any,
+        a_any,
+        a_b,
+    ]
+    assert [b.handler for b in bind.get_bindings_starting_with_keys(("c",))] == [
+        any_any
+    ]
+
+
+def test_default_bindings_match_reference():
+    app = create_app()
+    try:
+        # (The filters of the default bindings need an application.)
+        with set_app(app):
+            default = list(load_key_bindings().bindings)
+    finally:
+        app.input.close()
+
+    bind = Bind()
+    bind.bindings.extend(default)
+    assert len(default) > 100
+
+    for b in default:
+        for n in range(len(b.keys) + 1):
+            keys = b.keys[:n]
+            assert bind.get_bindings_for_keys(keys) == _reference_for_keys(
+                default, keys
+            )
+            assert bind.get_bindings_starting_with_keys(
+                keys
+            ) == _reference_starting_with(default, keys)
+
+
+def test_conditional_key_bindings():
+    enabled = True
+    bind = Bind()
+    bind.add("a")(handler)
+    conditional = ConditionalKeyBindings(bind, Condition(lambda: enabled))
+
+    first = conditional.get_bindings_for_keys(("a",))
+    assert len(first) == 1 and first[0].handler is handler
+    assert first[0].filter()
+
+    enabled = False
+    assert not first[0].filter()
+
+    # The copies are reused after a change of the wrapped bindings.
+    bind.add("b")(handler)
+    assert conditional.get_bindings_for_keys(("a",)) == first
+    assert [b.keys for b in conditional.bindings] == [("a",), ("b",)]
+    assert [b.keys for b in conditional.get_bindings_starting_with_keys(())] == [
+        ("a",),
+        ("b",),
+    ]
+
+    bind.remove("a")
+    assert conditional.get_bindings_for_keys(("a",)) == []
+
+
+def test_merged_key_bindings():
+    rng = random.Random(2)
+    registries = [Bind(), Bind(), Bind()]
+    for bind in registries:
+        _random_bindings(bind, rng, 15)
+
+    merged = merge_key_bindings(registries)
+
+    def all_bindings():
+        return [b for r in registries for b in r.bindings]
+
+    _check(merged, all_bindings())
+    assert merged.bindings == all_bindings()
+
+    # A change in one of the registries is picked up.
+    _random_bindings(registries[1], rng, 5)
+    _check(merged, all_bindings())
+    assert merged.bindings == all_bindings()
+
+
+def test_adding_a_binding_object():
+    bind = Bind()
+    binding = Binding(("a",), handler, eager=True)
+    bind.add("b")(binding)
+
+    (result,) = bind.get_bindings_for_keys(("b",))
+    assert result.handler is handler
+    assert result.eager()
+
+
+def test_lazy_conditional_key_bindings():
+    enabled = False
+    created = []
+
+    def create():
+        created.append(1)
+        bind = Bind()
+        bind.add("a")(handler)
+        return bind
+
+    conditional = ConditionalKeyBindings(create, Condition(lambda: enabled))
+    merged = merge_key_bindings([conditional])
+
+    # Behaves as empty key bindings, until the filter is true.
+    assert merged.get_bindings_for_keys(("a",)) == []
+    assert conditional.bindings == []
+    assert created == []
+
+    enabled = True
+    assert [b.keys for b in merged.get_bindings_for_keys(("a",))] == [("a",)]
+    assert created == [1]
+
+    # Created only once.
+    enabled = False
+    conditional.get_bindings_for_keys(("a",))
+    assert created == [1]
+    assert not merged.get_bindings_for_keys(("a",))[0].filter()
+
+
+def test_lazy_conditional_key_bindings_bind_property():
+    conditional = ConditionalKeyBindings(Bind, False)
+    assert isinstance(conditional.bind, Bind)
+
+
+def test_vi_bindings_are_created_in_vi_mode(monkeypatch):
+    created = []
+    create_vi_bindings = vi._create_vi_bindings
+
+    def counting_create_vi_bindings():
+        created.append(1)
+        return create_vi_bindings()
+
+    monkeypatch.setattr(vi, "_create_vi_bindings", counting_create_vi_bindings)
+
+    buffer = Buffer()
+    app = create_app(buffer)
+
+    def feed(data):
+        keys = []
+        Vt100Parser(keys.append).feed_and_flush(data)
+        app.key_processor.feed_multiple(keys)
+        app.key_processor.process_keys()
+
+    async def run():
+        with set_app(app):
+            feed("hello world\x01X")
+            assert buffer.text == "Xhello world"
+            assert created == []
+
+            app.editing_mode = EditingMode.VI
+            feed("\x1b0xx")
+            assert buffer.text == "ello world"
+            assert created == [1]
+
+            app.editing_mode = EditingMode.EMACS
+            feed("\x05!")
+            app.editing_mode = EditingMode.VI
+            feed("\x1b0x")
+            assert buffer.text == "llo world!"
+            assert created == [1]
+
+    try:
+        asyncio.run(run())
+    finally:
+        app.input.close()
@@ -0,0 +1,200 @@
+import asyncio
+
+import pytest
+
+from quo.buffer import Buffer
+from quo.console.current import set_app
+from quo.enums import EditingMode
+from quo.filters import Condition
+from quo.keys.key_binding.key_bindings import Bind
+from quo.keys.key_binding.key_processor import KeyPress
+from quo.keys.key_binding.vi_state import InputMode
+from quo.keys.list import Keys
+
+from ._app import create_app
+
+
+def _type(keys, coalesce, configure=None):
+    """
+    Feed the keys to the key processor of an application (at once, like a
+    paste), and return the buffer, the number of `insert_text` calls and the
+    list that `configure` can append events to.
+    """
+    buffer = Buffer()
+    app = create_app(buffer)
+    log = []
+    calls = []
+
+    insert_text = buffer.insert_text
+
+    def counting_insert_text(*a, **kw):
+        calls.append(a)
+        insert_text(*a, **kw)
+
+    buffer.insert_text = counting_insert_text
+
+    async def run():
+        with set_app(app):
+            if configure is not None:
+                configure(app, buffer, log)
+
+            processor = app.key_processor
+            if not coalesce:
+                processor._process_self_insert_run = lambda key_press: False
+
+            processor.feed_multiple(
+                [KeyPress(k) if isinstance(k, str) else KeyPress(*k) for k in keys]
+            )
+            processor.process_keys()
+
+    try:
+        asyncio.run(run())
+    finally:
+        app.input.close()
+
+    return buffer, len(calls), log
+
+
+def _compare(keys, configure=None):
+    "Type with and without coalescing. Both should have the same outcome."
+    buffer1, calls1, log1 = _type(keys, True, configure)
+    buffer2, calls2, log2 = _type(keys, False, configure)
+
+    assert buffer1.document == buffer2.document
+    assert buffer1._undo_stack == buffer2._undo_stack
+    assert buffer1._redo_stack == buffer2._redo_stack
+    assert log1 == log2
+
+    return calls1, log1
+
+
+def test_plain_text_is_inserted_at_once():
+    calls, _ = _compare("hello world")
+    assert calls == 1
+
+
+def test_undo_after_coalesced_insert():
+    keys = list("abc") + [(Keys.ControlH, "\x08")] + list("def") + [" "] + list("gh")
+    _compare(keys)
+
+    buffer, _, _ = _type(keys, True)
+    assert buffer.text == "abdef gh"
+
+    while buffer._undo_stack:
+        buffer.undo()
+    assert buffer.text == ""
+
+
+def test_filtered_binding_for_a_character():
+    # Auto-pairing: skip over a closing parenthesis that's already there.
+    def configure(app, buffer, log):
+        bind = Bind()
+
+        @Condition
+        def at_closing_paren():
+            return buffer.document.current_char == ")"
+
+        @bind.add(")", filter=at_closing_paren)
+        def _(event):
+            buffer.cursor_position += 1
+
+        @bind.add("(")
+        def _(event):
+            buffer.insert_text("()")
+            buffer.cursor_position -= 1
+
+        app.bind = bind
+
+    _compare("f(x)y", configure)
+
+    buffer, _, _ = _type("f(x)y", True, configure)
+    assert buffer.text == "f(x)y"
+
+
+def test_filter_that_becomes_true_while_typing():
+    def configure(app, buffer, log):
+        bind = Bind()
+
+        @bind.add(")", filter=Condition(lambda: "(" in buffer.text))
+        def _(event):
+            buffer.insert_text(")!")
+
+        app.bind = bind
+
+    _compare("a(b)c", configure)
+
+    buffer, _, _ = _type("a(b)c", True, configure)
+    assert buffer.text == "a(b)!c"
+
+
+def test_handler_that_does_more_than_insert():
+    def configure(app, buffer, log):
+        bind = Bind()
+
+        @bind.add(Keys.Any)
+        def _(event):
+            buffer.insert_text(event.data.upper())
+            log.append(buffer.text)
+
+        app.bind = bind
+
+    calls, log = _compare("abc", configure)
+    assert calls == 3
+    assert log == ["A", "AB", "ABC"]
+
+
+def test_key_press_events_interleave():
+    def configure(app, buffer, log):
+        def before(sender):
+            log.append(("before", buffer.text))
+
+        def after(sender):
+            log.append(("after", buffer.text))
+
+        app.key_processor.before_key_press += before
+        app.key_processor.after_key_press += after
+
+    _, log = _compare("abc", configure)
+    assert log == [
+        ("before", ""),
+        ("after", "a"),
+        ("before", "a"),
+        ("after", "ab"),
+        ("before", "ab"),
+        ("after", "abc"),
+    ]
+
+
+def test_text_insert_event_fires_for_every_character():
+    def configure(app, buffer, log):
+        buffer.on_text_insert += lambda sender: log.append(sender.text)
+
+    _, log = _compare("abc", configure)
+    assert log == ["a", "ab", "abc"]
+
+
+@pytest.mark.parametrize("input_mode", [InputMode.INSERT, InputMode.REPLACE])
+def test_vi_mode(input_mode):
+    def configure(app, buffer, log):
+        app.editing_mode = EditingMode.VI
+        app.vi_state.input_mode = input_mode
+        buffer.text = "0123456789"
+        buffer.cursor_position = 2
+
+    _compare("abc", configure)
+
+    buffer, _, _ = _type("abc", True, configure)
+    if input_mode == InputMode.REPLACE:
+        assert buffer.text == "01abc56789"
+    else:
+        assert buffer.text == "01abc23456789"
+
+
+def test_macro_recording():
+    def configure(app, buffer, log):
+        app.emacs_state.start_macro()
+        log.append(app.emacs_state)
+
+    _, calls, log = _type("abc", True, configure)
+    assert calls == 1
+    assert log[0].current_recording == [KeyPress(c) for c in "abc"]
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from quo.buffer import Buffer
+from quo.console.console import Console
+from quo.console.latency import KeyLatency, LatencyStats
+from quo.input.posix_pipe import PosixPipeInput
+from quo.keys.key_binding.key_bindings import Bind
+from quo.keys.key_binding.key_processor import KeyPress
+from quo.keys.list import Keys
+from quo.layout.containers import Window
+from quo.layout.controls import BufferControl
+from quo.layout.layout import Layout
+from quo.output import DummyOutput
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    "Replace `time.monotonic` by a clock that only moves when told to."
+
+    class Clock:
+        now = 1000.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+def test_percentile():
+    stats = LatencyStats()
+    assert stats.percentile(50) is None
+
+    for i in range(1, 101):
+        stats.add(i / 1000)
+
+    assert len(stats) == 100
+    assert stats.percentile(0) == 0.001
+    assert stats.percentile(50) == 0.051
+    assert stats.percentile(99) == 0.099
+    assert stats.percentile(100) == 0.1
+
+
+def test_rolling_window():
+    stats = LatencyStats(size=3)
+    for latency in [5, 1, 2, 3]:
+        stats.add(latency)
+
+    assert len(stats) == 3
+    assert stats.percentile(100) == 3
+
+    stats.clear()
+    assert len(stats) == 0
+
+
+def test_histogram():
+    stats = LatencyStats()
+    for latency in [0.0005, 0.001, 0.003, 0.3, 7]:
+        stats.add(latency)
+
+    assert stats.histogram([0.001, 0.01, 1]) == [
+        (0.001, 2),
+        (0.01, 1),
+        (1, 1),
+        (float("inf"), 1),
+    ]
+    assert sum(count for _, count in stats.histogram()) == 5
+
+
+def test_key_latency(clock, caplog):
+    latency = KeyLatency(slow_threshold=0.1)
+    binding = object()
+
+    fast = KeyPress("a")
+    clock.now += 0.01
+    slow = KeyPress("b")
+    cpr = KeyPress(Keys.CPRResponse, "\x1b[1;1R")
+
+    clock.now += 0.5
+    latency.key_handled([fast], binding)
+    latency.key_handled([slow, cpr], binding)
+
+    assert len(latency.handled) == 2
+    assert len(latency.painted) == 0
+
+    # The key presses are painted by the next frame. Only the slow key press
+    # is logged.
+    clock.now += 0.02
+    with caplog.at_level(logging.WARNING):
+        latency.frame_flushed()
+        latency.frame_flushed()
+
+    assert sorted(latency.painted._samples) == pytest.approx([0.52, 0.53])
+    assert len(caplog.records) == 2
+
+    latency.reset()
+    assert len(latency.handled) == len(latency.painted) == 0
+
+
+def test_key_latency_in_console(caplog):
+    bind = Bind()
+
+    @bind.add("ctrl-d")
+    def _(event):
+        event.app.exit()
+
+    @bind.add("ctrl-s")
+    def _(event):
+        time.sleep(0.1)
+
+    buffer = Buffer()
+    latency = KeyLatency(slow_threshold=0.05)
+    app = Console(
+        layout=Layout(Window(BufferControl(buffer=buffer))),
+        bind=bind,
+        input=PosixPipeInput(),
+        output=DummyOutput(),
+        key_latency=latency,
+    )
+
+    async def run():
+        async def type_keys():
+            for data in "ab\x13c":
+                app.input.send_text(data)
+                await asyncio.sleep(0.02)
+            await asyncio.sleep(0.1)
+            app.input.send_text("\x04")
+
+        task = asyncio.ensure_future(type_keys())
+        await app.run_async()
+        await task
+
+    try:
+        with caplog.at_level(logging.WARNING):
+            asyncio.run(run())
+    finally:
+        app.input.close()
+
+    assert buffer.text == "abc"
+    assert len(latency.handled) == 5
+    assert len(latency.painted) >= 4
+    assert latency.painted.percentile(100) >= 0.1
+    assert "ControlS" in caplog.text
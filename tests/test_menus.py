@@ -0,0 +1,148 @@
+import pytest
+
+from quo.buffer import Buffer, CompletionState
+from quo.completion import Completion
+from quo.console.current import set_app
+from quo.document import Document
+from quo.layout import menus
+from quo.layout.menus import (
+    CompletionsMenuControl,
+    MultiColumnCompletionMenuControl,
+    _CompletionWidths,
+)
+
+from ._app import create_app
+
+
+@pytest.fixture
+def buffer():
+    buffer = Buffer()
+    app = create_app(buffer)
+
+    with set_app(app):
+        yield buffer
+
+    app.input.close()
+
+
+def _text(fragments):
+    return "".join(fragment[1] for fragment in fragments)
+
+
+def _lines(content):
+    return [_text(content.get_line(i)) for i in range(content.line_count)]
+
+
+def _set_completions(buffer, completions, index=None):
+    buffer.complete_state = CompletionState(Document(), completions, index)
+
+
+def test_completion_widths_are_incremental(monkeypatch):
+    monkeypatch.setattr(menus, "_MAX_MEASURED_COMPLETIONS", 2)
+    completions = [Completion("a"), Completion("bbb", display_meta="meta")]
+    widths = _CompletionWidths()
+
+    widths.update(completions)
+    assert (widths.width, widths.meta_width, widths.has_meta) == (3, 4, True)
+
+    # Only the new completions are measured, at most two per call.
+    completions.extend([Completion("c" * 5), Completion("d" * 7), Completion("e")])
+    assert widths.update(completions).width == 7
+    assert widths._measured == 4
+    widths.update(completions)
+    assert widths._measured == 5
+
+    # Another list starts over.
+    widths.update([Completion("x")])
+    assert (widths.width, widths.has_meta) == (1, False)
+
+
+def test_completions_menu(buffer):
+    control = CompletionsMenuControl()
+    _set_completions(
+        buffer,
+        [Completion("abc", display_meta="m"), Completion("de"), Completion("f")],
+        index=1,
+    )
+
+    content = control.create_content(width=20, height=3)
+    # (The main column has a minimum width of 7.)
+    assert _lines(content) == [" abc    m ", " de       ", " f        "]
+    assert content.cursor_position.y == 1
+
+    current = content.get_line(1)
+    assert all("current" in fragment[0] for fragment in current)
+
+
+def test_completions_menu_item_cache_follows_completions(buffer):
+    control = CompletionsMenuControl()
+    completions = [Completion("abc"), Completion("def")]
+    _set_completions(buffer, completions)
+
+    assert _lines(control.create_content(width=20, height=2))[0] == " abc   "
+
+    # Same index, other completion.
+    completions[0] = Completion("xyz")
+    assert _lines(control.create_content(width=20, height=2))[0] == " xyz   "
+
+
+def test_completions_menu_huge_list(buffer):
+    control = CompletionsMenuControl()
+    completions = [Completion("c%i" % i) for i in range(100000)]
+    _set_completions(buffer, completions, index=99999)
+
+    content = control.create_content(width=20, height=10)
+    assert content.line_count == 100000
+
+    # Only the first part of the list has been measured: wider items are
+    # trimmed until the following renderings have measured everything.
+    assert _text(content.get_line(99999)).strip() == "c9..."
+
+    for _ in range(len(completions) // menus._MAX_MEASURED_COMPLETIONS):
+        content = control.create_content(width=20, height=10)
+    assert _text(content.get_line(99999)).strip() == "c99999"
+
+
+def test_multi_column_menu_layout(buffer):
+    control = MultiColumnCompletionMenuControl()
+    completions = [Completion("c%02i" % i) for i in range(20)]
+    _set_completions(buffer, completions, index=0)
+
+    content = control.create_content(width=20, height=3)
+    lines = _lines(content)
+
+    # Completions are laid out column by column. Four columns of width 4 are
+    # visible, then an arrow.
+    assert len(lines) == 3
+    for row, line in enumerate(lines):
+        texts = line.split()
+        assert texts[:4] == ["c%02i" % (column * 3 + row) for column in range(4)]
+    assert lines[1].rstrip().endswith(">")
+
+
+def test_multi_column_menu_scrolls_to_selection(buffer):
+    control = MultiColumnCompletionMenuControl()
+    completions = [Completion("c%02i" % i) for i in range(20)]
+    _set_completions(buffer, completions, index=19)
+
+    lines = _lines(control.create_content(width=20, height=3))
+
+    assert "c19" in lines[1]
+    assert lines[1].startswith("<")
+    assert "c00" not in "".join(lines)
+
+
+def test_multi_column_menu_selects_by_index(buffer):
+    control = MultiColumnCompletionMenuControl()
+    # Equal completions: only the selected one is highlighted.
+    completions = [Completion("same") for _ in range(4)]
+    _set_completions(buffer, completions, index=2)
+
+    content = control.create_content(width=40, height=2)
+    current = [
+        fragment[1]
+        for i in range(content.line_count)
+        for fragment in content.get_line(i)
+        if "completion.current" in fragment[0] and fragment[1].strip()
+    ]
+    assert current == ["same"]
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from quo.console.current import set_app
+from quo.layout.containers import HSplit, Window
+from quo.layout.controls import FormattedTextControl
+from quo.layout.layout import Layout
+from quo.layout.mouse_handlers import MouseHandlers
+from quo.layout.scrollable_pane import ScrollablePane
+from quo.mouse_events import MouseEvent, MouseEventType, Point
+
+from ._app import create_app
+
+
+def _handler(name):
+    def handler(mouse_event):
+        return name
+
+    return handler
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_raster(seed):
+    "Compare with a raster of handlers that's filled in cell by cell."
+    rng = random.Random(seed)
+    mouse_handlers = MouseHandlers()
+    raster = {}
+
+    for i in range(rng.randint(0, 10)):
+        x_min, x_max = rng.randint(-2, 20), rng.randint(-2, 25)
+        y_min, y_max = rng.randint(-2, 20), rng.randint(-2, 25)
+        handler = _handler(i)
+        mouse_handlers.set_mouse_handler_for_range(x_min, x_max, y_min, y_max, handler)
+
+        for y in range(y_min, y_max):
+            for x in range(x_min, x_max):
+                raster[y, x] = handler
+
+    for y in range(-3, 26):
+        for x in range(-3, 26):
+            handler = mouse_handlers.get_mouse_handler(x, y)
+
+            if (y, x) in raster:
+                assert handler is raster[y, x]
+            else:
+                assert handler(None) is None
+
+            assert mouse_handlers.mouse_handlers[y][x] is handler
+
+
+def test_empty_ranges_are_ignored():
+    mouse_handlers = MouseHandlers()
+    mouse_handlers.set_mouse_handler_for_range(5, 5, 0, 10, _handler("a"))
+    mouse_handlers.set_mouse_handler_for_range(0, 10, 3, 2, _handler("b"))
+
+    assert mouse_handlers.regions == []
+
+
+def test_scrollable_pane():
+    clicks = []
+
+    def line(i):
+        def handler(mouse_event):
+            clicks.append((i, mouse_event.position))
+
+        return Window(FormattedTextControl([("", "line %i" % i, handler)]), height=1)
+
+    pane = ScrollablePane(HSplit([line(i) for i in range(100)]))
+    app = create_app()
+    app.layout = Layout(HSplit([Window(height=2), pane]))
+
+    def click(x, y):
+        mouse_handlers = app.renderer.mouse_handlers
+        mouse_handlers.get_mouse_handler(x, y)(
+            MouseEvent(Point(x=x, y=y), MouseEventType.MOUSE_UP)
+        )
+
+    try:
+        with set_app(app):
+            app.renderer.render(app, app.layout)
+            app.layout.update_parents_relations()
+            height = app.output.get_size().rows
+
+            click(2, 2)
+            pane.vertical_scroll = 10
+            app.renderer.render(app, app.layout)
+            click(3, 5)
+            click(1, height - 1)
+
+            # Above the pane.
+            click(2, 1)
+
+            # Only the visible lines of the pane have handlers.
+            assert len(app.renderer.mouse_handlers.regions) <= height
+    finally:
+        app.input.close()
+
+    assert clicks == [
+        (0, Point(x=2, y=0)),
+        (13, Point(x=3, y=0)),
+        (10 + height - 3, Point(x=1, y=0)),
+    ]
@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+from quo.completion import CompleteEvent, Completer, Completion, WordCompleter
+from quo.completion.process_pool import ProcessPoolCompleter
+from quo.document import Document
+
+
+class SlowCompleter(Completer):
+    "Yields `count` completions (endless when `None`), one per `delay`."
+
+    def __init__(self, count=None, delay=0.01):
+        self.count = count
+        self.delay = delay
+
+    def get_completions(self, document, complete_event):
+        for i in itertools.islice(itertools.count(), self.count):
+            time.sleep(self.delay)
+            yield Completion("%s%i" % (document.text, i))
+
+
+class FailingCompleter(Completer):
+    def get_completions(self, document, complete_event):
+        yield Completion("a")
+        raise ValueError("failed")
+
+
+@pytest.fixture
+def pool():
+    pools = []
+
+    def create(*a, **kw):
+        pools.append(ProcessPoolCompleter(*a, **kw))
+        return pools[-1]
+
+    yield create
+
+    for p in pools:
+        p.shutdown()
+
+
+def _completions(completer, text):
+    return list(completer.get_completions(Document(text), CompleteEvent()))
+
+
+async def _batches(completer, text, complete_event=None):
+    return [
+        batch
+        async for batch in completer.get_completion_batches_async(
+            Document(text), complete_event or CompleteEvent()
+        )
+    ]
+
+
+def test_streams_completions(pool):
+    words = ["w%i" % i for i in range(2000)]
+    meta = {"w1": "first"}
+    completer = pool(WordCompleter, args=(words, None, None, meta))
+
+    expected = _completions(WordCompleter(words, meta_dict=meta), "w1")
+    completions = _completions(completer, "w1")
+    assert [c.text for c in completions] == [c.text for c in expected]
+    assert completions[0].display_meta_text == "first"
+    assert completions[0].start_position == -2
+
+    batches = asyncio.run(_batches(completer, "w"))
+    assert [c.text for c in itertools.chain(*batches)] == words
+
+    # Workers aren't forked from this (threaded) process.
+    assert completer._executor._mp_context.get_start_method() != "fork"
+
+
+def test_exception_in_worker(pool):
+    completer = pool(FailingCompleter)
+
+    with pytest.raises(ValueError):
+        _completions(completer, "")
+
+
+def test_cancelling_a_request_leaves_the_others_running(pool):
+    completer = pool(SlowCompleter, args=(20, 0.01), max_workers=2)
+
+    async def test():
+        # Start the first request.
+        first = completer.get_completion_batches_async(Document("a"), CompleteEvent())
+        first_batches = [await first.__anext__()]
+
+        # Start a second one and cancel it.
+        second = completer.get_completion_batches_async(
+            Document("b"), CompleteEvent()
+        )
+        await second.__anext__()
+        await second.aclose()
+
+        # The first one isn't affected. (The second was newer.)
+        first_batches.extend([batch async for batch in first])
+        return [c.text for c in itertools.chain(*first_batches)]
+
+    assert asyncio.run(test()) == ["a%i" % i for i in range(20)]
+
+
+def test_shutdown_ends_pending_requests(pool):
+    completer = pool(SlowCompleter, args=(None, 0.01))
+    received = []
+    started = threading.Event()
+
+    def consume():
+        for completion in completer.get_completions(Document("x"), CompleteEvent()):
+            received.append(completion)
+            started.set()
+
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    assert started.wait(30)
+
+    completer.shutdown()
+    thread.join(10)
+    assert not thread.is_alive()
+
+    # It's started again when needed.
+    completer.create_completer = WordCompleter
+    completer.args = (["abc"],)
+    assert [c.text for c in _completions(completer, "a")] == ["abc"]
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from quo.buffer import Buffer
+from quo.console.console import Console
+from quo.contrib.replay import (
+    RecordedEvent,
+    Recording,
+    RecordingOutput,
+    ReplayResult,
+    record_session,
+    replay,
+)
+from quo.input.posix_pipe import PosixPipeInput
+from quo.keys.key_binding.key_bindings import Bind
+from quo.layout.containers import Window
+from quo.layout.controls import BufferControl
+from quo.layout.layout import Layout
+from quo.output import DummyOutput
+from quo.output.videoterminal import Size
+
+
+def _create_app(buffers, **kw):
+    "Create an application that exits on ctrl-d. (Its buffer is appended.)"
+    bind = Bind()
+
+    @bind.add("ctrl-d")
+    def _(event):
+        event.app.exit()
+
+    buffer = Buffer()
+    buffers.append(buffer)
+
+    return Console(
+        layout=Layout(Window(BufferControl(buffer=buffer))),
+        bind=bind,
+        full_screen=True,
+        **kw,
+    )
+
+
+def _recording():
+    return Recording(
+        size=Size(rows=10, columns=40),
+        events=[
+            RecordedEvent(0.0, data="hello "),
+            RecordedEvent(0.01, data="w\udcffo"),
+            RecordedEvent(0.02, size=Size(rows=10, columns=30)),
+            RecordedEvent(0.03, data="rld"),
+            RecordedEvent(0.04, data="\x04"),
+        ],
+    )
+
+
+def test_save_and_load(tmp_path):
+    recording = _recording()
+    filename = str(tmp_path / "session.json")
+    recording.save(filename)
+
+    loaded = Recording.load(filename)
+    assert loaded.size == recording.size
+    assert loaded.events == recording.events
+    assert loaded.duration == 0.04
+
+    with pytest.raises(ValueError):
+        Recording.from_dict({"size": [24, 80], "events": [[0, "mouse"]]})
+
+
+def test_only_size_changes_are_recorded():
+    recording = Recording(size=Size(rows=24, columns=80))
+    recording.add_size(Size(rows=24, columns=80))
+    recording.add_input("")
+    assert recording.events == []
+
+    recording.add_size(Size(rows=30, columns=80))
+    recording.add_size(Size(rows=30, columns=80))
+    assert [e.size for e in recording.events] == [Size(rows=30, columns=80)]
+
+
+def test_record_session():
+    buffers = []
+    input = PosixPipeInput()
+    output = RecordingOutput(size=Size(rows=10, columns=40))
+    app = _create_app(buffers, input=input, output=output)
+    recording = Recording()
+
+    async def run():
+        async def type_keys():
+            for data in ["ab", "\xe9", "c"]:
+                input.send_text(data)
+                await asyncio.sleep(0.01)
+
+            output.size = Size(rows=10, columns=30)
+            app._on_resize()
+            await asyncio.sleep(0.01)
+            input.send_text("\x04")
+
+        task = asyncio.ensure_future(type_keys())
+        with record_session(app, recording):
+            await app.run_async()
+        await task
+
+    try:
+        asyncio.run(run())
+    finally:
+        input.close()
+
+    assert buffers[0].text == "ab\xe9c"
+    assert recording.size == Size(rows=10, columns=40)
+    assert "".join(e.data for e in recording.events if e.data) == "ab\xe9c\x04"
+    assert [e.size for e in recording.events if e.size] == [
+        Size(rows=10, columns=30)
+    ]
+
+    times = [e.time for e in recording.events]
+    assert times == sorted(times)
+
+
+def test_record_session_needs_vt100_input():
+    app = _create_app([], input=PosixPipeInput(), output=DummyOutput())
+    app.input.close()
+    app.input = object()
+
+    with pytest.raises(TypeError):
+        with record_session(app, Recording()):
+            pass
+
+
+@pytest.mark.parametrize("speed", [1.0, None])
+def test_replay(speed):
+    buffers = []
+    result = asyncio.run(
+        replay(lambda: _create_app(buffers), _recording(), speed=speed)
+    )
+
+    # The invalid UTF-8 byte is replayed, and decoded like before.
+    assert buffers[0].text == "hello w\udcfforld"
+    assert result.frames > 0
+    assert result.bytes_written > 0
+    assert result.cpu_time > 0
+    if speed is not None:
+        assert result.wall_time >= 0.04
+
+
+def test_replay_exits_after_the_recording():
+    buffers = []
+    recording = Recording(events=[RecordedEvent(0.0, data="abc")])
+
+    result = asyncio.run(
+        replay(lambda: _create_app(buffers), recording, settle_time=0.01)
+    )
+    assert buffers[0].text == "abc"
+    assert result.frames > 0
+
+
+def test_compare(tmp_path):
+    baseline = ReplayResult(cpu_time=1.0, wall_time=5.0, frames=10, bytes_written=100)
+    filename = str(tmp_path / "baseline.json")
+    baseline.save(filename)
+    assert ReplayResult.load(filename) == baseline
+
+    same = baseline._replace(cpu_time=1.1, wall_time=50.0, frames=12)
+    assert same.compare(baseline) == []
+
+    worse = baseline._replace(frames=13, bytes_written=200)
+    regressions = worse.compare(baseline)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("frames: 13")
+    assert worse.compare(baseline, tolerance=1.0) == []
@@ -0,0 +1,214 @@
+import random
+
+import pytest
+
+from quo.i_o.output.ansi_escape_sequences import ANSI_SEQUENCES
+from quo.input import vt100_parser
+from quo.input.vt100_parser import Vt100Parser
+from quo.keys.list import Keys
+
+
+def _reference_keys(data):
+    """
+    Straightforward parser (character by character, scanning all the
+    sequences for every prefix), to compare with. Flushes at the end.
+    """
+    result = []
+
+    def get_match(prefix):
+        if vt100_parser._cpr_response_re.match(prefix):
+            return Keys.CPRResponse
+        if vt100_parser._mouse_event_re.match(prefix):
+            return Keys.Vt100MouseEvent
+        return ANSI_SEQUENCES.get(prefix)
+
+    def is_prefix_of_longer_match(prefix):
+        if vt100_parser._cpr_response_prefix_re.match(prefix):
+            return True
+        if vt100_parser._mouse_event_prefix_re.match(prefix):
+            return True
+        return any(
+            v for k, v in ANSI_SEQUENCES.items() if k != prefix and k.startswith(prefix)
+        )
+
+    def call_handler(key, insert_text):
+        if isinstance(key, tuple):
+            for i, k in enumerate(key):
+                call_handler(k, insert_text if i == 0 else "")
+        else:
+            result.append((key, insert_text))
+
+    prefix = ""
+    characters = list(data) + [None]  # `None` is the flush.
+    i = 0
+    retry = False
+
+    while i < len(characters) or retry:
+        flush = False
+        if retry:
+            retry = False
+        else:
+            c = characters[i]
+            i += 1
+            if c is None:
+                flush = True
+            else:
+                prefix += c
+
+        if prefix:
+            longer = is_prefix_of_longer_match(prefix)
+            match = get_match(prefix)
+
+            if (flush or not longer) and match:
+                call_handler(match, prefix)
+                prefix = ""
+            elif flush or not longer:
+                found = False
+                retry = True
+
+                for j in range(len(prefix), 0, -1):
+                    match = get_match(prefix[:j])
+                    if match:
+                        call_handler(match, prefix[:j])
+                        prefix = prefix[j:]
+                        found = True
+
+                if not found:
+                    call_handler(prefix[0], prefix[0])
+                    prefix = prefix[1:]
+
+    return result
+
+
+def _parse(chunks, bulk=True):
+    keys = []
+
+    def feed_key(key_press):
+        keys.append((key_press.key, key_press.data))
+
+    def feed_keys(key_presses):
+        keys.extend((k.key, k.data) for k in key_presses)
+
+    parser = Vt100Parser(feed_key, feed_keys if bulk else None)
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.flush()
+    return keys
+
+
+def _random_input(rng, sequences):
+    parts = []
+
+    for _ in range(rng.randrange(1, 40)):
+        kind = rng.random()
+        if kind < 0.4:
+            text = "abcXYZ é€\t\r\x01\x7f"
+            parts.append("".join(rng.choice(text) for _ in range(rng.randrange(20))))
+        elif kind < 0.8:
+            parts.append(rng.choice(sequences))
+        elif kind < 0.9:
+            # Truncated sequence.
+            sequence = rng.choice(sequences)
+            parts.append(sequence[: rng.randrange(1, len(sequence) + 1)])
+        else:
+            parts.append(
+                rng.choice(["\x1b[12;34R", "\x1b[<0;10;20M", "\x1b[M ab", "\x1b"])
+            )
+
+    return "".join(parts)
+
+
+@pytest.fixture
+def sequences():
+    return [s for s, key in ANSI_SEQUENCES.items() if key is not Keys.BracketedPaste]
+
+
+def test_plain_text_is_delivered_in_bulk():
+    batches = []
+    keys = []
+    parser = Vt100Parser(keys.append, batches.append)
+
+    parser.feed("hello\x1b[Aworld")
+    parser.flush()
+
+    assert ["".join(k.data for k in batch) for batch in batches] == ["hello", "world"]
+    assert [k.key for k in keys] == [Keys.Up]
+
+
+def test_parser_matches_reference(sequences):
+    rng = random.Random(0)
+
+    for _ in range(300):
+        data = _random_input(rng, sequences)
+
+        # Cut in random chunks.
+        cuts = sorted(rng.randrange(len(data) + 1) for _ in range(rng.randrange(4)))
+        chunks = [data[a:b] for a, b in zip([0] + cuts, cuts + [len(data)])]
+
+        expected = _reference_keys(data)
+        assert _parse(chunks) == expected, repr(data)
+        assert _parse(chunks, bulk=False) == expected, repr(data)
+
+
+def test_bracketed_paste():
+    data = "ab\x1b[200~pasted \x1b[A text\x1b[201~cd"
+
+    assert _parse([data]) == [
+        ("a", "a"),
+        ("b", "b"),
+        (Keys.BracketedPaste, "pasted \x1b[A text"),
+        ("c", "c"),
+        ("d", "d"),
+    ]
+    assert _parse(list(data)) == _parse([data])
+
+
+@pytest.fixture
+def restore_sequences():
+    saved = dict(ANSI_SEQUENCES)
+    yield
+    ANSI_SEQUENCES.clear()
+    ANSI_SEQUENCES.update(saved)
+    vt100_parser._SEQUENCE_TABLE._rebuild()
+
+
+def test_sequence_table_lookup():
+    table = vt100_parser._SEQUENCE_TABLE
+    prefixes = {s[:i] for s in ANSI_SEQUENCES for i in range(1, len(s) + 1)}
+
+    for prefix in prefixes:
+        match = ANSI_SEQUENCES.get(prefix)
+        longer = any(
+            v for k, v in ANSI_SEQUENCES.items() if k != prefix and k.startswith(prefix)
+        )
+        if prefix.startswith("\x1b[") and (
+            vt100_parser._cpr_response_prefix_re.match(prefix)
+            or vt100_parser._mouse_event_prefix_re.match(prefix)
+        ):
+            longer = True
+
+        assert table.lookup(prefix) == (match, longer), repr(prefix)
+
+    assert table.lookup("\x1b[12;3R") == (Keys.CPRResponse, False)
+    assert table.lookup("\x1b[<0;1;2M") == (Keys.Vt100MouseEvent, False)
+    assert table.lookup("x") == (None, False)
+
+
+def test_add_ansi_sequence(restore_sequences):
+    vt100_parser.add_ansi_sequence("\x1b[99;9~", Keys.F24)
+    assert _parse(["\x1b[99;9~"]) == [(Keys.F24, "\x1b[99;9~")]
+
+    # Replace an existing sequence.
+    vt100_parser.add_ansi_sequence("\x1b[A", Keys.Down)
+    assert _parse(["\x1b[A"]) == [(Keys.Down, "\x1b[A")]
+
+
+def test_sequences_added_to_the_dictionary(restore_sequences):
+    assert _parse(["§x"]) == [("§", "§"), ("x", "x")]
+
+    # A new start character: it's no longer plain text.
+    ANSI_SEQUENCES["§x"] = Keys.F23
+    assert _parse(["a§xb"]) == [("a", "a"), (Keys.F23, "§x"), ("b", "b")]
+
+    del ANSI_SEQUENCES["§x"]
+    assert _parse(["§x"]) == [("§", "§"), ("x", "x")]
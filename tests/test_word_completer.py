@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from quo.completion import CompleteEvent, WordCompleter
+from quo.document import Document
+
+
+def _texts(completer, text):
+    completions = completer.get_completions(Document(text), CompleteEvent())
+    return [c.text for c in completions]
+
+
+@pytest.mark.parametrize("match_middle", [False, True])
+@pytest.mark.parametrize("case_sensitive", [False, True])
+def test_indexed_gives_same_completions(match_middle, case_sensitive):
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choice("abcAB_") for _ in range(rng.randrange(0, 8)))
+        for _ in range(1000)
+    ]
+    words += ["abc", "abc", "ABC"]  # Duplicates.
+
+    kwargs = dict(match_middle=match_middle, case_sensitive=case_sensitive)
+    plain = WordCompleter(words, **kwargs)
+    indexed = WordCompleter(words, indexed=True, **kwargs)
+
+    for text in ["", "a", "A", "ab", "b_", "x", "aBc", "cab_", "abcabcab"]:
+        assert _texts(indexed, text) == _texts(plain, text), text
+
+
+def test_indexed_sentence_and_meta():
+    completer = WordCompleter(
+        ["git status", "git stash", "grep"],
+        sentence=True,
+        indexed=True,
+        meta_dict={"grep": "search"},
+    )
+
+    completions = list(completer.get_completions(Document("git st"), CompleteEvent()))
+    assert [c.text for c in completions] == ["git status", "git stash"]
+    assert completions[0].start_position == -len("git st")
+
+    (completion,) = completer.get_completions(Document("gr"), CompleteEvent())
+    assert completion.display_meta_text == "search"
+
+
+def test_indexed_words_are_reindexed_when_changed():
+    words = ["apple"]
+    completer = WordCompleter(words, indexed=True)
+    assert _texts(completer, "a") == ["apple"]
+
+    words.append("apricot")
+    assert _texts(completer, "a") == ["apple", "apricot"]
+
+    # A new list.
+    completer.words = ["avocado"]
+    assert _texts(completer, "a") == ["avocado"]
+
+
+def test_indexed_get_version():
+    words = ["apple"]
+    version = [0]
+    calls = []
+
+    def get_words():
+        calls.append(None)
+        return list(words)
+
+    completer = WordCompleter(get_words, indexed=True, get_version=lambda: version[0])
+
+    assert _texts(completer, "a") == ["apple"]
+    assert _texts(completer, "ap") == ["apple"]
+    assert len(calls) == 1
+
+    words.append("apricot")
+    assert _texts(completer, "a") == ["apple"]
+
+    version[0] += 1
+    assert _texts(completer, "a") == ["apple", "apricot"]
+    assert len(calls) == 2
+
+
+def test_indexed_match_middle_with_separator_character():
+    completer = WordCompleter(["a\x00b", "ab"], indexed=True, match_middle=True)
+
+    assert _texts(completer, "\x00") == ["a\x00b"]
+
+
+def test_indexed_match_middle_checks_trigram_candidates():
+    words = ["abc_bcd", "xabcd", "bcd", "ABCD"]
+    completer = WordCompleter(words, indexed=True, match_middle=True)
+
+    # The first word contains all the trigrams of "abcd", but not "abcd".
+    assert _texts(completer, "abcd") == ["xabcd", "ABCD"]
+    assert _texts(completer, "bcd") == ["abc_bcd", "xabcd", "bcd", "ABCD"]
+    assert _texts(completer, "abcd") == ["xabcd", "ABCD"]
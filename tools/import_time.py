@@ -0,0 +1,130 @@
+"""
+Import time benchmark.
+
+Runs every statement below in a fresh interpreter with ``-X importtime``, and
+fails when it takes longer than its budget, or when it imports one of the
+modules that it shouldn't import. (The packages import their exports lazily:
+this catches an eager import that sneaks back in.)
+
+Usage::
+
+    python tools/import_time.py [--runs 5] [--scale 1.0]
+
+`--scale` multiplies the time budgets, for slower machines.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, NamedTuple, Sequence, Tuple
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+# Modules that are only needed by full screen applications and prompts.
+TUI_MODULES = [
+    "quo.console.console",
+    "quo.layout.containers",
+    "quo.keys.key_binding.key_bindings",
+    "quo.style.style",
+    "quo.highlight",
+]
+
+
+class Budget(NamedTuple):
+    statement: str
+    milliseconds: float
+    forbidden_modules: Sequence[str] = ()
+
+
+BUDGETS = [
+    Budget("import quo", 50, TUI_MODULES + ["quo.i_o.termui"]),
+    Budget("from quo import echo", 250, TUI_MODULES),
+    Budget("from quo import confirm", 250, TUI_MODULES),
+    Budget("from quo.keys.list import Keys", 50, TUI_MODULES),
+    Budget("from quo.completion import WordCompleter", 400, ["quo.console.console"]),
+    Budget(
+        "from quo.prompt import Prompt",
+        1000,
+        ["quo.keys.key_binding.digraphs", "quo.completion.process_pool"],
+    ),
+]
+
+
+def measure(statement: str) -> Tuple[float, List[str]]:
+    """
+    Run `statement` in a new interpreter. Return the total import time in
+    milliseconds, and the names of the imported modules.
+    """
+    env = dict(os.environ, PYTHONPATH=SRC)
+    # Compiling the modules isn't what we want to measure.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    total = 0
+    modules = []
+
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.append(name.strip())
+
+        # Only count the top level imports: the cumulative time of those
+        # includes the nested imports.
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+
+    return total / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    failures: List[str] = []
+
+    for budget in BUDGETS:
+        measure(budget.statement)  # Warm up: write the bytecode caches.
+
+        results = [measure(budget.statement) for _ in range(args.runs)]
+        milliseconds = statistics.median(ms for ms, _ in results)
+        limit = budget.milliseconds * args.scale
+        modules = set(results[0][1])
+
+        print(
+            "%-45s %7.1f ms  (budget: %.0f ms)"
+            % (budget.statement, milliseconds, limit)
+        )
+
+        if milliseconds > limit:
+            failures.append(
+                "%r takes %.1f ms, budget is %.0f ms."
+                % (budget.statement, milliseconds, limit)
+            )
+
+        for module in budget.forbidden_modules:
+            if module in modules:
+                failures.append("%r imports %r." % (budget.statement, module))
+
+    for failure in failures:
+        print("FAIL: %s" % failure)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())